@@ -0,0 +1,85 @@
+"""
+Measure cold start and rerun time of the Streamlit app (logged-out page, no network calls).
+
+    python benchmarks/startup_benchmark.py
+    python benchmarks/startup_benchmark.py --app /tmp/before/app.py   # e.g. a `git worktree` of an older commit
+
+Each cold start runs in a fresh interpreter, so module imports are included.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+DUMMY_SECRETS = {
+    "OPENAI_API_KEY": "sk-benchmark",
+    "SUPABASE_URL": "https://benchmark.supabase.co",
+    "SUPABASE_KEY": "benchmark.benchmark.benchmark"
+}
+
+
+def run_child(app_path: str, reruns: int):
+    from streamlit.testing.v1 import AppTest
+
+    app_dir = os.path.dirname(os.path.abspath(app_path))
+    sys.path.insert(0, app_dir)
+    os.chdir(app_dir)
+    os.environ.setdefault("OPENAI_API_KEY", DUMMY_SECRETS["OPENAI_API_KEY"])
+
+    app = AppTest.from_file(os.path.abspath(app_path), default_timeout=120)
+    for key, value in DUMMY_SECRETS.items():
+        app.secrets[key] = value
+
+    started = time.perf_counter()
+    app.run()
+    first_run = time.perf_counter() - started
+    if app.exception:
+        raise SystemExit(f"App raised: {app.exception[0].message}")
+
+    rerun_times = []
+    for _ in range(reruns):
+        started = time.perf_counter()
+        app.run()
+        rerun_times.append(time.perf_counter() - started)
+
+    print(json.dumps({
+        "first_run": first_run,
+        "rerun": statistics.median(rerun_times) if rerun_times else None,
+        "pil_loaded": "PIL.Image" in sys.modules
+    }))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--app", default=os.path.join(os.path.dirname(__file__), "..", "app.py"))
+    parser.add_argument("--cold-starts", type=int, default=5)
+    parser.add_argument("--reruns", type=int, default=20)
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_child(args.app, args.reruns)
+        return
+
+    results = []
+    for _ in range(args.cold_starts):
+        output = subprocess.run(
+            [sys.executable, __file__, "--child", "--app", args.app, "--reruns", str(args.reruns)],
+            capture_output=True, text=True, check=True
+        ).stdout
+        results.append(json.loads(output.strip().splitlines()[-1]))
+
+    first_runs = [result["first_run"] * 1000 for result in results]
+    reruns = [result["rerun"] * 1000 for result in results if result["rerun"] is not None]
+    print(f"App:                 {os.path.abspath(args.app)}")
+    print(f"Cold start (median): {statistics.median(first_runs):.1f} ms over {len(first_runs)} processes")
+    if reruns:
+        print(f"Rerun (median):      {statistics.median(reruns):.1f} ms")
+    print(f"PIL imported:        {any(result['pil_loaded'] for result in results)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+import hashlib
+import re
+import threading
+from collections import OrderedDict
+
+# Turns (a user message and the answer) shown before "Load earlier messages" is needed
+CHAT_WINDOW_TURNS = 10
+CHAT_WINDOW_STEP = 10
+
+MAX_PARSED_MESSAGES = 2000
+
+FENCE = re.compile(r"^```[ \t]*([\w+#.-]*)[ \t]*\n(.*?)^```[ \t]*$", re.MULTILINE | re.DOTALL)
+
+# Process-wide: chat messages never change once written, so parsed segments can be shared by every session
+_parsed = OrderedDict()
+_parsed_lock = threading.Lock()
+
+
+def message_hash(content: str) -> str:
+    return hashlib.sha1(content.encode("utf-8")).hexdigest()
+
+
+def _split(content: str):
+    segments = []
+    position = 0
+    for match in FENCE.finditer(content):
+        text = content[position:match.start()].strip()
+        if text:
+            segments.append(("markdown", None, text))
+        segments.append(("code", match.group(1) or None, match.group(2).rstrip("\n")))
+        position = match.end()
+    text = content[position:].strip()
+    if text:
+        segments.append(("markdown", None, text))
+    return tuple(segments)
+
+
+def parse_message(content: str):
+    """
+    Split a message into markdown and fenced code segments, cached by the message's hash.
+    Returns:
+        tuple: (kind, language, text) segments, kind being "markdown" or "code".
+    """
+    key = message_hash(content)
+    with _parsed_lock:
+        segments = _parsed.get(key)
+        if segments is not None:
+            _parsed.move_to_end(key)
+            return segments
+    segments = _split(content)
+    with _parsed_lock:
+        _parsed[key] = segments
+        if len(_parsed) > MAX_PARSED_MESSAGES:
+            _parsed.popitem(last=False)
+    return segments
+
+
+def visible_messages(messages: list, limit: int):
+    """
+    The last `limit` non-system messages, found from the end so long chats cost no more than short ones.
+    Returns:
+        tuple: (whether earlier messages are hidden, the visible messages in order)
+    """
+    visible = []
+    index = len(messages) - 1
+    while index >= 0 and len(visible) < limit:
+        if messages[index]["role"] != "system":
+            visible.append(messages[index])
+        index -= 1
+    hidden = any(message["role"] != "system" for message in messages[:index + 1]) if index >= 0 else False
+    visible.reverse()
+    return hidden, visible
@@ -0,0 +1,138 @@
+import argparse
+import json
+import sys
+
+from chat_archive import parse_stored_messages, rehydrate_messages
+from prompts import build_expert_system_message
+from supabase_helpers import get_user_chats_page, save_chats
+
+EXPORT_PAGE_SIZE = 100
+IMPORT_CHUNK_SIZE = 100
+
+MAX_IMPORT_CHATS = 5000
+
+# Imported system messages are dropped; the system prompt is rebuilt from the chat's expert instead
+IMPORTED_ROLES = ("user", "assistant")
+
+
+def export_lines(user_id: str, page_size: int = EXPORT_PAGE_SIZE):
+    """
+    A user's whole chat history as JSONL lines, one chat per line, oldest first.
+    Pages through Supabase, so only one page of chats is held at a time. Archived chats are rehydrated.
+    Yields:
+        str: One JSON object (description, expert_type, timestamp, messages) followed by a newline.
+    """
+    after_id = 0
+    while True:
+        rows = get_user_chats_page(user_id, after_id, page_size)
+        for row in rows:
+            after_id = row["id"]
+            if row.get("messages") is None and row.get("archived_messages"):
+                messages = json.loads(rehydrate_messages(row["archived_messages"], row.get("expert_type")))
+            else:
+                messages = row.get("messages") or "[]"
+                messages = parse_stored_messages(messages if isinstance(messages, str) else json.dumps(messages))
+            yield json.dumps({
+                "description": row.get("description"),
+                "expert_type": row.get("expert_type"),
+                "timestamp": row.get("timestamp"),
+                "messages": messages
+            }, ensure_ascii=False) + "\n"
+        if len(rows) < page_size:
+            return
+
+
+def export_file(user_id: str) -> bytes:
+    """The JSONL export as bytes, for a download button"""
+    return b"".join(line.encode("utf-8") for line in export_lines(user_id))
+
+
+def parse_chat_line(line, expert_types=None):
+    """
+    Validate one JSONL line of an export.
+    System messages in the file are dropped and the expert's own system prompt is put first,
+    so an import cannot replace the prompt the model is given when the chat is opened.
+    Args:
+        line: The line (str or bytes).
+        expert_types: Experts a chat may belong to; None accepts any.
+    Returns:
+        dict: The chat to insert, or None if the line is blank or not a valid chat.
+    """
+    if isinstance(line, bytes):
+        line = line.decode("utf-8", errors="replace")
+    if not line.strip():
+        return None
+    try:
+        chat = json.loads(line)
+    except ValueError:
+        return None
+    messages = chat.get("messages") if isinstance(chat, dict) else None
+    if not isinstance(messages, list) or not all(
+        isinstance(message, dict) and message.get("role") in (*IMPORTED_ROLES, "system")
+        and isinstance(message.get("content"), str)
+        for message in messages
+    ):
+        return None
+    expert_type = str(chat.get("expert_type") or "")
+    if expert_types is not None and expert_type not in expert_types:
+        return None
+    system = [{"role": "system", "content": build_expert_system_message(expert_type)}] if expert_type else []
+    return {
+        "description": str(chat.get("description") or "Imported Chat")[:200],
+        "expert_type": expert_type,
+        "timestamp": chat.get("timestamp") if isinstance(chat.get("timestamp"), str) else None,
+        "messages": system + [
+            {"role": message["role"], "content": message["content"]}
+            for message in messages if message["role"] in IMPORTED_ROLES
+        ]
+    }
+
+
+def import_lines(user_id: str, lines, chunk_size: int = IMPORT_CHUNK_SIZE, expert_types=None):
+    """
+    Insert chats from JSONL lines in chunks of `chunk_size`, one request per chunk.
+    Args:
+        lines: Any iterable of lines (str or bytes), e.g. an open file or an uploaded file.
+        expert_types: Experts a chat may belong to; chats of other experts are skipped. None accepts any.
+    Returns:
+        dict: Numbers of chats imported and lines skipped as invalid.
+    """
+    result = {"imported": 0, "skipped": 0}
+    chunk = []
+    for line in lines:
+        chat = parse_chat_line(line, expert_types)
+        if chat is None:
+            result["skipped"] += bool(line.strip())
+            continue
+        if result["imported"] + len(chunk) >= MAX_IMPORT_CHATS:
+            result["skipped"] += 1
+            continue
+        chunk.append(chat)
+        if len(chunk) >= chunk_size:
+            result["imported"] += save_chats(user_id, chunk)
+            chunk = []
+    result["imported"] += save_chats(user_id, chunk)
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export or import a user's chats as JSONL.")
+    parser.add_argument("command", choices=("export", "import"))
+    parser.add_argument("user_id")
+    parser.add_argument("path", nargs="?", default="-", help="File to write or read; - for stdout or stdin")
+    args = parser.parse_args()
+
+    if args.command == "export":
+        output = sys.stdout if args.path == "-" else open(args.path, "w", encoding="utf-8")
+        with output:
+            for line in export_lines(args.user_id):
+                output.write(line)
+    else:
+        source = sys.stdin if args.path == "-" else open(args.path, encoding="utf-8")
+        with source:
+            result = import_lines(args.user_id, source)
+        print(f"Imported {result['imported']} chat(s), skipped {result['skipped']} line(s)", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,210 @@
+import contextlib
+import copy
+import io
+import math
+import random
+import signal
+import time
+import tracemalloc
+
+from sandbox import SandboxError, apply_limits, load_function, run_isolated
+
+# Input sizes tried, smallest first; profiling stops early once a run gets too slow
+INPUT_SIZES = [64, 128, 256, 512, 1024, 2048, 4096, 8192]
+REPEATS = 3
+PER_RUN_BUDGET_SECONDS = 0.5
+TOTAL_TIME_LIMIT_SECONDS = 10.0
+MEMORY_LIMIT_MB = 512
+
+# A simpler complexity class is chosen over the best fit only if its normalized residual is at most
+# this many times the best one (plus a tiny floor for noise-free fits). Neighbouring classes such as
+# O(n) and O(n log n) differ by well under 0.01 in absolute residual, so the tolerance must be relative.
+FIT_TOLERANCE_RATIO = 1.25
+FIT_TOLERANCE_FLOOR = 1e-4
+
+# Candidate complexity classes, simplest first so ties go to the simpler class
+COMPLEXITY_CLASSES = {
+    "O(1)": lambda n: 1.0,
+    "O(log n)": lambda n: math.log2(n),
+    "O(n)": lambda n: float(n),
+    "O(n log n)": lambda n: n * math.log2(n),
+    "O(n^2)": lambda n: float(n) ** 2,
+    "O(n^3)": lambda n: float(n) ** 3,
+}
+
+
+def scale_value(value, n: int, rng: random.Random):
+    """
+    Grow a sample argument to size n while keeping its shape and element types.
+    Args:
+        value: An argument taken from a generated test case.
+        n (int): Target size.
+        rng (random.Random): Seeded random generator for reproducible inputs.
+    Returns:
+        The scaled argument. Scalars are returned unchanged.
+    """
+    if isinstance(value, str):
+        alphabet = "".join(sorted(set(value))) or "abcdefghijklmnopqrstuvwxyz"
+        return "".join(rng.choice(alphabet) for _ in range(n))
+    if isinstance(value, list):
+        if not value:
+            return [rng.randint(-n, n) for _ in range(n)]
+        return [scale_value(rng.choice(value), max(1, len(value)), rng) if isinstance(value[0], list)
+                else _jitter(rng.choice(value), n, rng) for _ in range(n)]
+    if isinstance(value, dict) and value:
+        sample_key, sample_value = next(iter(value.items()))
+        return {_jitter(sample_key, n, rng) if not isinstance(sample_key, str) else f"{sample_key}{i}":
+                _jitter(sample_value, n, rng) for i in range(n)}
+    return value
+
+
+def _jitter(value, n: int, rng: random.Random):
+    """Random element of the same type as value, so sorted/unique inputs don't skew timings"""
+    if isinstance(value, bool):
+        return rng.random() < 0.5
+    if isinstance(value, int):
+        return rng.randint(-n, n)
+    if isinstance(value, float):
+        return rng.uniform(-n, n)
+    if isinstance(value, str) and len(value) == 1:
+        return rng.choice("abcdefghijklmnopqrstuvwxyz")
+    return copy.deepcopy(value)
+
+
+def build_inputs(sample_args: list, n: int, seed: int = 0):
+    """
+    Build the argument list for input size n from a sample test case.
+    Collections are scaled; if the sample has none, integer arguments are treated as the size.
+    """
+    rng = random.Random(seed + n)
+    has_collection = any(isinstance(arg, (str, list, dict)) for arg in sample_args)
+    return [
+        scale_value(arg, n, rng) if has_collection
+        else (n if isinstance(arg, int) and not isinstance(arg, bool) else arg)
+        for arg in sample_args
+    ]
+
+
+def _profile_worker(code: str, function_name: str, sample_args: list, time_limit: float, memory_limit_mb: int):
+    """
+    Run the solution on growing inputs. Runs inside the sandbox (see sandbox.run_isolated).
+    Returns:
+        dict: "points" with size, time_ms and peak_kb per size, and an optional "error".
+    """
+    apply_limits(time_limit, memory_limit_mb)
+    points = []
+    error = None
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            function = load_function(code, function_name)
+            for n in INPUT_SIZES:
+                args = build_inputs(sample_args, n)
+                timings = []
+                for _ in range(REPEATS):
+                    run_args = copy.deepcopy(args)
+                    start = time.perf_counter()
+                    function(*run_args)
+                    timings.append(time.perf_counter() - start)
+
+                # Measure memory in a separate run so tracing overhead doesn't distort timings
+                run_args = copy.deepcopy(args)
+                tracemalloc.start()
+                function(*run_args)
+                _, peak = tracemalloc.get_traced_memory()
+                tracemalloc.stop()
+
+                points.append({"size": n, "time_ms": min(timings) * 1000, "peak_kb": peak / 1024})
+                if min(timings) > PER_RUN_BUDGET_SECONDS:
+                    break
+    except TimeoutError:
+        error = "Stopped early: time limit reached"
+    except MemoryError:
+        error = f"Stopped early: memory limit ({memory_limit_mb} MB) reached"
+    except BaseException as e:
+        error = f"{type(e).__name__}: {e}"[:300]
+    finally:
+        if hasattr(signal, "setitimer"):
+            signal.setitimer(signal.ITIMER_REAL, 0)
+        if tracemalloc.is_tracing():
+            tracemalloc.stop()
+    return {"points": points, "error": error}
+
+
+def fit_complexity(sizes: list, values: list, noise_floor: float = 0.0):
+    """
+    Fit measurements to the common complexity classes with least squares (value ~ a * f(n) + b).
+    Args:
+        sizes (list): Input sizes.
+        values (list): Measured time or memory for each size.
+        noise_floor (float): Spread below which measurements are treated as constant.
+    Returns:
+        tuple: (best class label, dict of class label -> normalized residual), or (None, {}) with too few points.
+    """
+    if len(sizes) < 3:
+        return None, {}
+
+    mean_value = sum(values) / len(values)
+    total_variance = sum((v - mean_value) ** 2 for v in values) or 1e-12
+    residuals = {}
+    for label, f in COMPLEXITY_CLASSES.items():
+        xs = [f(n) for n in sizes]
+        mean_x = sum(xs) / len(xs)
+        var_x = sum((x - mean_x) ** 2 for x in xs)
+        if var_x == 0:
+            residual = total_variance  # O(1): the best fit is the mean
+        else:
+            slope = max(0.0, sum((x - mean_x) * (v - mean_value) for x, v in zip(xs, values)) / var_x)
+            intercept = mean_value - slope * mean_x
+            residual = sum((v - (slope * x + intercept)) ** 2 for x, v in zip(xs, values))
+        residuals[label] = residual / total_variance
+
+    # Flat measurements are constant, whatever the noise happens to fit best
+    if max(values) - min(values) <= noise_floor or max(values) <= 2 * max(min(values), 1e-9):
+        return "O(1)", residuals
+
+    # Prefer the simplest class that fits almost as well as the best one, since timings are noisy
+    best_residual = min(residuals.values())
+    limit = best_residual * FIT_TOLERANCE_RATIO + FIT_TOLERANCE_FLOOR
+    best = next(label for label, residual in residuals.items() if residual <= limit)
+    return best, residuals
+
+
+def profile_solution(code: str, spec: dict):
+    """
+    Measure how a Python solution scales with input size and infer its time and space complexity.
+    Inputs are generated by scaling the first test case's arguments, and the solution runs in the same
+    sandbox as the test cases.
+    Args:
+        code (str): The candidate's Python solution (already known to compile).
+        spec (dict): Test spec with function_name and test_cases.
+    Returns:
+        dict: points, time_complexity, space_complexity and error.
+    """
+    sample_args = spec["test_cases"][0]["input"]
+    try:
+        result = run_isolated(_profile_worker, code, spec["function_name"], sample_args,
+                              TOTAL_TIME_LIMIT_SECONDS, MEMORY_LIMIT_MB, timeout=TOTAL_TIME_LIMIT_SECONDS + 5)
+    except (TimeoutError, SandboxError):
+        result = {"points": [], "error": "Profiler process was stopped by a resource limit"}
+
+    sizes = [point["size"] for point in result["points"]]
+    time_complexity, _ = fit_complexity(sizes, [point["time_ms"] for point in result["points"]], noise_floor=0.05)
+    space_complexity, _ = fit_complexity(sizes, [point["peak_kb"] for point in result["points"]], noise_floor=1.0)
+    return {
+        "points": result["points"],
+        "time_complexity": time_complexity,
+        "space_complexity": space_complexity,
+        "error": result["error"]
+    }
+
+
+def summarize_profile(profile: dict) -> str:
+    """One-line summary of the empirical complexity for the evaluation prompt"""
+    if not profile["time_complexity"]:
+        return "Empirical complexity: not enough measurements."
+    largest = profile["points"][-1]
+    return (
+        f"Empirical complexity (measured on inputs up to n={largest['size']}): "
+        f"time ~{profile['time_complexity']}, extra memory ~{profile['space_complexity']} "
+        f"({largest['time_ms']:.2f} ms, {largest['peak_kb']:.1f} KB peak at the largest size)."
+    )
@@ -0,0 +1,123 @@
+import ast
+import difflib
+import hashlib
+import re
+import threading
+from collections import OrderedDict
+
+# Evaluations kept per process, shared by all sessions (least recently used are dropped first)
+MAX_CACHED_EVALUATIONS = 512
+
+# A resubmission is a "small edit" when at most this share of lines changed
+MAX_DIFF_RATIO = 0.3
+MAX_DIFF_LINES = 60
+
+_cache = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def _strip_docstrings(tree):
+    for node in ast.walk(tree):
+        if isinstance(node, (ast.Module, ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)) and node.body:
+            first = node.body[0]
+            if isinstance(first, ast.Expr) and isinstance(first.value, ast.Constant) and isinstance(first.value.value, str):
+                node.body = node.body[1:] or [ast.Pass()]
+    return tree
+
+
+def normalize_code(code: str, language: str) -> str:
+    """
+    Normalize a solution so formatting-only changes map to the same cache entry.
+    Python is normalized through its AST (comments, docstrings and layout ignored);
+    other languages get comments and whitespace stripped.
+    Args:
+        code (str): The candidate's solution.
+        language (str): Programming language of the solution.
+    Returns:
+        str: The normalized code.
+    """
+    if language == "Python":
+        try:
+            return ast.dump(_strip_docstrings(ast.parse(code)), annotate_fields=False)
+        except SyntaxError:
+            code = re.sub(r"#[^\n]*", "", code)
+    else:
+        code = re.sub(r"/\*.*?\*/", "", code, flags=re.DOTALL)
+        code = re.sub(r"//[^\n]*", "", code)
+    return re.sub(r"\s+", " ", code).strip()
+
+
+def question_key(question: str) -> str:
+    """Hash identifying a question, used to match resubmissions to earlier evaluations"""
+    return hashlib.sha256(question.strip().encode()).hexdigest()
+
+
+def evaluation_key(question: str, code: str, language: str, personality: str, difficulty: int) -> str:
+    """Cache key of an evaluation: the question, the normalized code and the settings that shape the feedback"""
+    raw = "\x1f".join([question_key(question), normalize_code(code, language), language, personality, str(difficulty)])
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+def get_cached_evaluation(key: str):
+    """
+    Look up a cached evaluation.
+    Returns:
+        dict: The cached evaluation (feedback, test_summary), or None.
+    """
+    with _cache_lock:
+        if key not in _cache:
+            return None
+        _cache.move_to_end(key)
+        return _cache[key]
+
+
+def cache_evaluation(key: str, evaluation: dict):
+    """Store an evaluation, dropping the least recently used one when the cache is full"""
+    with _cache_lock:
+        _cache[key] = evaluation
+        _cache.move_to_end(key)
+        while len(_cache) > MAX_CACHED_EVALUATIONS:
+            _cache.popitem(last=False)
+
+
+def small_edit_diff(previous_code: str, code: str):
+    """
+    Diff a resubmission against the previously evaluated solution.
+    Args:
+        previous_code (str): The solution that was evaluated last time.
+        code (str): The new solution.
+    Returns:
+        str: A unified diff if the change is small enough to evaluate incrementally, otherwise None.
+    """
+    previous_lines = [line.rstrip() for line in previous_code.strip().splitlines()]
+    lines = [line.rstrip() for line in code.strip().splitlines()]
+    diff = list(difflib.unified_diff(previous_lines, lines, "previous", "current", n=2, lineterm=""))
+    changed = sum(1 for line in diff if line[:1] in "+-" and not line.startswith(("+++", "---")))
+    if not diff or len(diff) > MAX_DIFF_LINES or changed > MAX_DIFF_RATIO * max(len(previous_lines), len(lines)) * 2:
+        return None
+    return "\n".join(diff)
+
+
+def build_diff_evaluation_prompt(personality: str, previous_feedback: str, diff: str, language: str, test_summary: str = ""):
+    """
+    Build a short re-evaluation prompt that sends only the diff and the previous feedback.
+    Args:
+        personality (str): Interviewer personality.
+        previous_feedback (str): Feedback given on the previous version.
+        diff (str): Unified diff between the previous and the current solution.
+        language (str): Programming language of the solution.
+        test_summary (str): Local test and profiling results for the new version, if any.
+    Returns:
+        str: The user prompt.
+    """
+    return f"""
+    As a {personality.lower()} interviewer, you already evaluated the candidate's previous {language} solution.
+    Your previous feedback:
+    {previous_feedback}
+
+    The candidate revised the solution. Changes (unified diff):
+    {diff}
+    {test_summary}
+    Give updated feedback: say which earlier points are now addressed, which remain,
+    and whether the changes introduced new issues. Keep the same structure as before.
+    """
@@ -0,0 +1,171 @@
+import hashlib
+import json
+import logging
+import re
+import threading
+from collections import OrderedDict
+
+from prompts import JD_PROFILE_SYSTEM_MESSAGE
+from question_bank import jd_search_terms
+from request_executor import execute_chat
+from supabase_helpers import get_jd_profile, save_jd_profile
+
+logger = logging.getLogger(__name__)
+
+# Cheap model that turns a job description into a profile once; later prompts send the profile instead
+PROFILE_MODEL = "gpt-3.5-turbo"
+
+# Shorter job descriptions are sent as they are: a profile would not make them much shorter
+MIN_PROFILE_CHARS = 400
+
+# Profiles kept per process, shared by all sessions (least recently used are dropped first)
+MAX_CACHED_PROFILES = 256
+
+MAX_PROFILE_ITEMS = 12
+
+_cache = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def normalize_jd(job_description: str) -> str:
+    """Case and whitespace folded, so the same description pasted twice maps to the same profile"""
+    return re.sub(r"\s+", " ", job_description).strip().lower()
+
+
+def jd_key(job_description: str) -> str:
+    """Hash of the normalized job description, the key of its cached profile"""
+    return hashlib.sha256(normalize_jd(job_description).encode()).hexdigest()
+
+
+def _get_cached(key: str):
+    with _cache_lock:
+        if key not in _cache:
+            return None
+        _cache.move_to_end(key)
+        return _cache[key]
+
+
+def _cache_profile(key: str, profile: dict):
+    with _cache_lock:
+        _cache[key] = profile
+        _cache.move_to_end(key)
+        while len(_cache) > MAX_CACHED_PROFILES:
+            _cache.popitem(last=False)
+
+
+def _items(value):
+    if isinstance(value, str):
+        value = value.split(",")
+    if not isinstance(value, list):
+        return []
+    items = []
+    for item in value:
+        item = str(item).strip()
+        if item and item.lower() not in (existing.lower() for existing in items):
+            items.append(item)
+    return items[:MAX_PROFILE_ITEMS]
+
+
+def parse_profile(content: str, job_description: str):
+    """
+    Parse the model's JSON answer into a profile.
+    Falls back to the description's most frequent keywords as skills if the model ignored the JSON format.
+    Returns:
+        dict: role, seniority, domain, skills and stack.
+    """
+    data = {}
+    match = re.search(r"\{.*\}", content, re.DOTALL)
+    if match:
+        try:
+            data = json.loads(match.group(0))
+        except json.JSONDecodeError:
+            data = {}
+    if not isinstance(data, dict):
+        data = {}
+    profile = {
+        "role": str(data.get("role") or "").strip()[:100],
+        "seniority": str(data.get("seniority") or "").strip()[:40],
+        "domain": str(data.get("domain") or "").strip()[:100],
+        "skills": _items(data.get("skills")),
+        "stack": _items(data.get("stack"))
+    }
+    if not profile["skills"] and not profile["stack"]:
+        profile["skills"] = jd_search_terms(job_description)
+    return profile
+
+
+def format_profile(profile: dict) -> str:
+    """Render a profile as the compact text that prompts use in place of the job description"""
+    role = profile.get("role") or "Not specified"
+    if profile.get("seniority"):
+        role = f"{role} ({profile['seniority']})"
+    lines = [f"Role: {role}"]
+    if profile.get("domain"):
+        lines.append(f"Domain: {profile['domain']}")
+    if profile.get("skills"):
+        lines.append(f"Skills: {', '.join(profile['skills'])}")
+    if profile.get("stack"):
+        lines.append(f"Stack: {', '.join(profile['stack'])}")
+    return "\n".join(lines)
+
+
+def _analyze(job_description: str):
+    result = execute_chat(
+        "jd_profile",
+        PROFILE_MODEL,
+        [
+            {"role": "system", "content": JD_PROFILE_SYSTEM_MESSAGE},
+            {"role": "user", "content": job_description}
+        ],
+        temperature=0,
+        max_tokens=300
+    )
+    response = result["response"]
+    # The feature hedges with the same model, so a losing attempt is billed at the same price
+    usage = {
+        "model": result["model"],
+        "input_tokens": response.usage.prompt_tokens + sum(attempt["input_tokens"] for attempt in result["extra_attempts"]),
+        "output_tokens": response.usage.completion_tokens + sum(attempt["output_tokens"] for attempt in result["extra_attempts"])
+    }
+    return parse_profile(response.choices[0].message.content, job_description), result["model"], usage
+
+
+def get_job_profile(job_description: str):
+    """
+    The text to send to the model for a job description: its cached profile, or a new one from PROFILE_MODEL.
+    Looks in the process cache, then in Supabase, before analyzing. Short descriptions, and any failure
+    to build a profile, give the description itself.
+    Args:
+        job_description (str): The pasted job description.
+    Returns:
+        dict: text (what prompts should use), profile (dict or None) and usage (model and token counts of
+              the analysis call, None unless this call paid for one).
+    """
+    if len(job_description.strip()) < MIN_PROFILE_CHARS:
+        return {"text": job_description, "profile": None, "usage": None}
+
+    key = jd_key(job_description)
+    profile = _get_cached(key)
+    if profile is None:
+        try:
+            profile = get_jd_profile(key)
+        except Exception as e:
+            logger.warning("Could not read job profile %s: %s", key[:12], e)
+        if profile is not None:
+            _cache_profile(key, profile)
+
+    usage = None
+    if profile is None:
+        try:
+            profile, model, usage = _analyze(job_description)
+        except Exception as e:
+            logger.warning("Job description analysis failed, using the full text: %s", e)
+            return {"text": job_description, "profile": None, "usage": None}
+        _cache_profile(key, profile)
+        try:
+            save_jd_profile(key, profile, model)
+        except Exception as e:
+            logger.warning("Could not save job profile %s: %s", key[:12], e)
+
+    text = format_profile(profile)
+    return {"text": text if len(text) < len(job_description) else job_description, "profile": profile, "usage": usage}
@@ -0,0 +1,258 @@
+import re
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor, wait
+from datetime import datetime, timezone
+
+from evaluation_cache import evaluation_key, get_cached_evaluation, cache_evaluation
+from prompts import INTERVIEW_SYSTEM_MESSAGE, build_coding_question_prompt, build_evaluation_prompt
+from providers import registry
+from question_pool import serve_from_pool
+from request_executor import scheduled_chat
+from sandbox import RUNNABLE_LANGUAGES, split_question_and_tests, sandbox_available, run_test_cases, summarize_results
+
+MOCK_MODEL = "gpt-4"
+
+SCORE_INSTRUCTIONS = """
+End your feedback with a final line in exactly this format: SCORE: <integer from 0 to 10>
+"""
+
+# Process-wide worker threads for question prefetch and evaluations of every session
+_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="mock-interview")
+
+
+def new_session(settings: dict, job_description: str, num_questions: int, duration_minutes: int, job_profile: str = None):
+    """
+    Create a mock interview session. Start its questions with prefetch_question().
+    Args:
+        settings (dict): language, difficulty, personality and complexity.
+        job_description (str): The candidate's job description.
+        num_questions (int): Number of questions in the session.
+        duration_minutes (int): Time allowed for the whole session.
+        job_profile (str): Compact profile of the job description (see jd_profile.py), sent in prompts instead of it.
+    Returns:
+        dict: The session, to be kept in st.session_state.
+    """
+    session = {
+        "id": str(uuid.uuid4()),
+        "settings": settings,
+        "job_description": job_description,
+        "job_profile": job_profile or job_description,
+        "num_questions": num_questions,
+        "duration_minutes": duration_minutes,
+        "started_at": time.time(),
+        "finished_at": None,
+        "current_index": 0,
+        "questions": [_new_slot() for _ in range(num_questions)]
+    }
+    return session
+
+
+def _new_slot():
+    return {
+        "question": None, "tests": None, "question_future": None,
+        "solution": None, "evaluation": None, "evaluation_future": None, "error": None
+    }
+
+
+def _generate_question(settings: dict, job_description: str, job_profile: str):
+    """Get a question from the prefetched pool, or generate one. Runs on a worker thread."""
+    pooled = serve_from_pool(settings["language"], settings["difficulty"], settings["personality"],
+                             settings["complexity"], job_description)
+    if pooled:
+        return {"question": pooled["question"], "tests": pooled["tests"], "usage": {
+            "model": pooled["model"], "input_tokens": pooled["input_tokens"], "output_tokens": pooled["output_tokens"]
+        }}
+
+    response = scheduled_chat(
+        "mock_interview",
+        MOCK_MODEL,
+        messages=[
+            {"role": "system", "content": INTERVIEW_SYSTEM_MESSAGE},
+            {"role": "user", "content": build_coding_question_prompt(
+                settings["language"], settings["difficulty"], settings["personality"],
+                settings["complexity"], job_profile
+            )}
+        ]
+    )
+    question, tests = split_question_and_tests(response.choices[0].message.content)
+    return {"question": question, "tests": tests, "usage": {
+        "model": registry.route("mock_interview", MOCK_MODEL),
+        "input_tokens": response.usage.prompt_tokens,
+        "output_tokens": response.usage.completion_tokens
+    }}
+
+
+def _evaluate(settings: dict, job_description: str, question: str, tests: dict, code: str):
+    """Run local tests, then ask the model for feedback and a score. Runs on a worker thread."""
+    cache_key = evaluation_key(question, code, settings["language"], settings["personality"], settings["difficulty"])
+    cached = get_cached_evaluation(cache_key)
+    if cached and "score" in cached:
+        return {**cached, "usage": None}
+
+    test_summary = "Local test run: not available for this language."
+    if tests and settings["language"] in RUNNABLE_LANGUAGES and sandbox_available():
+        test_summary = summarize_results(run_test_cases(code, tests))
+
+    prompt = build_evaluation_prompt(
+        settings["personality"], question, code, settings["language"], settings["difficulty"],
+        job_description, test_summary
+    ) + SCORE_INSTRUCTIONS
+    response = scheduled_chat(
+        "mock_interview",
+        MOCK_MODEL,
+        messages=[
+            {"role": "system", "content": INTERVIEW_SYSTEM_MESSAGE},
+            {"role": "user", "content": prompt}
+        ]
+    )
+    feedback = response.choices[0].message.content
+    evaluation = {
+        "feedback": re.sub(r"\n?\s*SCORE:\s*\d+\s*(/\s*10)?\s*$", "", feedback.strip()),
+        "score": parse_score(feedback),
+        "test_summary": test_summary
+    }
+    cache_evaluation(cache_key, evaluation)
+    return {
+        **evaluation,
+        "usage": {
+            "model": registry.route("mock_interview", MOCK_MODEL),
+            "input_tokens": response.usage.prompt_tokens,
+            "output_tokens": response.usage.completion_tokens
+        }
+    }
+
+
+def parse_score(feedback: str):
+    """Extract the 0-10 score from the feedback's final SCORE line, or None if missing"""
+    match = re.search(r"SCORE:\s*(\d+)", feedback)
+    if not match:
+        return None
+    return max(0, min(10, int(match.group(1))))
+
+
+def needs_prefetch(session: dict, index: int) -> bool:
+    """True if question `index` exists and is neither generated nor being generated"""
+    if index >= session["num_questions"]:
+        return False
+    slot = session["questions"][index]
+    return slot["question"] is None and slot["question_future"] is None and slot["error"] is None
+
+
+def prefetch_question(session: dict, index: int):
+    """Start generating question `index` in the background if it isn't already under way"""
+    if needs_prefetch(session, index):
+        slot = session["questions"][index]
+        slot["question_future"] = _executor.submit(
+            _generate_question, session["settings"], session["job_description"], session["job_profile"]
+        )
+
+
+def submit_answer(session: dict, code: str):
+    """
+    Queue the current answer for evaluation and move to the next question.
+    Args:
+        session (dict): The active session.
+        code (str): The candidate's solution to the current question.
+    """
+    slot = session["questions"][session["current_index"]]
+    slot["solution"] = code
+    slot["evaluation_future"] = _executor.submit(
+        _evaluate, session["settings"], session["job_profile"], slot["question"], slot["tests"], code
+    )
+    session["current_index"] += 1
+    if session["current_index"] >= session["num_questions"]:
+        session["finished_at"] = time.time()
+
+
+def collect(session: dict):
+    """
+    Move finished background results into the session. Call on every rerun from the main thread.
+    Returns:
+        list: Usage dicts (model, input_tokens, output_tokens) not yet charged to the user.
+    """
+    new_usage = []
+    for slot in session["questions"]:
+        future = slot["question_future"]
+        if future is not None and future.done():
+            slot["question_future"] = None
+            try:
+                result = future.result()
+                slot["question"], slot["tests"] = result["question"], result["tests"]
+                new_usage.append(result["usage"])
+            except Exception as e:
+                slot["question"] = None
+                slot["error"] = f"Error generating question: {e}"
+
+        future = slot["evaluation_future"]
+        if future is not None and future.done():
+            slot["evaluation_future"] = None
+            try:
+                slot["evaluation"] = future.result()
+                if slot["evaluation"]["usage"]:
+                    new_usage.append(slot["evaluation"]["usage"])
+            except Exception as e:
+                slot["evaluation"] = {"feedback": f"Error evaluating solution: {e}", "score": None,
+                                      "test_summary": "", "usage": None}
+    return new_usage
+
+
+def seconds_left(session: dict) -> int:
+    """Remaining time of the session in seconds (0 once the time is up)"""
+    return max(0, int(session["started_at"] + session["duration_minutes"] * 60 - time.time()))
+
+
+def finish_if_expired(session: dict):
+    """End the session when its time runs out; unanswered questions stay without a solution"""
+    if session["finished_at"] is None and seconds_left(session) == 0:
+        session["finished_at"] = time.time()
+
+
+def wait_for_question(session: dict, index: int, timeout: float = 120):
+    """Block until question `index` has been generated (or failed); results are picked up by collect()"""
+    future = session["questions"][index]["question_future"]
+    if future is not None:
+        wait([future], timeout=timeout)
+
+
+def wait_for_evaluations(session: dict, timeout: float = 180):
+    """Block until every queued evaluation has finished; results are picked up by collect()"""
+    wait([slot["evaluation_future"] for slot in session["questions"] if slot["evaluation_future"] is not None],
+         timeout=timeout)
+
+
+def to_iso(timestamp: float) -> str:
+    """UTC ISO-8601 string for a time.time() timestamp"""
+    return datetime.fromtimestamp(timestamp, timezone.utc).isoformat()
+
+
+def is_evaluating(session: dict) -> bool:
+    """True while any evaluation is still running in the background"""
+    return any(slot["evaluation_future"] is not None for slot in session["questions"])
+
+
+def aggregate_results(session: dict):
+    """
+    Combine the cached per-question evaluations into the end-of-session result.
+    Returns:
+        dict: overall_score (0-10 average over all questions, unanswered count as 0), answered and per-question details.
+    """
+    questions = []
+    scores = []
+    for i, slot in enumerate(session["questions"], start=1):
+        evaluation = slot["evaluation"] or {}
+        score = evaluation.get("score")
+        scores.append(score or 0)
+        questions.append({
+            "number": i,
+            "question": slot["question"],
+            "solution": slot["solution"],
+            "feedback": evaluation.get("feedback"),
+            "test_summary": evaluation.get("test_summary"),
+            "score": score
+        })
+    return {
+        "overall_score": round(sum(scores) / len(scores), 1) if scores else 0.0,
+        "answered": sum(1 for slot in session["questions"] if slot["solution"]),
+        "questions": questions
+    }
@@ -0,0 +1,111 @@
+import re
+
+STRONG_MODEL = "gpt-4"
+CHEAP_MODEL = "gpt-3.5-turbo"
+
+# Requests scoring at or above this go to the strong model
+DIFFICULTY_THRESHOLD = 0.4
+
+# When the user's spend quota covers only this many typical strong-model requests, only clearly hard
+# requests get the strong model
+LOW_BUDGET_STRONG_REQUESTS = 2
+LOW_BUDGET_THRESHOLD = 0.7
+
+HARD_TERMS = re.compile(
+    r"\b(architect\w*|design|distributed|scal\w+|optimi[sz]\w*|trade-?offs?|concurren\w*|"
+    r"race condition|deadlock|consisten\w+|complexity|prove|proof|algorithm\w*|refactor\w*|"
+    r"security|threat model\w*|migrat\w+|debug\w*|performance|latency|throughput|compare|versus|vs\.?)\b",
+    re.IGNORECASE
+)
+
+TECHNIQUE_WEIGHTS = {
+    "Zero Shot": 0.0,
+    "Few Shot": 0.05,
+    "Chain of Thought": 0.15,
+    "Self Consistency": 0.2,
+    "Tree of Thoughts": 0.25
+}
+
+MAX_RECENT_DECISIONS = 20
+
+
+def estimate_difficulty(feature: str, text: str, technique: str = None, detailed: bool = False, level: int = None) -> float:
+    """
+    Score how demanding a request is, from 0 (trivial) to 1 (hard).
+    Args:
+        feature (str): expert_chat, question_generator or interview_prep.
+        text (str): The user's input.
+        technique (str): Prompting technique, if any.
+        detailed (bool): Whether a detailed/comprehensive answer was requested.
+        level (int): Difficulty level from 1 to 5, if the feature has one.
+    Returns:
+        float: The difficulty score.
+    """
+    words = len(text.split())
+    score = min(0.3, words / 400)  # Longer inputs carry more context to reason about
+    score += min(0.3, 0.1 * len(HARD_TERMS.findall(text)))
+    score += TECHNIQUE_WEIGHTS.get(technique, 0.0)
+    if detailed:
+        score += 0.15
+    if level is not None:
+        score += 0.1 * (level - 1)
+    if "```" in text or re.search(r"\b(def|class|function|public|#include)\b", text):
+        score += 0.1
+    if feature == "interview_prep":
+        score += 0.1  # Code evaluation benefits from the stronger model
+    return round(min(1.0, score), 3)
+
+
+def route_request(feature: str, text: str, technique: str = None, detailed: bool = False, level: int = None,
+                  strong_requests_left: int = None):
+    """
+    Pick a model for a request in "Auto" mode.
+    Args:
+        strong_requests_left (int): Typical STRONG_MODEL requests the user's remaining spend quota still covers,
+            to save the strong model when the budget is low.
+        Other args: see estimate_difficulty().
+    Returns:
+        dict: model, difficulty and a short reason.
+    """
+    difficulty = estimate_difficulty(feature, text, technique, detailed, level)
+    threshold = DIFFICULTY_THRESHOLD
+    reason = "difficulty"
+    if strong_requests_left is not None and strong_requests_left <= LOW_BUDGET_STRONG_REQUESTS:
+        threshold = LOW_BUDGET_THRESHOLD
+        reason = "low budget"
+    model = STRONG_MODEL if difficulty >= threshold else CHEAP_MODEL
+    return {"model": model, "difficulty": difficulty, "reason": f"{reason}: {difficulty:.2f} vs {threshold:.2f}"}
+
+
+def new_route_stats():
+    """Empty routing statistics, kept per session"""
+    return {"models": {}, "recent": []}
+
+
+def record_outcome(stats: dict, feature: str, model: str, route: dict, latency: float, cost: float):
+    """
+    Record a finished request in the routing statistics.
+    Args:
+        stats (dict): Statistics from new_route_stats().
+        feature (str): The feature that made the request.
+        model (str): The model that served it.
+        route (dict): The router's decision, or None if the user picked the model.
+        latency (float): Seconds the request took.
+        cost (float): Cost of the request in USD.
+    """
+    entry = stats["models"].setdefault(model, {"calls": 0, "auto_calls": 0, "latency": 0.0, "cost": 0.0})
+    entry["calls"] += 1
+    entry["auto_calls"] += 1 if route else 0
+    entry["latency"] += latency
+    entry["cost"] += cost
+
+    stats["recent"].append({
+        "feature": feature,
+        "model": model,
+        "auto": route is not None,
+        "difficulty": route["difficulty"] if route else None,
+        "reason": route["reason"] if route else "manual",
+        "latency": round(latency, 3),
+        "cost": cost
+    })
+    del stats["recent"][:-MAX_RECENT_DECISIONS]
@@ -0,0 +1,133 @@
+import cProfile
+import os
+import pstats
+import threading
+import time
+
+# Where dumped .prof files go; open them with pstats, snakeviz or similar
+PROFILE_DIR = os.environ.get("APP_PROFILE_DIR", "profiles")
+
+# Dumped files kept in PROFILE_DIR; the oldest are deleted first
+MAX_PROFILE_FILES = int(os.environ.get("APP_PROFILE_MAX_FILES", "50"))
+
+# Flame breakdown: hide calls below this share of the run, and stop at this depth
+FLAME_MIN_SHARE = 0.01
+FLAME_MAX_DEPTH = 8
+TOP_FUNCTIONS = 15
+
+_state = threading.local()
+_dump_lock = threading.Lock()
+
+
+def function_label(func) -> str:
+    filename, line, name = func
+    if filename == "~":
+        return name  # Built-in
+    return f"{os.path.basename(filename)}:{line}({name})"
+
+
+def _callees(stats: dict):
+    callees = {}
+    for func, (_, _, _, _, callers) in stats.items():
+        for caller, (_, _, _, cumtime) in callers.items():
+            callees.setdefault(caller, []).append((func, cumtime))
+    return callees
+
+
+def flame_rows(stats: dict, root, total: float):
+    """
+    Call tree below root as (depth, label, milliseconds, share of the run) rows, largest children first.
+    Recursive calls are cut off at their first repetition.
+    """
+    callees = _callees(stats)
+    rows = []
+
+    def walk(func, cumtime, depth, path):
+        rows.append((depth, function_label(func), cumtime * 1000, cumtime / total if total else 0.0))
+        if depth >= FLAME_MAX_DEPTH:
+            return
+        for child, child_time in sorted(callees.get(func, []), key=lambda item: item[1], reverse=True):
+            if child in path or (total and child_time / total < FLAME_MIN_SHARE):
+                continue
+            walk(child, child_time, depth + 1, path | {child})
+
+    if root in stats:
+        walk(root, stats[root][3], 0, {root})
+    return rows
+
+
+def hot_functions(stats: dict, limit: int = TOP_FUNCTIONS):
+    """Functions with the most own time, as dicts for a table"""
+    ranked = sorted(stats.items(), key=lambda item: item[1][2], reverse=True)[:limit]
+    return [
+        {
+            "function": function_label(func),
+            "calls": calls,
+            "own ms": round(tottime * 1000, 2),
+            "cumulative ms": round(cumtime * 1000, 2)
+        }
+        for func, (_, calls, tottime, cumtime, _) in ranked
+    ]
+
+
+def dump_profile(profiler: cProfile.Profile, region: str) -> str:
+    """
+    Write a profile to PROFILE_DIR for offline comparison, then delete the oldest files beyond
+    MAX_PROFILE_FILES. Returns the file path.
+    """
+    with _dump_lock:
+        os.makedirs(PROFILE_DIR, exist_ok=True)
+        path = os.path.join(PROFILE_DIR, f"{time.strftime('%Y%m%d-%H%M%S')}-{int(time.time() * 1000) % 1000:03d}-{region}.prof")
+        profiler.dump_stats(path)
+        dumps = sorted(
+            (entry for entry in os.scandir(PROFILE_DIR) if entry.is_file() and entry.name.endswith(".prof")),
+            key=lambda entry: entry.stat().st_mtime
+        )
+        for entry in dumps[:max(0, len(dumps) - MAX_PROFILE_FILES)]:
+            try:
+                os.remove(entry.path)
+            except OSError:
+                pass
+    return path
+
+
+class RegionProfile:
+    """
+    Deterministic profile of one region run. Only the outermost region in a thread runs cProfile;
+    nested regions (a page inside main) are timed and reported in the outer region's summary.
+    """
+
+    def __init__(self, region: str, fn, dump: bool = False):
+        self.region = region
+        self.root = (fn.__code__.co_filename, fn.__code__.co_firstlineno, fn.__code__.co_name)
+        self.dump = dump
+        self.profiler = None
+        self.summary = None
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        if getattr(_state, "regions", None) is None:
+            _state.regions = []
+            self.profiler = cProfile.Profile()
+            self.profiler.enable()
+        return self
+
+    def __exit__(self, *exc_info):
+        elapsed = time.perf_counter() - self.started
+        if self.profiler is None:
+            _state.regions.append((self.region, elapsed * 1000))
+            return False
+        self.profiler.disable()
+        regions, _state.regions = _state.regions, None
+
+        stats = pstats.Stats(self.profiler).stats
+        self.summary = {
+            "region": self.region,
+            "at": time.strftime("%H:%M:%S"),
+            "total_ms": elapsed * 1000,
+            "regions": regions,
+            "flame": flame_rows(stats, self.root, elapsed),
+            "hot": hot_functions(stats),
+            "path": dump_profile(self.profiler, self.region) if self.dump else None
+        }
+        return False
@@ -0,0 +1,212 @@
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+
+# Blocked and redirected inputs are appended here as JSON lines so the rules can be tuned on real traffic
+FILTER_LOG_PATH = os.environ.get("PROMPT_FILTER_LOG", "prompt_filter_log.jsonl")
+
+MAX_INPUT_CHARS = {
+    "expert_chat": 4000,
+    "question_generator": 12000,
+    "interview_prep": 12000,
+    "solution": 20000
+}
+
+# Inputs shorter than this with no job or technical term at all are not treated as job descriptions.
+# Longer ones are only redirected on positive off-topic signals, since real descriptions can be terse.
+MIN_JD_WORDS = 3
+
+# Roles that only come up when someone tries to take the assistant out of its instructions
+_OVERRIDE_ROLES = (
+    r"(an? )?(dan|jailbroken|unrestricted|unfiltered|uncensored|evil"
+    r"|(different|unrestricted|unfiltered|uncensored) (ai|assistant|model|chatbot)"
+    r"|ai (with|without) no (rules|restrictions|filters)|in (developer|dan) mode)\b"
+)
+
+# Imperative injection phrasing only: job descriptions and chat naturally say "you are now joining"
+# or "act as the technical lead". Not applied to submitted code.
+INJECTION_PATTERNS = [
+    r"ignore (all |any )?(the )?(previous|prior|above|earlier|your) (instructions|prompts?|rules|guidelines)",
+    r"disregard (all |any )?(the )?(previous|prior|above|your) (instructions|prompts?|rules|guidelines)",
+    r"forget (all |everything )?(you were told|your instructions|previous instructions)",
+    r"(reveal|show|print|repeat|leak) (me )?(your|the) (system )?(prompt|instructions)",
+    r"\byou are now " + _OVERRIDE_ROLES,
+    r"\b(pretend (to be|you are)|act as|behave as) " + _OVERRIDE_ROLES,
+    r"\b(jailbreak|developer mode|dan mode|do anything now)\b",
+    r"<\s*/?\s*(system|assistant)\s*>",
+]
+
+# Parts of a logged excerpt that may identify someone
+_REDACT_PATTERNS = [
+    (r"[\w.+-]+@[\w-]+(\.[\w-]+)+", "<email>"),
+    (r"\+?\d[\d\s().-]{6,}\d", "<number>"),
+    (r"https?://\S+", "<url>"),
+]
+LOG_EXCERPT_CHARS = 80
+
+ABUSIVE_PATTERNS = [
+    r"\bf+u+c+k+(ing|er|ed)?\b",
+    r"\bsh[i1]t+(ty)?\b",
+    r"\bbitch(es)?\b",
+    r"\bassholes?\b",
+    r"\bcunts?\b",
+    r"\b(kill|hurt) (yourself|myself|someone|people)\b",
+    r"\bhow to (make|build) (a )?(bomb|weapon|explosive)s?\b",
+]
+
+ON_TOPIC_TERMS = {
+    "algorithm", "api", "architecture", "aws", "azure", "backend", "bug", "career", "ci", "cloud", "code",
+    "coding", "complexity", "container", "cv", "data", "database", "debug", "deploy", "deployment", "design",
+    "devops", "docker", "engineer", "engineering", "experience", "framework", "frontend", "function", "gcp",
+    "git", "hiring", "infrastructure", "interview", "java", "javascript", "job", "kubernetes", "latency",
+    "learning", "linux", "microservice", "microservices", "ml", "model", "network", "offer", "performance",
+    "pipeline", "project", "python", "query", "react", "recruiter", "resume", "salary", "scalability",
+    "scale", "security", "server", "skills", "software", "sql", "system", "test", "testing", "typescript",
+    "vulnerability", "web"
+}
+
+OFF_TOPIC_TERMS = {
+    "astrology", "bet", "betting", "celebrity", "casino", "dating", "diet", "election", "football", "gossip",
+    "horoscope", "lottery", "movie", "movies", "poem", "politics", "president", "recipe", "recipes",
+    "religion", "soccer", "song", "weather", "zodiac"
+}
+
+JD_TERMS = {
+    "ability", "benefits", "degree", "develop", "developer", "engineer", "experience", "knowledge",
+    "qualifications", "requirements", "responsibilities", "responsible", "role", "skills", "team",
+    "years", "you", "we", "work", "working"
+}
+
+REDIRECT_MESSAGES = {
+    "expert_chat": "I can only help with professional and technical topics for your expert. Could you rephrase your question around that?",
+    "question_generator": "Please paste a job description so I can generate interview questions for it.",
+    "interview_prep": "Please paste a job description so I can tailor the coding question to it.",
+    "solution": "Please submit code for the coding question."
+}
+
+_model = None
+_log_lock = threading.Lock()
+
+
+def register_model(model):
+    """
+    Plug in an extra local classifier.
+    Args:
+        model (callable): model(text, feature) -> float between 0 (on topic) and 1 (off topic / abusive).
+            Pass None to go back to rules only.
+    """
+    global _model
+    _model = model
+
+
+def _words(text: str):
+    return re.findall(r"[a-z][a-z0-9\+#]*", text.lower())
+
+
+def _decision(action: str, reason: str, feature: str, score: float = 0.0):
+    message = None
+    if action == "reject":
+        message = {
+            "empty": "Please enter some text first.",
+            "too_long": "Your input is too long. Please shorten it and try again.",
+            "injection": "This request tries to change the assistant's instructions and can't be processed.",
+            "abusive": "This request contains abusive or harmful content and can't be processed.",
+        }.get(reason, "This request can't be processed.")
+    elif action == "redirect":
+        message = REDIRECT_MESSAGES.get(feature, REDIRECT_MESSAGES["expert_chat"])
+    return {"allowed": action == "allow", "action": action, "reason": reason, "score": round(score, 3), "message": message}
+
+
+def classify(text: str, feature: str):
+    """
+    Decide locally whether an input is worth sending to the model.
+    Args:
+        text (str): The user's input (chat message, job description or code).
+        feature (str): expert_chat, question_generator, interview_prep or solution.
+    Returns:
+        dict: allowed, action ("allow", "reject" or "redirect"), reason, score and a user-facing message.
+    """
+    if not text or not text.strip():
+        return _decision("reject", "empty", feature)
+    if len(text) > MAX_INPUT_CHARS.get(feature, 4000):
+        return _decision("reject", "too_long", feature)
+
+    # Code is judged by the sandbox and the evaluator, not by word lists: it may legitimately contain
+    # "<system>", "act as" or identifiers that look like swear words, and is only evaluated, never followed
+    if feature == "solution":
+        return _decision("allow", "ok", feature)
+
+    lowered = text.lower()
+    if any(re.search(pattern, lowered) for pattern in INJECTION_PATTERNS):
+        return _decision("reject", "injection", feature, 1.0)
+    if any(re.search(pattern, lowered) for pattern in ABUSIVE_PATTERNS):
+        return _decision("reject", "abusive", feature, 1.0)
+
+    words = _words(text)
+    on_topic = sum(1 for word in words if word in ON_TOPIC_TERMS)
+    off_topic = sum(1 for word in words if word in OFF_TOPIC_TERMS)
+
+    if feature in ("question_generator", "interview_prep"):
+        signals = on_topic + sum(1 for word in set(words) if word in JD_TERMS)
+        score = off_topic / (off_topic + signals) if off_topic else 0.0
+        if not signals and (off_topic or len(words) < MIN_JD_WORDS):
+            return _decision("redirect", "not_a_job_description", feature, score)
+    else:
+        # Short follow-ups ("why?", "show an example") are fine; only clear off-topic requests are redirected
+        score = off_topic / (off_topic + on_topic) if off_topic else 0.0
+        if off_topic and not on_topic:
+            return _decision("redirect", "off_topic", feature, score)
+
+    if _model is not None:
+        score = max(score, float(_model(text, feature)))
+        if score >= 0.8:
+            return _decision("redirect", "model", feature, score)
+
+    return _decision("allow", "ok", feature, score)
+
+
+def redacted_excerpt(text: str) -> str:
+    """The start of an input with emails, phone numbers and URLs masked, for the tuning log"""
+    excerpt = (text or "")[:LOG_EXCERPT_CHARS]
+    for pattern, replacement in _REDACT_PATTERNS:
+        excerpt = re.sub(pattern, replacement, excerpt)
+    return excerpt
+
+
+def log_decision(decision: dict, text: str, feature: str, user_id=None):
+    """
+    Append a blocked or redirected input to the tuning log, as a hash and a short redacted excerpt.
+    Allowed inputs are not logged. Logging problems never block the request.
+    """
+    if decision["allowed"]:
+        return
+    entry = {
+        "ts": time.time(),
+        "feature": feature,
+        "user_id": user_id,
+        "action": decision["action"],
+        "reason": decision["reason"],
+        "score": decision["score"],
+        "chars": len(text or ""),
+        "sha256": hashlib.sha256((text or "").encode()).hexdigest(),
+        "excerpt": redacted_excerpt(text)
+    }
+    try:
+        with _log_lock, open(FILTER_LOG_PATH, "a", encoding="utf-8") as log_file:
+            log_file.write(json.dumps(entry) + "\n")
+    except OSError:
+        pass
+
+
+def check_input(text: str, feature: str, user_id=None):
+    """
+    Classify an input and log the decision. Call before checking quota or calling a provider.
+    Returns:
+        dict: See classify().
+    """
+    decision = classify(text, feature)
+    log_decision(decision, text, feature, user_id)
+    return decision
@@ -0,0 +1,152 @@
+import copy
+import json
+import os
+import threading
+from dataclasses import dataclass, field
+
+import httpx
+import openai
+
+# JSON file that adds or overrides providers, models and feature routes (see providers.example.json)
+PROVIDERS_FILE = os.environ.get("LLM_PROVIDERS_FILE", "providers.json")
+
+DEFAULT_CONFIG = {
+    # "rpm" and "tpm" are the limits the rate-limit scheduler assumes until a response reports the real ones;
+    # leave them out for providers without limits (e.g. local servers)
+    "providers": {
+        "openai": {
+            "base_url": None, "api_key_env": "OPENAI_API_KEY", "timeout": 60.0, "max_connections": 20,
+            "rpm": int(os.environ.get("OPENAI_RPM_LIMIT", "500")), "tpm": int(os.environ.get("OPENAI_TPM_LIMIT", "30000"))
+        }
+    },
+    # Model names used in the app -> provider, upstream model name and price per 1K tokens
+    "models": {
+        "gpt-4": {"provider": "openai", "input": 0.03, "output": 0.06},
+        "gpt-3.5-turbo": {"provider": "openai", "input": 0.0015, "output": 0.002},
+        "dall-e-3": {"provider": "openai", "type": "image"}
+    },
+    # Feature -> model that serves it regardless of the model the code or the user picked
+    "features": {}
+}
+
+_clients_lock = threading.Lock()
+
+
+@dataclass(slots=True)
+class Provider:
+    """An OpenAI-compatible endpoint with its own pooled HTTP clients"""
+    name: str
+    base_url: str = None
+    api_key: str = None
+    api_key_env: str = None
+    timeout: float = 60.0
+    max_connections: int = 20
+    rpm: int = None
+    tpm: int = None
+    _client: object = field(default=None, repr=False)
+    _async_client: object = field(default=None, repr=False)
+
+    def _api_key(self):
+        # Read when the client is created, so keys loaded from Streamlit secrets after import are found
+        api_key = self.api_key or (os.environ.get(self.api_key_env) if self.api_key_env else None)
+        # Local servers often need no key, but the client requires one; OpenAI itself fails fast without one
+        return api_key or ("unused" if self.base_url else None)
+
+    def _limits(self):
+        return httpx.Limits(max_connections=self.max_connections, max_keepalive_connections=self.max_connections)
+
+    def client(self) -> openai.OpenAI:
+        """Blocking client, created on first use and shared by every thread"""
+        with _clients_lock:
+            if self._client is None:
+                # Retries are handled by resilience.retry_call(), with backoff and circuit breakers
+                self._client = openai.OpenAI(
+                    base_url=self.base_url, api_key=self._api_key(), timeout=self.timeout, max_retries=0,
+                    http_client=httpx.Client(limits=self._limits(), timeout=self.timeout)
+                )
+            return self._client
+
+    def async_client(self) -> openai.AsyncOpenAI:
+        """Async client, created on first use; only use it from the request executor's event loop"""
+        with _clients_lock:
+            if self._async_client is None:
+                self._async_client = openai.AsyncOpenAI(
+                    base_url=self.base_url, api_key=self._api_key(), timeout=self.timeout, max_retries=0,
+                    http_client=httpx.AsyncClient(limits=self._limits(), timeout=self.timeout)
+                )
+            return self._async_client
+
+
+def _load_config(path: str) -> dict:
+    config = copy.deepcopy(DEFAULT_CONFIG)
+    if path and os.path.exists(path):
+        with open(path, encoding="utf-8") as config_file:
+            overrides = json.load(config_file)
+        for section in ("providers", "models", "features"):
+            config[section].update(overrides.get(section, {}))
+    for alias, model in config["models"].items():
+        if model.get("provider") not in config["providers"]:
+            raise ValueError(f"Model {alias!r} uses unknown provider {model.get('provider')!r}")
+    for feature, alias in config["features"].items():
+        if alias not in config["models"]:
+            raise ValueError(f"Feature {feature!r} is routed to unknown model {alias!r}")
+    return config
+
+
+class ProviderRegistry:
+    """Process-wide providers, model aliases and per-feature routes"""
+
+    def __init__(self, path: str = PROVIDERS_FILE):
+        config = _load_config(path)
+        self.models = config["models"]
+        self.features = config["features"]
+        self.providers = {}
+        for name, settings in config["providers"].items():
+            self.providers[name] = Provider(
+                name=name,
+                base_url=settings.get("base_url"),
+                api_key=settings.get("api_key"),
+                api_key_env=settings.get("api_key_env"),
+                timeout=float(settings.get("timeout", 60.0)),
+                max_connections=int(settings.get("max_connections", 20)),
+                rpm=int(settings["rpm"]) if settings.get("rpm") else None,
+                tpm=int(settings["tpm"]) if settings.get("tpm") else None
+            )
+
+    def resolve(self, model: str):
+        """
+        Provider and upstream model name of a model alias. Unknown names go to OpenAI unchanged.
+        Returns:
+            tuple: (Provider, upstream model name)
+        """
+        entry = self.models.get(model)
+        if entry is None:
+            return self.providers["openai"], model
+        return self.providers[entry["provider"]], entry.get("model", model)
+
+    def limits(self, model: str):
+        """
+        Requests and tokens per minute assumed for a model, from its provider's config.
+        Returns:
+            tuple: (rpm, tpm); None where the provider sets no limit.
+        """
+        provider, _ = self.resolve(model)
+        return provider.rpm, provider.tpm
+
+    def route(self, feature: str, model: str) -> str:
+        """The model that serves a feature: its configured route, or the model asked for"""
+        return self.features.get(feature, model)
+
+    def chat_models(self):
+        """Aliases of the chat models, for model pickers"""
+        return [alias for alias, entry in self.models.items() if entry.get("type", "chat") == "chat"]
+
+    def prices(self):
+        """Price per 1K input and output tokens of each chat model"""
+        return {
+            alias: {"input": entry.get("input", 0.0), "output": entry.get("output", 0.0)}
+            for alias, entry in self.models.items() if entry.get("type", "chat") == "chat"
+        }
+
+
+registry = ProviderRegistry()
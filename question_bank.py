@@ -0,0 +1,128 @@
+import hashlib
+import json
+import re
+from collections import Counter
+
+# Words that carry no signal when searching the bank for a job description
+STOPWORDS = {
+    "a", "about", "across", "an", "and", "any", "are", "as", "at", "be", "been", "best", "both",
+    "but", "by", "can", "candidate", "company", "do", "experience", "for", "from", "good", "have",
+    "help", "in", "including", "into", "is", "it", "its", "job", "join", "looking", "more", "must",
+    "new", "of", "on", "or", "other", "our", "plus", "preferred", "required", "requirements",
+    "responsibilities", "role", "skills", "strong", "team", "that", "the", "their", "this", "to",
+    "us", "using", "we", "well", "what", "will", "with", "work", "working", "years", "you", "your"
+}
+
+# A bank question is served for a job description only if it contains at least this many of the
+# description's keywords (see jd_search_terms), so one shared common word like "python" is not enough
+MIN_JD_TERM_MATCHES = 3
+
+QUESTION_JSON_INSTRUCTIONS = """
+Return ONLY a JSON object with this exact shape and no extra text:
+{"questions": [{"text": "...", "tags": ["...", "..."]}]}
+- "text": the full interview question.
+- "tags": 2-5 short lowercase skill or technology keywords the question covers.
+"""
+
+
+def normalize_question(text: str) -> str:
+    """
+    Normalize question text so trivial differences don't create duplicates.
+    Args:
+        text (str): Raw question text.
+    Returns:
+        str: Lowercased text without numbering, punctuation or extra whitespace.
+    """
+    text = text.lower().strip()
+    text = re.sub(r"^(q(uestion)?\s*)?\d+[\.\):]\s*", "", text)  # Drop "1.", "Q2)", "Question 3:"
+    text = re.sub(r"[^\w\s]", " ", text)
+    return re.sub(r"\s+", " ", text).strip()
+
+
+def question_hash(text: str) -> str:
+    """Hash of the normalized question text, used as the bank's dedupe key"""
+    return hashlib.sha256(normalize_question(text).encode()).hexdigest()
+
+
+def parse_generated_questions(content: str, style: str, difficulty: str):
+    """
+    Parse the model's JSON answer into structured questions.
+    Falls back to one question per numbered line if the model ignored the JSON format.
+    Args:
+        content (str): Raw model response.
+        style (str): Requested question style, stored on every question.
+        difficulty (str): Requested difficulty, stored on every question.
+    Returns:
+        list: Dicts with text, style, difficulty and tags keys.
+    """
+    raw_questions = []
+    match = re.search(r"\{.*\}", content, re.DOTALL)
+    if match:
+        try:
+            raw_questions = json.loads(match.group(0)).get("questions", [])
+        except (json.JSONDecodeError, AttributeError):
+            raw_questions = []
+
+    if not raw_questions:
+        raw_questions = [
+            {"text": re.sub(r"^\s*\d+[\.\)]\s*", "", line).strip()}
+            for line in content.splitlines()
+            if re.match(r"^\s*\d+[\.\)]\s+", line)
+        ]
+
+    questions = []
+    for item in raw_questions:
+        if isinstance(item, str):
+            item = {"text": item}
+        text = str(item.get("text", "")).strip()
+        if not text:
+            continue
+        tags = item.get("tags") or []
+        questions.append({
+            "text": text,
+            # The requested values, not the model's wording, so the bank's exact filters find the question again
+            "style": style,
+            "difficulty": difficulty,
+            "tags": [str(tag).lower().strip() for tag in tags if str(tag).strip()][:5]
+        })
+    return questions
+
+
+def dedupe_questions(questions):
+    """
+    Drop questions whose normalized text was already seen and attach the hash to each.
+    Args:
+        questions (list): Structured questions.
+    Returns:
+        list: Unique questions, each with a "question_hash" key.
+    """
+    seen = set()
+    unique = []
+    for question in questions:
+        digest = question_hash(question["text"])
+        if digest in seen:
+            continue
+        seen.add(digest)
+        unique.append({**question, "question_hash": digest})
+    return unique
+
+
+def jd_search_terms(jd_text: str, max_terms: int = 8):
+    """
+    Pick the most frequent meaningful keywords from a job description.
+    Args:
+        jd_text (str): The pasted job description.
+        max_terms (int): How many keywords to keep.
+    Returns:
+        list: Keywords ordered by frequency.
+    """
+    words = re.findall(r"[a-zA-Z][a-zA-Z0-9\+#\.]{1,}", jd_text.lower())
+    words = [word.strip(".") for word in words]
+    counts = Counter(word for word in words if word and word not in STOPWORDS and (len(word) > 2 or not word.isalpha()))
+    return [word for word, _ in counts.most_common(max_terms)]
+
+
+def format_question(question: dict, number: int) -> str:
+    """Render a structured question as a markdown list entry"""
+    tags = f" _({', '.join(question['tags'])})_" if question.get("tags") else ""
+    return f"{number}. {question['text']}{tags}"
@@ -0,0 +1,304 @@
+"""
+Offline bulk generation of question-bank questions through the OpenAI Batch API (half the price of
+interactive calls, results within 24 hours). Runs outside Streamlit:
+
+    python question_batch.py run roles.txt --styles Technical "System Design" --questions 10
+    python question_batch.py resume batches/20261019-120000     # poll and ingest a submitted batch later
+    python question_batch.py run roles.txt --local               # dry run: local stand-in, nothing saved
+
+roles.txt holds one role or job description per line. Each (role, style, difficulty) becomes one request.
+"""
+import argparse
+import itertools
+import json
+import os
+import time
+import uuid
+
+from providers import registry
+from prompts import QUESTION_GENERATOR_SYSTEM_MESSAGE, build_question_request
+from question_bank import parse_generated_questions, dedupe_questions, jd_search_terms
+from supabase_helpers import save_questions
+
+BATCH_DIR = os.environ.get("QUESTION_BATCH_DIR", "batches")
+BATCH_MODEL = "gpt-4"
+BATCH_ENDPOINT = "/v1/chat/completions"
+COMPLETION_WINDOW = "24h"
+
+POLL_SECONDS = 60.0
+INGEST_CHUNK_SIZE = 200
+
+STYLES = ("Technical", "Behavioral", "System Design", "Problem Solving")
+DIFFICULTIES = ("Basic", "Comprehensive")
+
+# Batch states after which polling stops
+FINAL_STATES = ("completed", "failed", "expired", "cancelled")
+
+
+def build_jobs(roles, styles=STYLES, difficulties=DIFFICULTIES, num_questions: int = 10):
+    """
+    One generation job per (role, style, difficulty).
+    Returns:
+        list: Dicts with custom_id, role, style, difficulty and num_questions.
+    """
+    return [
+        {"custom_id": f"q{index}", "role": role, "style": style, "difficulty": difficulty, "num_questions": num_questions}
+        for index, (role, style, difficulty) in enumerate(itertools.product(roles, styles, difficulties))
+    ]
+
+
+def batch_request(job: dict, model: str = BATCH_MODEL) -> dict:
+    """The Batch API request line of one job, with the same prompts as the Question Generator page"""
+    return {
+        "custom_id": job["custom_id"],
+        "method": "POST",
+        "url": BATCH_ENDPOINT,
+        "body": {
+            "model": registry.resolve(model)[1],
+            "messages": [
+                {"role": "system", "content": QUESTION_GENERATOR_SYSTEM_MESSAGE},
+                {"role": "user", "content": build_question_request(
+                    job["num_questions"], job["style"], job["difficulty"], job["role"]
+                )}
+            ]
+        }
+    }
+
+
+def write_requests(path: str, jobs, model: str = BATCH_MODEL):
+    """Write the JSONL request file of a batch"""
+    with open(path, "w", encoding="utf-8") as requests_file:
+        for job in jobs:
+            requests_file.write(json.dumps(batch_request(job, model)) + "\n")
+
+
+class OpenAIBatch:
+    """The Batch API of a provider from the registry"""
+
+    def __init__(self, provider: str = "openai"):
+        self.client = registry.providers[provider].client()
+
+    def submit(self, requests_path: str) -> str:
+        with open(requests_path, "rb") as requests_file:
+            uploaded = self.client.files.create(file=requests_file, purpose="batch")
+        batch = self.client.batches.create(
+            input_file_id=uploaded.id,
+            endpoint=BATCH_ENDPOINT,
+            completion_window=COMPLETION_WINDOW,
+            metadata={"job": "question_bank"}
+        )
+        return batch.id
+
+    def status(self, batch_id: str) -> dict:
+        batch = self.client.batches.retrieve(batch_id)
+        counts = batch.request_counts
+        return {
+            "status": batch.status,
+            "completed": counts.completed if counts else 0,
+            "failed": counts.failed if counts else 0,
+            "total": counts.total if counts else 0
+        }
+
+    def results(self, batch_id: str):
+        """Output lines of a completed batch, streamed from the provider"""
+        batch = self.client.batches.retrieve(batch_id)
+        if not batch.output_file_id:
+            return
+        with self.client.files.with_streaming_response.content(batch.output_file_id) as response:
+            yield from response.iter_lines()
+
+
+def sample_completion(body: dict) -> str:
+    """Deterministic stand-in answer in the format the question prompt asks for"""
+    request = body["messages"][-1]["content"]
+    style = request.split("(style: ", 1)[-1].split(",", 1)[0]
+    difficulty = request.split("difficulty: ", 1)[-1].split(")", 1)[0]
+    count = int(request.split()[1]) if request.split()[1].isdigit() else 1
+    terms = jd_search_terms(request.split("job description:", 1)[-1], max_terms=3) or ["software"]
+    return json.dumps({"questions": [
+        {
+            "text": f"[sample] {style} question {number + 1} about {' and '.join(terms)}?",
+            "style": style,
+            "difficulty": difficulty,
+            "tags": terms
+        }
+        for number in range(count)
+    ]})
+
+
+class LocalBatch:
+    """
+    Stand-in for the Batch API that answers every request locally, for tests and dry runs.
+    Batches complete on the first status check; output lines have the provider's format.
+    """
+
+    def __init__(self, directory: str, complete=sample_completion):
+        self.directory = directory
+        self.complete = complete
+
+    def _path(self, batch_id: str, kind: str) -> str:
+        return os.path.join(self.directory, f"{batch_id}.{kind}.jsonl")
+
+    def submit(self, requests_path: str) -> str:
+        batch_id = f"local_{uuid.uuid4().hex[:12]}"
+        os.makedirs(self.directory, exist_ok=True)
+        with open(requests_path, encoding="utf-8") as source, open(self._path(batch_id, "input"), "w", encoding="utf-8") as copy:
+            copy.write(source.read())
+        return batch_id
+
+    def status(self, batch_id: str) -> dict:
+        output_path = self._path(batch_id, "output")
+        if not os.path.exists(output_path):
+            with open(self._path(batch_id, "input"), encoding="utf-8") as requests_file, \
+                    open(output_path, "w", encoding="utf-8") as output:
+                for number, line in enumerate(requests_file):
+                    request = json.loads(line)
+                    content = self.complete(request["body"])
+                    prompt_tokens = sum(len(message["content"]) for message in request["body"]["messages"]) // 4
+                    output.write(json.dumps({
+                        "id": f"batch_req_{number}",
+                        "custom_id": request["custom_id"],
+                        "response": {"status_code": 200, "body": {
+                            "object": "chat.completion",
+                            "model": request["body"]["model"],
+                            "choices": [{"index": 0, "message": {"role": "assistant", "content": content},
+                                         "finish_reason": "stop"}],
+                            "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": len(content) // 4}
+                        }},
+                        "error": None
+                    }) + "\n")
+        with open(output_path, encoding="utf-8") as output:
+            total = sum(1 for _ in output)
+        return {"status": "completed", "completed": total, "failed": 0, "total": total}
+
+    def results(self, batch_id: str):
+        with open(self._path(batch_id, "output"), encoding="utf-8") as output:
+            yield from output
+
+
+def wait_for_batch(backend, batch_id: str, poll_seconds: float = POLL_SECONDS, report=print) -> dict:
+    """Poll until the batch reaches a final state. Returns its last status."""
+    while True:
+        status = backend.status(batch_id)
+        report(f"Batch {batch_id}: {status['status']} ({status['completed']}/{status['total']} done, "
+               f"{status['failed']} failed)")
+        if status["status"] in FINAL_STATES:
+            return status
+        time.sleep(poll_seconds)
+
+
+def dry_run_save(questions: list):
+    """Stand-in for save_questions() that stores nothing"""
+    return questions
+
+
+def ingest_results(lines, jobs_by_id: dict, save=save_questions, chunk_size: int = INGEST_CHUNK_SIZE) -> dict:
+    """
+    Parse batch output lines into questions and save them to the bank in chunks.
+    Questions already in the bank are skipped by save_questions().
+    Returns:
+        dict: Requests answered and failed, questions parsed and saved, and tokens used.
+    """
+    summary = {"answered": 0, "failed": 0, "parsed": 0, "saved": 0, "input_tokens": 0, "output_tokens": 0}
+    chunk = []
+    seen = set()
+    for line in lines:
+        if not line.strip():
+            continue
+        result = json.loads(line)
+        job = jobs_by_id.get(result.get("custom_id"))
+        response = result.get("response") or {}
+        if job is None or result.get("error") or response.get("status_code") != 200:
+            summary["failed"] += 1
+            continue
+        body = response["body"]
+        summary["answered"] += 1
+        summary["input_tokens"] += body.get("usage", {}).get("prompt_tokens", 0)
+        summary["output_tokens"] += body.get("usage", {}).get("completion_tokens", 0)
+        questions = parse_generated_questions(body["choices"][0]["message"]["content"], job["style"], job["difficulty"])
+        for question in dedupe_questions(questions):
+            if question["question_hash"] in seen:
+                continue
+            seen.add(question["question_hash"])
+            summary["parsed"] += 1
+            chunk.append(question)
+        if len(chunk) >= chunk_size:
+            summary["saved"] += len(save(chunk))
+            chunk = []
+    summary["saved"] += len(save(chunk))
+    return summary
+
+
+def run_batch(roles, styles=STYLES, difficulties=DIFFICULTIES, num_questions: int = 10, model: str = BATCH_MODEL,
+              backend=None, directory: str = None, poll_seconds: float = POLL_SECONDS, save=save_questions,
+              report=print) -> dict:
+    """
+    Write the requests, submit them, wait for the batch and ingest the questions.
+    The job is recorded in `directory`, so an interrupted run can be finished with resume_batch().
+    Returns:
+        dict: The ingest summary (see ingest_results), or the batch status if it did not complete.
+    """
+    directory = directory or os.path.join(BATCH_DIR, time.strftime("%Y%m%d-%H%M%S"))
+    provider = registry.resolve(model)[0].name
+    backend = backend or OpenAIBatch(provider)
+    os.makedirs(directory, exist_ok=True)
+    jobs = build_jobs(roles, styles, difficulties, num_questions)
+    requests_path = os.path.join(directory, "requests.jsonl")
+    write_requests(requests_path, jobs, model)
+    batch_id = backend.submit(requests_path)
+    with open(os.path.join(directory, "job.json"), "w", encoding="utf-8") as job_file:
+        json.dump({"batch_id": batch_id, "provider": provider, "local": isinstance(backend, LocalBatch), "jobs": jobs},
+                  job_file)
+    report(f"Submitted {len(jobs)} request(s) as batch {batch_id}; job saved in {directory}")
+    return resume_batch(directory, backend, poll_seconds, save, report)
+
+
+def resume_batch(directory: str, backend=None, poll_seconds: float = POLL_SECONDS, save=save_questions,
+                 report=print) -> dict:
+    """Wait for the batch recorded in `directory` and ingest its results"""
+    with open(os.path.join(directory, "job.json"), encoding="utf-8") as job_file:
+        job = json.load(job_file)
+    if backend is None:
+        backend = LocalBatch(directory) if job["local"] else OpenAIBatch(job.get("provider", "openai"))
+    status = wait_for_batch(backend, job["batch_id"], poll_seconds, report)
+    if status["status"] != "completed":
+        return status
+    summary = ingest_results(backend.results(job["batch_id"]), {item["custom_id"]: item for item in job["jobs"]}, save)
+    report(f"{summary['answered']} answered, {summary['failed']} failed; {summary['parsed']} question(s) parsed, "
+           f"{summary['saved']} new in the bank ({summary['input_tokens']} input + "
+           f"{summary['output_tokens']} output tokens)")
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+    run = commands.add_parser("run", help="Submit a new batch and ingest it when done")
+    run.add_argument("roles", help="File with one role or job description per line")
+    run.add_argument("--styles", nargs="+", default=list(STYLES))
+    run.add_argument("--difficulties", nargs="+", default=list(DIFFICULTIES))
+    run.add_argument("--questions", type=int, default=10, help="Questions per request")
+    run.add_argument("--model", default=BATCH_MODEL)
+    run.add_argument("--dir", help="Job directory (default: a new one under QUESTION_BATCH_DIR)")
+    run.add_argument("--local", action="store_true", help="Use the local stand-in instead of OpenAI")
+    resume = commands.add_parser("resume", help="Wait for a submitted batch and ingest it")
+    resume.add_argument("dir")
+    for command in (run, resume):
+        command.add_argument("--poll", type=float, default=POLL_SECONDS, help="Seconds between status checks")
+    args = parser.parse_args()
+
+    if args.command == "resume":
+        with open(os.path.join(args.dir, "job.json"), encoding="utf-8") as job_file:
+            local = json.load(job_file)["local"]
+        resume_batch(args.dir, poll_seconds=args.poll, save=dry_run_save if local else save_questions)
+        return
+    with open(args.roles, encoding="utf-8") as roles_file:
+        roles = [line.strip() for line in roles_file if line.strip()]
+    directory = args.dir or os.path.join(BATCH_DIR, time.strftime("%Y%m%d-%H%M%S"))
+    run_batch(roles, args.styles, args.difficulties, args.questions, args.model,
+              backend=LocalBatch(directory) if args.local else None, directory=directory, poll_seconds=args.poll,
+              save=dry_run_save if args.local else save_questions)
+
+
+if __name__ == "__main__":
+    main()
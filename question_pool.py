@@ -0,0 +1,116 @@
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from prompts import INTERVIEW_SYSTEM_MESSAGE, build_coding_question_prompt
+from providers import registry
+from question_bank import jd_search_terms
+from request_executor import scheduled_chat
+from sandbox import split_question_and_tests
+from supabase_helpers import count_pool_questions, claim_pool_question, save_pool_questions
+
+logger = logging.getLogger(__name__)
+
+# Ready questions kept per bucket, and the level that triggers a refill
+POOL_TARGET_SIZE = 3
+POOL_LOW_WATERMARK = 1
+POOL_MODEL = "gpt-4"
+
+# Process-wide: shared by every Streamlit session served by this server
+_refill_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="question-pool")
+_refilling = set()
+_refilling_lock = threading.Lock()
+
+
+def bucket_key(language: str, difficulty: int, personality: str, complexity: str) -> str:
+    """Key of the pool bucket holding questions for one combination of interview settings"""
+    return f"{language}|{difficulty}|{personality}|{complexity}"
+
+
+def generate_pool_question(language: str, difficulty: int, personality: str, complexity: str):
+    """
+    Generate one generic (not job-specific) coding question for the pool.
+    Runs on a background thread, so it must not touch st.session_state.
+    Returns:
+        dict: Row for the 'coding_question_pool' table.
+    """
+    response = scheduled_chat(
+        "question_pool",
+        POOL_MODEL,
+        messages=[
+            {"role": "system", "content": INTERVIEW_SYSTEM_MESSAGE},
+            {"role": "user", "content": build_coding_question_prompt(language, difficulty, personality, complexity)}
+        ]
+    )
+    question, tests = split_question_and_tests(response.choices[0].message.content)
+    return {
+        "bucket_key": bucket_key(language, difficulty, personality, complexity),
+        "question": question,
+        "tests": tests,
+        # The model that answered, so the user is billed at its price (scheduled_chat() applies the route)
+        "model": registry.route("question_pool", POOL_MODEL),
+        "input_tokens": response.usage.prompt_tokens,
+        "output_tokens": response.usage.completion_tokens
+    }
+
+
+def _refill(language: str, difficulty: int, personality: str, complexity: str):
+    key = bucket_key(language, difficulty, personality, complexity)
+    try:
+        missing = POOL_TARGET_SIZE - count_pool_questions(key)
+        rows = [generate_pool_question(language, difficulty, personality, complexity) for _ in range(max(0, missing))]
+        save_pool_questions(rows)
+    except Exception as e:
+        logger.warning("Question pool refill failed for %s: %s", key, e)
+    finally:
+        with _refilling_lock:
+            _refilling.discard(key)
+
+
+def refill_async(language: str, difficulty: int, personality: str, complexity: str, available: int = None):
+    """
+    Top the bucket back up to POOL_TARGET_SIZE in the background if it is at or below the watermark.
+    At most one refill per bucket runs at a time.
+    Args:
+        available (int): Known number of ready questions, to skip the count query.
+    """
+    key = bucket_key(language, difficulty, personality, complexity)
+    if available is not None and available > POOL_LOW_WATERMARK:
+        return
+    with _refilling_lock:
+        if key in _refilling:
+            return
+        _refilling.add(key)
+    _refill_executor.submit(_refill, language, difficulty, personality, complexity)
+
+
+def serve_from_pool(language: str, difficulty: int, personality: str, complexity: str, job_description: str):
+    """
+    Claim a ready question from the pool, personalize it for the job description and schedule a refill.
+    Args:
+        job_description (str): The candidate's job description.
+    Returns:
+        dict: The claimed pool row with "question" personalized, or None if the bucket is empty.
+    """
+    key = bucket_key(language, difficulty, personality, complexity)
+    row = claim_pool_question(key)
+    refill_async(language, difficulty, personality, complexity,
+                 available=None if row is None else row.get("remaining"))
+    if row is None:
+        return None
+    return {**row, "question": personalize_question(row["question"], job_description)}
+
+
+def personalize_question(question: str, job_description: str) -> str:
+    """
+    Frame a generic pool question for the candidate's job description without another model call.
+    Args:
+        question (str): The generic question text.
+        job_description (str): The candidate's job description.
+    Returns:
+        str: The question with a short role-specific introduction.
+    """
+    terms = jd_search_terms(job_description, max_terms=5)
+    if not terms:
+        return question
+    return f"_For a role working with {', '.join(terms)}:_\n\n{question}"
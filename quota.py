@@ -0,0 +1,155 @@
+import atexit
+import logging
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from supabase_helpers import charge_user_quota
+
+logger = logging.getLogger(__name__)
+
+# Dollars of OpenAI spend a user may build up to; the bucket refills at this amount per day
+DAILY_BUDGET = float(os.environ.get("USER_DAILY_BUDGET", "0.50"))
+REFILL_SECONDS = 24 * 3600
+
+# Local spend is pushed to Supabase, and the shared level pulled back, about this often per user
+RECONCILE_SECONDS = 30.0
+
+_reconcile_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="quota-sync")
+
+
+class _Bucket:
+    """Local copy of a user's spend bucket, plus spend not yet pushed to Supabase"""
+
+    def __init__(self, level: float):
+        self.level = level
+        self.updated = time.monotonic()
+        self.pending = 0.0
+        # (request id, amount) of a push that may or may not have reached Supabase; resent with the same id
+        self.unsent = None
+        self.synced = time.monotonic()
+        self.syncing = False
+
+    @property
+    def dirty(self) -> bool:
+        return self.pending > 0 or self.unsent is not None
+
+    def refill(self, now: float, capacity: float, rate: float):
+        self.level = min(capacity, self.level + (now - self.updated) * rate)
+        self.updated = now
+
+
+class SpendQuota:
+    """
+    Process-wide per-user spend quota: a token bucket in dollars that refills continuously.
+    Checks and charges are local; each process reconciles with the shared bucket in Supabase in the background,
+    so the limit holds across processes within about RECONCILE_SECONDS of spend. Spend still pending is pushed
+    by a background loop every RECONCILE_SECONDS and when the process exits.
+    """
+
+    def __init__(self, capacity: float = DAILY_BUDGET, refill_seconds: float = REFILL_SECONDS):
+        self.capacity = capacity
+        self.rate = capacity / refill_seconds
+        self.lock = threading.Lock()
+        self.buckets = {}
+        self._sync_thread = None
+
+    def _load(self, user_id) -> _Bucket:
+        """Bucket of a user this process has not seen yet, read from Supabase (one query)"""
+        try:
+            level = charge_user_quota(user_id, 0.0, self.capacity, self.rate)
+        except Exception as e:
+            logger.warning("Could not read spend quota of user %s: %s", user_id, e)
+            level = None
+        with self.lock:
+            if user_id not in self.buckets:
+                self.buckets[user_id] = _Bucket(self.capacity if level is None else level)
+            return self.buckets[user_id]
+
+    def _bucket(self, user_id) -> _Bucket:
+        with self.lock:
+            bucket = self.buckets.get(user_id)
+        return bucket or self._load(user_id)
+
+    def remaining(self, user_id) -> float:
+        """Dollars the user can spend right now"""
+        bucket = self._bucket(user_id)
+        with self.lock:
+            bucket.refill(time.monotonic(), self.capacity, self.rate)
+            return bucket.level
+
+    def allows(self, user_id, cost: float) -> bool:
+        """True if the user's bucket covers a request estimated at `cost` dollars"""
+        return self.remaining(user_id) >= cost
+
+    def charge(self, user_id, cost: float):
+        """Take actual spend from the user's bucket; Supabase is updated in the background"""
+        if cost <= 0:
+            return
+        bucket = self._bucket(user_id)
+        with self.lock:
+            bucket.refill(time.monotonic(), self.capacity, self.rate)
+            bucket.level -= cost
+            bucket.pending += cost
+            due = not bucket.syncing and time.monotonic() - bucket.synced >= RECONCILE_SECONDS
+            if self._sync_thread is None:
+                self._sync_thread = threading.Thread(target=self._sync_loop, name="quota-sync-loop", daemon=True)
+                self._sync_thread.start()
+        if due:
+            _reconcile_executor.submit(self.reconcile, user_id)
+
+    def reconcile(self, user_id):
+        """
+        Push this process's pending spend to the shared bucket and adopt the shared level.
+        Each push carries a request id, and a push that failed is resent with the same id and amount,
+        so a charge that reached Supabase before its response was lost is not applied twice.
+        """
+        with self.lock:
+            bucket = self.buckets.get(user_id)
+            if bucket is None or bucket.syncing:
+                return
+            bucket.syncing = True
+            if bucket.unsent is None:
+                bucket.unsent = (str(uuid.uuid4()), bucket.pending)
+                bucket.pending = 0.0
+            request_id, amount = bucket.unsent
+        try:
+            level = charge_user_quota(user_id, amount, self.capacity, self.rate, request_id)
+        except Exception as e:
+            logger.warning("Spend quota sync failed for user %s: %s", user_id, e)
+            level = None
+        with self.lock:
+            if level is not None:
+                bucket.unsent = None
+                # Spend charged while the request was in flight is still pending locally
+                bucket.level = level - bucket.pending
+                bucket.updated = time.monotonic()
+            bucket.synced = time.monotonic()
+            bucket.syncing = False
+
+    def _sync_loop(self):
+        # Pushes spend that no later charge would push, e.g. the end of a burst
+        while True:
+            time.sleep(RECONCILE_SECONDS)
+            self.flush(due_only=True)
+
+    def flush(self, due_only: bool = False):
+        """
+        Push all pending spend now; runs when the process exits.
+        Args:
+            due_only (bool): Only users not synced for RECONCILE_SECONDS.
+        """
+        now = time.monotonic()
+        with self.lock:
+            user_ids = [
+                user_id for user_id, bucket in self.buckets.items()
+                if bucket.dirty and not (due_only and now - bucket.synced < RECONCILE_SECONDS)
+            ]
+        for user_id in user_ids:
+            self.reconcile(user_id)
+
+
+quota = SpendQuota()
+atexit.register(quota.flush)
@@ -0,0 +1,249 @@
+import asyncio
+import heapq
+import itertools
+import re
+import threading
+import time
+
+from providers import registry
+
+# Lower number = served first when the OpenAI budget is tight
+PRIORITIES = {
+    "interactive": 0,
+    "title": 1,
+    "background": 2
+}
+
+FEATURE_PRIORITY = {
+    "expert_chat": "interactive",
+    "question_generator": "interactive",
+    "interview_prep": "interactive",
+    "jd_profile": "interactive",
+    "chat_title": "title",
+    "question_pool": "background",
+    "mock_interview": "background"
+}
+
+# Share of the per-minute budget that must stay free after a request of this priority is sent,
+# so interactive turns still find room when background work fills the queue
+RESERVED_SHARE = {
+    "interactive": 0.0,
+    "title": 0.1,
+    "background": 0.3
+}
+
+# At most this many seconds' worth of the per-minute budget may be sent in one burst
+BURST_SECONDS = 6.0
+
+POLL_SECONDS = 0.05
+
+
+def parse_reset(value) -> float:
+    """Seconds from an x-ratelimit-reset-* header such as "1s", "6m0s" or "20ms"; None if unparseable"""
+    if not value:
+        return None
+    total = 0.0
+    parts = re.findall(r"(\d+(?:\.\d+)?)(ms|s|m|h)", str(value))
+    if not parts:
+        try:
+            return float(value)
+        except ValueError:
+            return None
+    for amount, unit in parts:
+        total += float(amount) * {"ms": 0.001, "s": 1, "m": 60, "h": 3600}[unit]
+    return total
+
+
+def _header_int(headers, name):
+    try:
+        return int(headers.get(name))
+    except (TypeError, ValueError):
+        return None
+
+
+class _Budget:
+    """
+    Request and token budget of one model: a burst-sized bucket refilled at the per-minute rate.
+    A limit of None (the provider sets none and no response has reported one) never makes a request wait.
+    """
+
+    def __init__(self, rpm: int = None, tpm: int = None):
+        self.rpm = rpm
+        self.tpm = tpm
+        self.requests = self.request_burst
+        self.tokens = self.token_burst
+        self.updated = time.monotonic()
+        # What the server says is left in its window, and when that window resets
+        self.server_requests = None
+        self.server_tokens = None
+        self.server_reset = 0.0
+
+    @property
+    def request_burst(self) -> float:
+        return max(1.0, self.rpm * BURST_SECONDS / 60) if self.rpm else 0.0
+
+    @property
+    def token_burst(self) -> float:
+        return max(1.0, self.tpm * BURST_SECONDS / 60) if self.tpm else 0.0
+
+    def refill(self, now: float):
+        elapsed = now - self.updated
+        self.updated = now
+        if self.rpm:
+            self.requests = min(self.request_burst, self.requests + elapsed * self.rpm / 60)
+        if self.tpm:
+            self.tokens = min(self.token_burst, self.tokens + elapsed * self.tpm / 60)
+        if now >= self.server_reset:
+            self.server_requests = self.server_tokens = None
+
+    def wait_time(self, tokens: int, priority: str) -> float:
+        """Seconds until a request of this size and priority fits the budget; 0 if it fits now"""
+        reserve = RESERVED_SHARE.get(priority, 0.0)
+        wait = 0.0
+        if self.rpm:
+            needed_requests = min(self.request_burst, 1 + reserve * self.request_burst) - self.requests
+            wait = max(wait, needed_requests * 60 / self.rpm)
+        if self.tpm:
+            # A request larger than the burst can never fit the bucket; let it through once the bucket is full
+            tokens = min(tokens, self.token_burst * (1 - reserve))
+            needed_tokens = tokens + reserve * self.token_burst - self.tokens
+            wait = max(wait, needed_tokens * 60 / self.tpm)
+        if self.server_requests is not None and self.server_tokens is not None:
+            if self.server_requests < 1 + reserve * (self.rpm or 0) or \
+                    self.server_tokens < tokens + reserve * (self.tpm or 0):
+                wait = max(wait, self.server_reset - time.monotonic())
+        return wait
+
+    def take(self, tokens: int):
+        if self.rpm:
+            self.requests -= 1
+        if self.tpm:
+            self.tokens -= tokens
+        if self.server_requests is not None:
+            self.server_requests -= 1
+            self.server_tokens -= tokens
+
+
+class RateLimitScheduler:
+    """
+    Process-wide provider request scheduler. Requests wait in one priority queue per model and are
+    released in priority order (FIFO within a priority) as the request and token budget allows.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.budgets = {}
+        self.queues = {}
+        self.counter = itertools.count()
+
+    def _budget(self, model: str) -> _Budget:
+        if model not in self.budgets:
+            self.budgets[model] = _Budget(*registry.limits(model))
+            self.queues[model] = []
+        return self.budgets[model]
+
+    def _enqueue(self, model: str, priority: str):
+        with self.lock:
+            self._budget(model)
+            ticket = (PRIORITIES.get(priority, len(PRIORITIES)), next(self.counter))
+            heapq.heappush(self.queues[model], ticket)
+            return ticket
+
+    def _try_dispatch(self, model: str, ticket, tokens: int, priority: str) -> float:
+        """Take budget for the ticket if it is first in line and fits; returns seconds to wait (0 = go)"""
+        with self.lock:
+            queue = self.queues[model]
+            if queue[0] != ticket:
+                return POLL_SECONDS
+            budget = self.budgets[model]
+            budget.refill(time.monotonic())
+            wait = budget.wait_time(tokens, priority)
+            if wait > 0:
+                return min(wait, 1.0)
+            budget.take(tokens)
+            heapq.heappop(queue)
+            return 0.0
+
+    def _leave(self, model: str, ticket):
+        with self.lock:
+            queue = self.queues[model]
+            if ticket in queue:
+                queue.remove(ticket)
+                heapq.heapify(queue)
+
+    def acquire(self, model: str, tokens: int, priority: str = "interactive"):
+        """Block until a request of about `tokens` tokens may be sent to `model`"""
+        ticket = self._enqueue(model, priority)
+        try:
+            while True:
+                wait = self._try_dispatch(model, ticket, tokens, priority)
+                if wait == 0:
+                    return
+                time.sleep(wait)
+        finally:
+            self._leave(model, ticket)
+
+    async def acquire_async(self, model: str, tokens: int, priority: str = "interactive"):
+        """acquire() for the event loop; a cancelled waiter leaves the queue without using budget"""
+        ticket = self._enqueue(model, priority)
+        try:
+            while True:
+                wait = self._try_dispatch(model, ticket, tokens, priority)
+                if wait == 0:
+                    return
+                await asyncio.sleep(wait)
+        finally:
+            self._leave(model, ticket)
+
+    def update(self, model: str, headers):
+        """Learn the account's limits and remaining budget from OpenAI's x-ratelimit-* response headers"""
+        if not headers:
+            return
+        limit_requests = _header_int(headers, "x-ratelimit-limit-requests")
+        limit_tokens = _header_int(headers, "x-ratelimit-limit-tokens")
+        remaining_requests = _header_int(headers, "x-ratelimit-remaining-requests")
+        remaining_tokens = _header_int(headers, "x-ratelimit-remaining-tokens")
+        reset = max(parse_reset(headers.get("x-ratelimit-reset-requests")) or 0.0,
+                    parse_reset(headers.get("x-ratelimit-reset-tokens")) or 0.0)
+        with self.lock:
+            budget = self._budget(model)
+            budget.refill(time.monotonic())
+            if limit_requests:
+                if not budget.rpm:
+                    budget.requests = max(1.0, limit_requests * BURST_SECONDS / 60)
+                budget.rpm = limit_requests
+            if limit_tokens:
+                if not budget.tpm:
+                    budget.tokens = max(1.0, limit_tokens * BURST_SECONDS / 60)
+                budget.tpm = limit_tokens
+            budget.requests = min(budget.requests, budget.request_burst)
+            budget.tokens = min(budget.tokens, budget.token_burst)
+            if remaining_requests is not None and remaining_tokens is not None:
+                budget.server_requests = remaining_requests
+                budget.server_tokens = remaining_tokens
+                budget.server_reset = time.monotonic() + reset
+
+    def snapshot(self):
+        """Current budget and queue length per model, for diagnostics"""
+        with self.lock:
+            now = time.monotonic()
+            for budget in self.budgets.values():
+                budget.refill(now)
+            return {
+                model: {
+                    "rpm": budget.rpm,
+                    "tpm": budget.tpm,
+                    "queued": len(self.queues[model]),
+                    "server_requests": budget.server_requests,
+                    "server_tokens": budget.server_tokens
+                }
+                for model, budget in self.budgets.items()
+            }
+
+
+scheduler = RateLimitScheduler()
+
+
+def priority_for(feature: str) -> str:
+    """Scheduling priority of a feature's requests"""
+    return FEATURE_PRIORITY.get(feature, "interactive")
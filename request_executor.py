@@ -0,0 +1,267 @@
+import asyncio
+import hashlib
+import json
+import os
+import threading
+import time
+
+import openai
+
+from providers import registry
+from rate_limiter import scheduler, priority_for
+from resilience import retry_call, retry_call_async
+
+# Latency SLA per feature, in seconds. A request still running after its SLA gets a hedge request.
+# Override one with LATENCY_SLA_<FEATURE> in the environment, e.g. LATENCY_SLA_EXPERT_CHAT=45.
+LATENCY_SLAS = {
+    "expert_chat": 30.0,
+    "chat_title": 3.0,
+    "question_generator": 25.0,
+    "interview_prep": 25.0,
+    "jd_profile": 8.0
+}
+DEFAULT_SLA = 15.0
+
+# Give up on a request (all attempts) after this many seconds
+HARD_TIMEOUT_SECONDS = 60.0
+
+# Which model the hedge request uses: the same model, or a cheaper one. Switching to a cheaper model is
+# opt-in per request (execute_chat's hedge_policy), e.g. for Auto-routed chats, never for an explicit pick.
+HEDGE_POLICY = {
+    "expert_chat": "same",
+    "chat_title": "same",
+    "question_generator": "same",
+    "interview_prep": "same",
+    "jd_profile": "same"
+}
+CHEAPER_MODEL = {
+    "gpt-4": "gpt-3.5-turbo",
+    "gpt-3.5-turbo": "gpt-3.5-turbo"
+}
+
+# Completion tokens counted against the TPM budget when a request sets no max_tokens
+DEFAULT_COMPLETION_TOKENS = 500
+
+# One event loop thread for the whole process, so losing attempts can really be cancelled
+_loop = None
+_loop_lock = threading.Lock()
+
+# Identical requests in flight across all sessions, by request_key(): they share one call
+_inflight = {}
+_inflight_lock = threading.Lock()
+
+
+def _get_loop():
+    global _loop
+    with _loop_lock:
+        if _loop is None:
+            _loop = asyncio.new_event_loop()
+            threading.Thread(target=_loop.run_forever, name="request-executor", daemon=True).start()
+    return _loop
+
+
+def _endpoint(model: str) -> str:
+    """Circuit breaker name of a model, so each provider and model fails independently"""
+    provider, _ = registry.resolve(model)
+    return f"{provider.name}.chat:{model}"
+
+
+def estimate_prompt_tokens(messages: list) -> int:
+    """Rough prompt size (about 4 characters per token), for attempts cancelled before they returned usage"""
+    return sum(len(message.get("content") or "") for message in messages) // 4 + 4 * len(messages)
+
+
+def estimate_request_tokens(messages: list, params: dict) -> int:
+    """Tokens a request may use against the TPM limit: the prompt plus the completion it may generate"""
+    return estimate_prompt_tokens(messages) + (params.get("max_tokens") or DEFAULT_COMPLETION_TOKENS)
+
+
+async def _scheduled_create(model: str, messages: list, params: dict, priority: str):
+    """One provider call: wait for the rate-limit scheduler, then learn the remaining budget from the headers"""
+    await scheduler.acquire_async(model, estimate_request_tokens(messages, params), priority)
+    provider, upstream_model = registry.resolve(model)
+    try:
+        raw = await provider.async_client().chat.completions.with_raw_response.create(
+            model=upstream_model, messages=messages, **params
+        )
+    except openai.APIStatusError as e:
+        scheduler.update(model, e.response.headers)
+        raise
+    scheduler.update(model, raw.headers)
+    return raw.parse()
+
+
+def scheduled_chat(feature: str, model: str, messages: list, **params):
+    """
+    Blocking chat completion for background work (pool refills, mock interview prefetches): no hedging,
+    but the same retries, circuit breaker and rate-limit scheduling as execute_chat().
+    Returns:
+        The completion response.
+    """
+    priority = priority_for(feature)
+    model = registry.route(feature, model)
+    provider, upstream_model = registry.resolve(model)
+
+    def create():
+        scheduler.acquire(model, estimate_request_tokens(messages, params), priority)
+        try:
+            raw = provider.client().chat.completions.with_raw_response.create(
+                model=upstream_model, messages=messages, **params
+            )
+        except openai.APIStatusError as e:
+            scheduler.update(model, e.response.headers)
+            raise
+        scheduler.update(model, raw.headers)
+        return raw.parse()
+
+    return retry_call(_endpoint(model), create)
+
+
+def request_key(feature: str, model: str, messages: list, params: dict) -> str:
+    """Hash identifying identical requests, for single-flight deduplication"""
+    payload = json.dumps([feature, model, messages, params], sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _forget_inflight(key: str, future):
+    with _inflight_lock:
+        if _inflight.get(key) is future:
+            del _inflight[key]
+
+
+def sla_for(feature: str) -> float:
+    """Latency SLA of a feature in seconds, from the environment or LATENCY_SLAS"""
+    configured = os.environ.get(f"LATENCY_SLA_{feature.upper()}")
+    return float(configured) if configured else LATENCY_SLAS.get(feature, DEFAULT_SLA)
+
+
+def hedge_model_for(model: str, policy: str) -> str:
+    """Model used for the hedge request under a hedge policy ("same" or "cheaper")"""
+    if policy == "cheaper":
+        return CHEAPER_MODEL.get(model, model)
+    return model
+
+
+async def _attempt(role: str, model: str, messages: list, params: dict, priority: str, attempts: list):
+    entry = {"role": role, "model": model, "status": "running", "response": None, "latency": None}
+    attempts.append(entry)
+    started = time.perf_counter()
+    try:
+        entry["response"] = await retry_call_async(
+            _endpoint(model), _scheduled_create, model, messages, params, priority
+        )
+        entry["status"] = "done"
+        return entry
+    except asyncio.CancelledError:
+        entry["status"] = "cancelled"
+        raise
+    except Exception:
+        entry["status"] = "failed"
+        raise
+    finally:
+        entry["latency"] = time.perf_counter() - started
+
+
+async def _hedged_request(feature: str, model: str, messages: list, params: dict, hedge_policy: str):
+    sla = sla_for(feature)
+    priority = priority_for(feature)
+    deadline = time.perf_counter() + HARD_TIMEOUT_SECONDS
+    attempts = []
+
+    pending = {asyncio.create_task(_attempt("primary", model, messages, params, priority, attempts))}
+    done, _ = await asyncio.wait(pending, timeout=sla)
+    if not done:
+        # Primary missed its SLA: race it against a hedge request
+        pending.add(asyncio.create_task(
+            _attempt("hedge", hedge_model_for(model, hedge_policy), messages, params, priority, attempts)
+        ))
+
+    winner = None
+    error = None
+    while pending and winner is None:
+        done, pending = await asyncio.wait(
+            pending, timeout=max(0.0, deadline - time.perf_counter()), return_when=asyncio.FIRST_COMPLETED
+        )
+        if not done:
+            error = TimeoutError(f"No response within {HARD_TIMEOUT_SECONDS:.0f}s")
+            break
+        for task in done:
+            if task.exception() is not None:
+                error = task.exception()
+            elif winner is None:
+                winner = task.result()
+
+    for task in pending:
+        task.cancel()
+    await asyncio.gather(*pending, return_exceptions=True)
+
+    if winner is None:
+        raise error
+    return winner, attempts
+
+
+def execute_chat(feature: str, model: str, messages: list, hedge_policy: str = None, **params):
+    """
+    Run a chat completion under the feature's latency SLA (see sla_for).
+    If the primary request misses its SLA, a hedge request is fired and the first successful answer wins;
+    the other attempt is cancelled. Every attempt waits its turn in the process-wide rate-limit scheduler,
+    at the feature's priority.
+    Identical concurrent requests (same feature, model, messages and parameters), from any session,
+    attach to the call already in flight instead of making their own.
+    Args:
+        feature (str): The calling feature, selects the SLA, hedge policy and any configured model route.
+        model (str): The primary model, unless the feature is routed to another one (see providers.py).
+        messages (list): Chat messages.
+        hedge_policy (str): "same" or "cheaper" model for the hedge request; defaults to the feature's HEDGE_POLICY.
+        **params: Extra completion parameters (temperature, max_tokens, ...).
+    Returns:
+        dict: response and model of the winning attempt, hedged flag, switched (True if a cheaper hedge
+              answered instead of the primary model), latency,
+              extra_attempts (the other attempts, with their real or estimated token usage) and
+              shared (True if this caller attached to another caller's request).
+    """
+    started = time.perf_counter()
+    model = registry.route(feature, model)
+    hedge_policy = hedge_policy or HEDGE_POLICY.get(feature, "same")
+    key = request_key(feature, model, messages, {**params, "hedge_policy": hedge_policy})
+    with _inflight_lock:
+        future = _inflight.get(key)
+        shared = future is not None
+        if not shared:
+            future = asyncio.run_coroutine_threadsafe(
+                _hedged_request(feature, model, messages, params, hedge_policy), _get_loop()
+            )
+            _inflight[key] = future
+    if not shared:
+        # Outside the lock: the callback runs right away if the request already finished
+        future.add_done_callback(lambda done: _forget_inflight(key, done))
+    winner, attempts = future.result()
+
+    extra_attempts = []
+    for attempt in attempts:
+        # Extra attempts are charged to the caller that started the request
+        if attempt is winner or shared:
+            continue
+        usage = attempt["response"].usage if attempt["response"] is not None else None
+        # A cancelled attempt keeps generating (and billing) on the provider's side, so it is charged for an
+        # answer as long as the winner's (both share max_tokens); failed attempts are not billed
+        cancelled = attempt["status"] == "cancelled"
+        estimated_output = winner["response"].usage.completion_tokens if cancelled and winner["response"].usage else 0
+        extra_attempts.append({
+            "role": attempt["role"],
+            "model": attempt["model"],
+            "status": attempt["status"],
+            "input_tokens": usage.prompt_tokens if usage else (estimate_prompt_tokens(messages) if cancelled else 0),
+            "output_tokens": usage.completion_tokens if usage else estimated_output,
+            "estimated": usage is None
+        })
+
+    return {
+        "response": winner["response"],
+        "model": winner["model"],
+        "hedged": len(attempts) > 1,
+        "switched": winner["model"] != model,
+        "latency": time.perf_counter() - started,
+        "extra_attempts": extra_attempts,
+        "shared": shared
+    }
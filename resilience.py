@@ -0,0 +1,237 @@
+import asyncio
+import functools
+import random
+import threading
+import time
+
+# Retry policy shared by provider and Supabase calls
+MAX_ATTEMPTS = 4
+BASE_DELAY_SECONDS = 0.5
+MAX_DELAY_SECONDS = 8.0
+MAX_RETRY_AFTER_SECONDS = 20.0
+
+# A circuit opens after this many consecutive failures and stays open for the cooldown
+FAILURE_THRESHOLD = 5
+COOLDOWN_SECONDS = 30.0
+
+RETRYABLE_STATUS_CODES = {408, 409, 425, 429, 500, 502, 503, 504}
+
+# postgrest errors carry the Postgres SQLSTATE, not the HTTP status. These are transient:
+# connection failures (class 08), serialization failures, deadlocks, too many connections,
+# shutdowns and statement timeouts. A prefix of two characters matches the whole class.
+RETRYABLE_SQLSTATES = ("08", "40001", "40P01", "53300", "57P01", "57P02", "57P03", "57014")
+
+
+class CircuitOpenError(Exception):
+    """Raised without calling the endpoint while its circuit breaker is open"""
+
+    def __init__(self, endpoint: str, retry_in: float):
+        super().__init__(f"{endpoint} is temporarily unavailable, please try again in {max(1, int(retry_in))}s.")
+        self.endpoint = endpoint
+        self.retry_in = retry_in
+
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker for one endpoint, shared by every session in the process"""
+
+    def __init__(self, endpoint: str):
+        self.endpoint = endpoint
+        self.failures = 0
+        self.opened_at = None
+        self.trial_running = False
+        self.lock = threading.Lock()
+
+    def before_call(self):
+        """Raise CircuitOpenError unless a call may go through (closed, or a single half-open trial)"""
+        with self.lock:
+            if self.opened_at is None:
+                return
+            waited = time.monotonic() - self.opened_at
+            if waited < COOLDOWN_SECONDS or self.trial_running:
+                raise CircuitOpenError(self.endpoint, COOLDOWN_SECONDS - waited)
+            self.trial_running = True
+
+    def record_success(self):
+        with self.lock:
+            self.failures = 0
+            self.opened_at = None
+            self.trial_running = False
+
+    def release_trial(self):
+        """Let another half-open trial through when this one was abandoned (e.g. cancelled)"""
+        with self.lock:
+            self.trial_running = False
+
+    def record_failure(self):
+        with self.lock:
+            self.failures += 1
+            self.trial_running = False
+            if self.failures >= FAILURE_THRESHOLD or self.opened_at is not None:
+                self.opened_at = time.monotonic()
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        return "half-open" if time.monotonic() - self.opened_at >= COOLDOWN_SECONDS else "open"
+
+
+_breakers = {}
+_breakers_lock = threading.Lock()
+
+
+def get_breaker(endpoint: str) -> CircuitBreaker:
+    """The process-wide circuit breaker of an endpoint"""
+    with _breakers_lock:
+        if endpoint not in _breakers:
+            _breakers[endpoint] = CircuitBreaker(endpoint)
+        return _breakers[endpoint]
+
+
+def breaker_states():
+    """Current state of every circuit breaker, for diagnostics"""
+    with _breakers_lock:
+        return {endpoint: breaker.state for endpoint, breaker in _breakers.items()}
+
+
+def _status_code(error):
+    status = getattr(error, "status_code", None)
+    if status is None and getattr(error, "response", None) is not None:
+        status = getattr(error.response, "status_code", None)
+    if status is None and isinstance(getattr(error, "code", None), int):
+        # postgrest puts the HTTP status in `code` only when the response body was not a JSON error,
+        # e.g. a gateway error page; otherwise `code` is a SQLSTATE string
+        status = error.code
+    return status
+
+
+def _sqlstate(error):
+    code = getattr(error, "code", None)
+    return code if isinstance(code, str) and len(code) == 5 else None
+
+
+def is_retryable(error) -> bool:
+    """Transient errors worth retrying: rate limits, server errors, timeouts and connection problems"""
+    if isinstance(error, CircuitOpenError):
+        return False
+    status = _status_code(error)
+    if status is not None:
+        return status in RETRYABLE_STATUS_CODES
+    sqlstate = _sqlstate(error)
+    if sqlstate is not None:
+        return sqlstate.startswith(RETRYABLE_SQLSTATES)
+    if isinstance(error, (TimeoutError, ConnectionError)):
+        return True
+    name = type(error).__name__
+    return "Timeout" in name or "Connect" in name or name in ("RemoteProtocolError", "ReadError")
+
+
+def retry_after(error):
+    """Seconds requested by a Retry-After (or retry-after-ms) response header, if any"""
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None)
+    if not headers:
+        return None
+    try:
+        if headers.get("retry-after-ms"):
+            return float(headers["retry-after-ms"]) / 1000
+        if headers.get("retry-after"):
+            return float(headers["retry-after"])
+    except (TypeError, ValueError):
+        return None
+    return None
+
+
+def backoff_delay(attempt: int, error=None) -> float:
+    """Full-jitter exponential backoff, overridden by the server's Retry-After when it gives one"""
+    requested = retry_after(error) if error is not None else None
+    if requested is not None:
+        return min(requested, MAX_RETRY_AFTER_SECONDS)
+    return random.uniform(0, min(MAX_DELAY_SECONDS, BASE_DELAY_SECONDS * 2 ** attempt))
+
+
+def retry_call(endpoint: str, fn, *args, **kwargs):
+    """
+    Call fn(*args, **kwargs) with retries and the endpoint's circuit breaker.
+    Args:
+        endpoint (str): Name of the endpoint, e.g. "openai.images" or "supabase".
+        fn (callable): The call to make.
+    Returns:
+        Whatever fn returns.
+    Raises:
+        CircuitOpenError: If the endpoint's circuit is open.
+        Exception: The last error once retries are exhausted or the error isn't transient.
+    """
+    breaker = get_breaker(endpoint)
+    for attempt in range(MAX_ATTEMPTS):
+        breaker.before_call()
+        try:
+            result = fn(*args, **kwargs)
+        except Exception as e:
+            if not is_retryable(e):
+                breaker.record_success()  # The endpoint answered; the request itself was bad
+                raise
+            breaker.record_failure()
+            if attempt == MAX_ATTEMPTS - 1:
+                raise
+            time.sleep(backoff_delay(attempt, e))
+        else:
+            breaker.record_success()
+            return result
+
+
+async def retry_call_async(endpoint: str, fn, *args, **kwargs):
+    """Async version of retry_call() for coroutine functions; cancellation interrupts the backoff sleep"""
+    breaker = get_breaker(endpoint)
+    for attempt in range(MAX_ATTEMPTS):
+        breaker.before_call()
+        try:
+            result = await fn(*args, **kwargs)
+        except asyncio.CancelledError:
+            breaker.release_trial()
+            raise
+        except Exception as e:
+            if not is_retryable(e):
+                breaker.record_success()  # The endpoint answered; the request itself was bad
+                raise
+            breaker.record_failure()
+            if attempt == MAX_ATTEMPTS - 1:
+                raise
+            await asyncio.sleep(backoff_delay(attempt, e))
+        else:
+            breaker.record_success()
+            return result
+
+
+def call_once(endpoint: str, fn, *args, **kwargs):
+    """
+    Call fn(*args, **kwargs) once, through the endpoint's circuit breaker.
+    For writes that must not run twice: a timeout may come after the write committed.
+    """
+    breaker = get_breaker(endpoint)
+    breaker.before_call()
+    try:
+        result = fn(*args, **kwargs)
+    except Exception as e:
+        if is_retryable(e):
+            breaker.record_failure()
+        else:
+            breaker.record_success()  # The endpoint answered; the request itself was bad
+        raise
+    breaker.record_success()
+    return result
+
+
+def resilient(endpoint: str, retry: bool = True):
+    """
+    Decorator applying retry_call() to every call of a function.
+    Use retry=False for inserts and other non-idempotent writes; they still go through the circuit breaker.
+    """
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not retry:
+                return call_once(endpoint, fn, *args, **kwargs)
+            return retry_call(endpoint, fn, *args, **kwargs)
+        return wrapper
+    return decorator
@@ -0,0 +1,390 @@
+import contextlib
+import ctypes
+import importlib
+import io
+import json
+import logging
+import os
+import re
+import signal
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import resource  # POSIX only
+except ImportError:
+    resource = None
+
+# Limits applied to every single test case run
+TIME_LIMIT_SECONDS = 2.0
+MEMORY_LIMIT_MB = 256
+MAX_WORKERS = 4
+
+# Languages we can execute locally; others are evaluated by the model only
+RUNNABLE_LANGUAGES = {"Python"}
+
+# Standard library modules a solution may import. The sandbox loads them before it loses file access,
+# so anything else fails with ModuleNotFoundError.
+ALLOWED_MODULES = (
+    "array", "bisect", "collections", "copy", "dataclasses", "decimal", "enum", "fractions", "functools",
+    "heapq", "itertools", "math", "operator", "random", "re", "statistics", "string", "typing"
+)
+
+# Linux clone flags and constants for cutting the sandbox off (see _lock_down)
+_CLONE_NEWNS = 0x00020000
+_CLONE_NEWUSER = 0x10000000
+_CLONE_NEWNET = 0x40000000
+_PR_SET_NO_NEW_PRIVS = 38
+_LINUX_CAPABILITY_VERSION_3 = 0x20080522
+
+logger = logging.getLogger(__name__)
+
+_available = None
+_available_lock = threading.Lock()
+
+
+class SandboxError(RuntimeError):
+    """The sandbox process crashed or returned no result"""
+
+
+class SandboxUnavailable(SandboxError):
+    """This host can't isolate solutions (no Linux user namespaces), so they are not run at all"""
+
+
+TEST_CASE_INSTRUCTIONS = """
+After the question, add a fenced ```json block with machine-readable test cases in this exact shape:
+{"function_name": "solve", "test_cases": [{"input": [arg1, arg2], "expected": result}]}
+- "function_name": the name of the function the candidate must implement.
+- "input": the list of positional arguments passed to the function.
+- "expected": the exact return value. Use only JSON types (numbers, strings, booleans, null, lists, objects).
+- Include 3-6 test cases, covering edge cases. Do not mention the JSON block in the question text.
+"""
+
+
+def split_question_and_tests(content: str):
+    """
+    Separate the question text from the JSON test-case block the model appended.
+    Args:
+        content (str): Raw model response.
+    Returns:
+        tuple: (question text, test spec dict or None if missing or malformed)
+    """
+    match = re.search(r"```json\s*(\{.*?\})\s*```", content, re.DOTALL)
+    if not match:
+        return content.strip(), None
+
+    question = (content[:match.start()] + content[match.end():]).strip()
+    try:
+        spec = json.loads(match.group(1))
+    except json.JSONDecodeError:
+        return question, None
+
+    if not isinstance(spec.get("function_name"), str) or not isinstance(spec.get("test_cases"), list):
+        return question, None
+    spec["test_cases"] = [
+        case for case in spec["test_cases"]
+        if isinstance(case, dict) and isinstance(case.get("input"), list) and "expected" in case
+    ]
+    return question, spec if spec["test_cases"] else None
+
+
+def _raise_timeout(signum, frame):
+    raise TimeoutError("Time limit exceeded")
+
+
+def apply_limits(time_limit: float, memory_limit_mb: int):
+    """Limit CPU time, wall time, memory and file writes of the current sandbox process"""
+    if resource is not None:
+        cpu_seconds = int(time_limit) + 1
+        resource.setrlimit(resource.RLIMIT_CPU, (cpu_seconds, cpu_seconds + 1))
+        memory_bytes = memory_limit_mb * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (memory_bytes, memory_bytes))
+        resource.setrlimit(resource.RLIMIT_FSIZE, (0, 0))
+        signal.signal(signal.SIGXCPU, _raise_timeout)
+    if hasattr(signal, "setitimer"):
+        signal.signal(signal.SIGALRM, _raise_timeout)
+        signal.setitimer(signal.ITIMER_REAL, time_limit)
+
+
+class _CapHeader(ctypes.Structure):
+    _fields_ = [("version", ctypes.c_uint32), ("pid", ctypes.c_int)]
+
+
+class _CapData(ctypes.Structure):
+    _fields_ = [("effective", ctypes.c_uint32), ("permitted", ctypes.c_uint32), ("inheritable", ctypes.c_uint32)]
+
+
+def _lock_down():
+    """
+    Cut the current process off from the network and the file system.
+    New user, mount and network namespaces leave it without network interfaces; it is then chrooted into its
+    (empty, temporary) working directory and drops every capability, so it can't leave the chroot either.
+    Raises:
+        OSError: If the kernel doesn't allow unprivileged namespaces.
+    """
+    libc = ctypes.CDLL(None, use_errno=True)
+    if libc.unshare(_CLONE_NEWUSER | _CLONE_NEWNS | _CLONE_NEWNET) != 0:
+        errno = ctypes.get_errno()
+        raise OSError(errno, f"unshare: {os.strerror(errno)}")
+    os.chroot(os.getcwd())
+    os.chdir("/")
+    if libc.prctl(_PR_SET_NO_NEW_PRIVS, 1, 0, 0, 0) != 0 or \
+            libc.capset(ctypes.byref(_CapHeader(_LINUX_CAPABILITY_VERSION_3, 0)), (_CapData * 2)()) != 0:
+        errno = ctypes.get_errno()
+        raise OSError(errno, f"dropping capabilities: {os.strerror(errno)}")
+
+
+def _sandbox_main():
+    """
+    Entry point of the sandbox interpreter: read a job from stdin, lock down, run it and write its JSON result
+    as the last line of stdout. The task's module and ALLOWED_MODULES are imported before the lock-down.
+    """
+    job = json.loads(sys.stdin.read())
+    module_name, task_name = job["task"].split(":")
+    task = getattr(importlib.import_module(module_name), task_name)
+    for name in ALLOWED_MODULES:
+        importlib.import_module(name)
+    result_file = os.fdopen(os.dup(1), "w")
+    os.dup2(2, 1)  # Anything the solution writes to the real stdout is discarded with stderr
+    try:
+        _lock_down()
+    except OSError as e:
+        result_file.write(json.dumps({"unavailable": str(e)}) + "\n")
+        return
+    result_file.write(json.dumps({"result": task(*job["args"])}) + "\n")
+    result_file.flush()
+
+
+def run_isolated(task, *args, timeout: float):
+    """
+    Run task(*args) in a fresh Python interpreter that can't reach the app's secrets, the network or files.
+    The interpreter starts with an empty environment in an empty temporary directory, shares no memory
+    with the app and locks itself down (see _lock_down) before the task runs.
+    Args:
+        task: A module-level function of an importable module; it receives and returns JSON values.
+        *args: JSON arguments of the task.
+        timeout (float): Wall-clock seconds before the whole process group is killed.
+    Returns:
+        The task's return value.
+    Raises:
+        TimeoutError: If the process ran out of time.
+        SandboxUnavailable: If this host can't isolate the process.
+        SandboxError: If the process died without a result (e.g. killed by a resource limit).
+    """
+    if not sys.platform.startswith("linux"):
+        raise SandboxUnavailable("Solutions can only be isolated on Linux")
+    job = json.dumps({"task": f"{task.__module__}:{task.__name__}", "args": list(args)}).encode()
+    with tempfile.TemporaryDirectory(prefix="sandbox-") as workdir:
+        process = subprocess.Popen(
+            [sys.executable, "-E", "-s", os.path.abspath(__file__)],
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+            cwd=workdir, env={}, start_new_session=True
+        )
+        try:
+            output, _ = process.communicate(job, timeout=timeout)
+        except subprocess.TimeoutExpired:
+            raise TimeoutError(f"Time limit exceeded ({timeout:.1f}s)")
+        finally:
+            # Also stops anything the solution forked
+            with contextlib.suppress(ProcessLookupError):
+                os.killpg(process.pid, signal.SIGKILL)
+            process.communicate()
+
+    lines = output.decode("utf-8", "replace").strip().splitlines()
+    try:
+        reply = json.loads(lines[-1])
+    except (IndexError, json.JSONDecodeError):
+        raise SandboxError("Solution crashed the sandbox process (likely a resource limit)")
+    if "unavailable" in reply:
+        raise SandboxUnavailable(reply["unavailable"])
+    return reply["result"]
+
+
+def _probe():
+    return True
+
+
+def sandbox_available() -> bool:
+    """
+    Whether this host can run solutions in the sandbox. Checked once per process with a trivial task;
+    when it can't, solutions are evaluated by the model only.
+    """
+    global _available
+    with _available_lock:
+        if _available is None:
+            try:
+                _available = run_isolated(_probe, timeout=10) is True
+            except (SandboxError, TimeoutError, OSError) as e:
+                logger.warning("Local solution runs are disabled, the sandbox is unavailable: %s", e)
+                _available = False
+        return _available
+
+
+def load_function(code: str, function_name: str):
+    """
+    Execute a solution and return the function it defines. Only called inside the sandbox.
+    Raises:
+        NameError: If the solution defines no such function.
+    """
+    namespace = {"__name__": "solution"}
+    exec(compile(code, "<solution>", "exec"), namespace)
+    function = namespace.get(function_name)
+    if not callable(function):
+        raise NameError(f"Function '{function_name}' is not defined")
+    return function
+
+
+def _normalize(value):
+    """Round-trip through JSON so tuples compare equal to lists, like the expected values"""
+    return json.loads(json.dumps(value, default=repr))
+
+
+def _json_type(value) -> str:
+    if isinstance(value, bool):
+        return "boolean"
+    if isinstance(value, (int, float)):
+        return "number"
+    return {str: "string", list: "list", dict: "object", type(None): "null"}.get(type(value), type(value).__name__)
+
+
+def describe_mismatch(output, expected, path: str = "return value") -> str:
+    """
+    Say where a return value differs from the expected one without echoing the value itself.
+    Args:
+        output: The normalized return value.
+        expected: The expected value from the test case.
+        path (str): Where in the return value the comparison is.
+    Returns:
+        str: E.g. "return value[2]: got string, expected number".
+    """
+    if _json_type(output) != _json_type(expected):
+        return f"{path}: got {_json_type(output)}, expected {_json_type(expected)}"
+    if isinstance(expected, list):
+        if len(output) != len(expected):
+            return f"{path}: got {len(output)} items, expected {len(expected)}"
+        for i, (item, expected_item) in enumerate(zip(output, expected)):
+            if item != expected_item:
+                return describe_mismatch(item, expected_item, f"{path}[{i}]")
+    if isinstance(expected, dict):
+        if set(output) != set(expected):
+            return f"{path}: keys differ from the expected ones"
+        for key, expected_item in expected.items():
+            if output[key] != expected_item:
+                return describe_mismatch(output[key], expected_item, f"{path}[{key!r}]")
+    return f"{path}: differs from the expected value"
+
+
+def _run_test_case(code: str, function_name: str, args: list, expected, time_limit: float, memory_limit_mb: int):
+    """
+    Execute one test case. Runs inside the sandbox (see run_isolated).
+    Returns:
+        dict: passed, runtime_ms, error and detail (where a wrong return value differs, never the value itself).
+    """
+    apply_limits(time_limit, memory_limit_mb)
+    result = {"passed": False, "runtime_ms": 0.0, "error": None, "detail": None}
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            function = load_function(code, function_name)
+            start = time.perf_counter()
+            output = function(*args)
+            result["runtime_ms"] = (time.perf_counter() - start) * 1000
+            output = _normalize(output)
+        result["passed"] = output == expected
+        if not result["passed"]:
+            result["detail"] = describe_mismatch(output, expected)
+    except TimeoutError:
+        result["error"] = f"Time limit exceeded ({time_limit:.1f}s)"
+    except MemoryError:
+        result["error"] = f"Memory limit exceeded ({memory_limit_mb} MB)"
+    except BaseException as e:  # Candidate code may raise anything, including SystemExit
+        result["error"] = f"{type(e).__name__}: {e}"[:300]
+    finally:
+        if hasattr(signal, "setitimer"):
+            signal.setitimer(signal.ITIMER_REAL, 0)
+    return result
+
+
+def check_syntax(code: str):
+    """
+    Compile the solution without running it.
+    Returns:
+        str: The syntax error message, or None if the code compiles.
+    """
+    try:
+        compile(code, "<solution>", "exec")
+    except SyntaxError as e:
+        return f"SyntaxError on line {e.lineno}: {e.msg}"
+    return None
+
+
+def _run_isolated_case(code: str, function_name: str, case: dict, time_limit: float, memory_limit_mb: int):
+    try:
+        return run_isolated(_run_test_case, code, function_name, case["input"], case["expected"],
+                            time_limit, memory_limit_mb, timeout=time_limit + 5)
+    except TimeoutError:
+        error = f"Time limit exceeded ({time_limit:.1f}s)"
+    except SandboxError as e:
+        error = str(e)
+    return {"passed": False, "runtime_ms": 0.0, "error": error, "detail": None}
+
+
+def run_test_cases(code: str, spec: dict, time_limit: float = TIME_LIMIT_SECONDS, memory_limit_mb: int = MEMORY_LIMIT_MB):
+    """
+    Run a Python solution against the generated test cases, each in its own sandbox process (see run_isolated)
+    with CPU, memory, file-write and wall-time limits. Callers check sandbox_available() first.
+    Args:
+        code (str): The candidate's Python solution.
+        spec (dict): Test spec with function_name and test_cases.
+        time_limit (float): Seconds allowed per test case.
+        memory_limit_mb (int): Address-space limit per test case.
+    Returns:
+        list: One result dict per test case, with input and expected added.
+    """
+    syntax_error = check_syntax(code)
+    if syntax_error:
+        return [
+            {"input": case["input"], "expected": case["expected"], "passed": False,
+             "runtime_ms": 0.0, "error": syntax_error, "detail": None}
+            for case in spec["test_cases"]
+        ]
+
+    workers = min(MAX_WORKERS, len(spec["test_cases"])) or 1
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = [
+            pool.submit(_run_isolated_case, code, spec["function_name"], case, time_limit, memory_limit_mb)
+            for case in spec["test_cases"]
+        ]
+        return [
+            {"input": case["input"], "expected": case["expected"], **future.result()}
+            for case, future in zip(spec["test_cases"], futures)
+        ]
+
+
+def is_broken(results: list) -> bool:
+    """A solution is broken when no test case passes, so it isn't worth a model evaluation"""
+    return bool(results) and not any(result["passed"] for result in results)
+
+
+def summarize_results(results: list) -> str:
+    """
+    Build a compact plain-text summary of test results for the evaluation prompt.
+    Args:
+        results (list): Output of run_test_cases().
+    Returns:
+        str: One line per test case plus a pass count.
+    """
+    passed = sum(result["passed"] for result in results)
+    lines = [f"Local test run: {passed}/{len(results)} test cases passed."]
+    for i, result in enumerate(results, start=1):
+        status = "PASS" if result["passed"] else "FAIL"
+        detail = result["error"] or result["detail"] or "returned the expected value"
+        lines.append(f"- Test {i} {status} ({result['runtime_ms']:.1f} ms): input={result['input']!r}; {detail}")
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    _sandbox_main()
@@ -0,0 +1,137 @@
+import sys
+from collections import OrderedDict
+from dataclasses import dataclass
+
+# Raw message JSON of previously opened chats kept per session; older chats are re-read from Supabase
+MAX_CHAT_CACHE_BYTES = 256 * 1024
+
+# Generated question sets kept per session (the question bank keeps all of them)
+MAX_GENERATED_QUESTION_SETS = 5
+
+USAGE_FEATURES = ("expert_chat", "question_generator", "interview_prep", "generate_image")
+
+
+@dataclass(slots=True)
+class FeatureUsage:
+    """Calls, tokens and cost of one feature in this session"""
+    calls: int = 0
+    tokens: int = 0
+    cost: float = 0.0
+
+
+def new_function_usage():
+    """Empty per-feature usage, kept per session"""
+    return {feature: FeatureUsage() for feature in USAGE_FEATURES}
+
+
+@dataclass(slots=True)
+class ChatSummary:
+    """A chat in the history sidebar; its messages are loaded only when the chat is opened"""
+    id: int
+    description: str
+    timestamp: str
+    expert_type: str
+
+    @classmethod
+    def from_row(cls, row: dict):
+        return cls(
+            id=row["id"],
+            description=row.get("description") or "Untitled Chat",
+            timestamp=row["timestamp"],
+            expert_type=sys.intern(row.get("expert_type") or "")
+        )
+
+
+def chat_summaries(rows: list):
+    """chat_history mapping (chat id -> ChatSummary) from 'chats' rows"""
+    return {row["id"]: ChatSummary.from_row(row) for row in rows}
+
+
+class ChatCache:
+    """Per-session LRU of raw chat message JSON, capped in bytes. Evicted chats are re-read from Supabase."""
+
+    __slots__ = ("entries", "nbytes", "max_bytes")
+
+    def __init__(self, max_bytes: int = MAX_CHAT_CACHE_BYTES):
+        self.entries = OrderedDict()
+        self.nbytes = 0
+        self.max_bytes = max_bytes
+
+    def get(self, chat_id):
+        raw = self.entries.get(chat_id)
+        if raw is not None:
+            self.entries.move_to_end(chat_id)
+        return raw
+
+    def put(self, chat_id, raw: str):
+        self.discard(chat_id)
+        size = len(raw.encode("utf-8"))
+        if size > self.max_bytes:
+            return
+        self.entries[chat_id] = raw
+        self.nbytes += size
+        while self.nbytes > self.max_bytes:
+            _, evicted = self.entries.popitem(last=False)
+            self.nbytes -= len(evicted.encode("utf-8"))
+
+    def discard(self, chat_id):
+        raw = self.entries.pop(chat_id, None)
+        if raw is not None:
+            self.nbytes -= len(raw.encode("utf-8"))
+
+    def __len__(self):
+        return len(self.entries)
+
+
+def intern_messages(messages: list):
+    """
+    Share system prompts between sessions: every session chatting with the same expert
+    holds one string object instead of its own copy.
+    """
+    for message in messages:
+        if message.get("role") == "system" and isinstance(message.get("content"), str):
+            message["content"] = sys.intern(message["content"])
+    return messages
+
+
+def cap_generated_questions(question_sets: list):
+    """Drop the oldest generated question sets beyond MAX_GENERATED_QUESTION_SETS"""
+    del question_sets[:-MAX_GENERATED_QUESTION_SETS]
+
+
+def deep_size(obj, seen=None) -> int:
+    """Approximate bytes held by an object and everything it references (shared objects counted once)"""
+    if seen is None:
+        seen = set()
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+    size = sys.getsizeof(obj)
+    if isinstance(obj, (str, bytes, int, float, bool)) or obj is None:
+        return size
+    if isinstance(obj, dict):
+        size += sum(deep_size(key, seen) + deep_size(value, seen) for key, value in obj.items())
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        size += sum(deep_size(item, seen) for item in obj)
+    for slot in getattr(type(obj), "__slots__", ()):
+        if hasattr(obj, slot):
+            size += deep_size(getattr(obj, slot), seen)
+    if hasattr(obj, "__dict__"):
+        size += deep_size(vars(obj), seen)
+    return size
+
+
+def memory_report(session_state):
+    """
+    Approximate memory held by each session state key.
+    Returns:
+        list: (key, bytes) pairs, largest first.
+    """
+    seen = set()
+    sizes = []
+    for key in list(session_state.keys()):
+        try:
+            sizes.append((str(key), deep_size(session_state[key], seen)))
+        except Exception:
+            continue  # Widget values can disappear between reruns
+    return sorted(sizes, key=lambda item: item[1], reverse=True)
@@ -0,0 +1,127 @@
+import base64
+import copy
+import hashlib
+import hmac
+import json
+import logging
+import os
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+
+from supabase_helpers import revoke_session, is_session_revoked
+
+logger = logging.getLogger(__name__)
+
+# How long a browser can come back without logging in again
+SESSION_TTL_SECONDS = 12 * 3600
+
+# Server-side snapshots of logged-in sessions, restored on refresh or reconnect
+MAX_SNAPSHOTS = 1000
+SNAPSHOT_KEYS = (
+    "current_user", "current_user_id", "chat_history", "total_api_cost", "total_input_tokens",
+    "total_output_tokens", "model_costs", "function_usage", "route_stats"
+)
+
+# Set SESSION_SECRET so tokens stay valid across restarts and server processes
+_secret = os.environ.get("SESSION_SECRET", "").encode("utf-8") or secrets.token_bytes(32)
+
+# Process-wide: user id -> (saved at, snapshot)
+_snapshots = OrderedDict()
+_snapshots_lock = threading.Lock()
+
+
+def _b64encode(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).decode("ascii").rstrip("=")
+
+
+def _b64decode(text: str) -> bytes:
+    return base64.urlsafe_b64decode(text + "=" * (-len(text) % 4))
+
+
+def _sign(payload: str) -> str:
+    return _b64encode(hmac.new(_secret, payload.encode("ascii"), hashlib.sha256).digest())
+
+
+def issue_token(user_id, username: str) -> str:
+    """
+    Signed, expiring session token to keep on the client. Each token has its own session ID (sid),
+    so it can be revoked on its own.
+    Returns:
+        str: "<payload>.<signature>", both base64url.
+    """
+    claims = {
+        "uid": user_id, "usr": username, "sid": secrets.token_urlsafe(16),
+        "exp": int(time.time() + SESSION_TTL_SECONDS)
+    }
+    payload = _b64encode(json.dumps(claims, separators=(",", ":")).encode("utf-8"))
+    return f"{payload}.{_sign(payload)}"
+
+
+def _signed_claims(token: str):
+    try:
+        payload, signature = token.split(".")
+        if not hmac.compare_digest(signature, _sign(payload)):
+            return None
+        claims = json.loads(_b64decode(payload))
+    except (ValueError, UnicodeError):
+        return None
+    return claims if isinstance(claims, dict) and claims.get("sid") else None
+
+
+def verify_token(token: str):
+    """
+    Check a session token's signature and expiry, then that it was not revoked (one database read).
+    Fails closed: if the revocation check cannot be made, the token is rejected.
+    Returns:
+        dict: The claims (uid, usr, sid, exp), or None if the token is invalid, expired or revoked.
+    """
+    claims = _signed_claims(token)
+    if claims is None or claims.get("exp", 0) < time.time():
+        return None
+    try:
+        if is_session_revoked(claims["sid"]):
+            return None
+    except Exception as e:
+        logger.warning("Could not check session revocation: %s", e)
+        return None
+    return claims
+
+
+def revoke_token(token: str):
+    """Make a session token unusable in every server process, e.g. on logout or once it has been exchanged"""
+    claims = _signed_claims(token)
+    if claims is None or claims.get("exp", 0) < time.time():
+        return
+    revoke_session(claims["sid"], datetime.fromtimestamp(claims["exp"], timezone.utc).isoformat())
+
+
+def save_snapshot(user_id, session_state):
+    """Remember the restorable parts of a logged-in session (references only, so this is cheap per rerun)"""
+    snapshot = {key: session_state[key] for key in SNAPSHOT_KEYS if key in session_state}
+    with _snapshots_lock:
+        _snapshots[user_id] = (time.time(), snapshot)
+        _snapshots.move_to_end(user_id)
+        while len(_snapshots) > MAX_SNAPSHOTS:
+            _snapshots.popitem(last=False)
+
+
+def load_snapshot(user_id):
+    """
+    A copy of the user's last session snapshot, so a new session does not share objects with the old one.
+    Returns:
+        dict: Session state values, or None if there is no recent snapshot in this process.
+    """
+    with _snapshots_lock:
+        entry = _snapshots.get(user_id)
+        if entry is None or time.time() - entry[0] > SESSION_TTL_SECONDS:
+            return None
+        snapshot = entry[1]
+    return copy.deepcopy(snapshot)
+
+
+def drop_snapshot(user_id):
+    with _snapshots_lock:
+        _snapshots.pop(user_id, None)
@@ -0,0 +1,26 @@
+-- Persistent question bank fed by the Question Generator.
+-- Questions are deduplicated by the hash of their normalized text.
+create table if not exists question_bank (
+    id bigint generated always as identity primary key,
+    question_hash text not null unique,
+    text text not null,
+    style text not null,
+    difficulty text not null,
+    tags jsonb not null default '[]'::jsonb,
+    search_text text not null,
+    search_vector tsvector generated always as (to_tsvector('english', search_text)) stored,
+    times_served integer not null default 0,
+    created_at timestamptz not null default now()
+);
+
+create index if not exists question_bank_search_idx on question_bank using gin (search_vector);
+create index if not exists question_bank_style_difficulty_idx on question_bank (style, difficulty);
+
+create or replace function increment_questions_served(question_ids bigint[])
+returns void
+language sql
+as $$
+    update question_bank
+    set times_served = times_served + 1
+    where id = any(question_ids);
+$$;
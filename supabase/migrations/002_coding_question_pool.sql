@@ -0,0 +1,55 @@
+-- Prefetched coding questions for Interview Prep, grouped in buckets of
+-- (language, difficulty, personality, complexity). Rows are claimed once.
+create table if not exists coding_question_pool (
+    id bigint generated always as identity primary key,
+    bucket_key text not null,
+    question text not null,
+    tests jsonb,
+    model text not null,
+    input_tokens integer not null default 0,
+    output_tokens integer not null default 0,
+    created_at timestamptz not null default now(),
+    claimed_at timestamptz
+);
+
+create index if not exists coding_question_pool_ready_idx
+    on coding_question_pool (bucket_key, created_at)
+    where claimed_at is null;
+
+-- Claim the oldest ready question of a bucket. SKIP LOCKED lets concurrent
+-- sessions claim different rows without waiting on each other.
+create or replace function claim_pool_question(p_bucket_key text)
+returns table (
+    id bigint,
+    question text,
+    tests jsonb,
+    model text,
+    input_tokens integer,
+    output_tokens integer,
+    remaining bigint
+)
+language plpgsql
+as $$
+declare
+    claimed coding_question_pool%rowtype;
+begin
+    select * into claimed
+    from coding_question_pool p
+    where p.bucket_key = p_bucket_key and p.claimed_at is null
+    order by p.created_at
+    limit 1
+    for update skip locked;
+
+    if not found then
+        return;
+    end if;
+
+    update coding_question_pool set claimed_at = now() where coding_question_pool.id = claimed.id;
+
+    return query
+    select claimed.id, claimed.question, claimed.tests, claimed.model,
+           claimed.input_tokens, claimed.output_tokens,
+           (select count(*) from coding_question_pool p
+            where p.bucket_key = p_bucket_key and p.claimed_at is null);
+end;
+$$;
@@ -0,0 +1,12 @@
+-- Finished mock interview runs, kept for later review.
+create table if not exists mock_interviews (
+    id uuid primary key,
+    user_id uuid not null references users (id) on delete cascade,
+    settings jsonb not null,
+    overall_score numeric(4, 1) not null,
+    results jsonb not null,
+    started_at timestamptz not null,
+    finished_at timestamptz not null
+);
+
+create index if not exists mock_interviews_user_idx on mock_interviews (user_id, started_at desc);
@@ -0,0 +1,88 @@
+-- Full-text search over a user's chats: description (weight A) and message content (weight B).
+-- System prompts are left out so they do not match every chat.
+create extension if not exists btree_gin;
+
+-- Text of the user and assistant messages. Handles messages stored as a JSON array or as a JSON string.
+create or replace function chat_message_text(messages text)
+returns text
+language sql
+immutable
+as $$
+    with parsed as (
+        select case
+            when jsonb_typeof(messages::jsonb) = 'string' then (messages::jsonb #>> '{}')::jsonb
+            else messages::jsonb
+        end as doc
+    )
+    select left(coalesce(string_agg(message ->> 'content', ' '), ''), 500000)
+    from parsed,
+         jsonb_array_elements(case when jsonb_typeof(doc) = 'array' then doc else '[]'::jsonb end) as message
+    where message ->> 'role' is distinct from 'system'
+$$;
+
+alter table chats add column if not exists search_vector tsvector;
+
+-- Maintained by a trigger rather than a generated column, so the vector can outlive the message text
+create or replace function chats_search_vector_update()
+returns trigger
+language plpgsql
+as $$
+begin
+    if new.messages is not null then
+        new.search_vector :=
+            setweight(to_tsvector('english', coalesce(new.description, '')), 'A') ||
+            setweight(to_tsvector('english', chat_message_text(new.messages::text)), 'B');
+    end if;
+    return new;
+end;
+$$;
+
+drop trigger if exists chats_search_vector_trigger on chats;
+create trigger chats_search_vector_trigger
+    before insert or update of description, messages on chats
+    for each row execute function chats_search_vector_update();
+
+-- Backfill existing chats
+update chats set messages = messages where search_vector is null;
+
+create index if not exists chats_user_search_idx on chats using gin (user_id, search_vector);
+create index if not exists chats_user_timestamp_idx on chats (user_id, "timestamp" desc);
+
+-- One page of a user's chats matching a web-style query, best match first, with highlighted snippets.
+-- Snippets are only built for the returned page.
+create or replace function search_chats(p_user_id uuid, p_query text, p_limit integer default 10, p_offset integer default 0)
+returns table (
+    id bigint,
+    description text,
+    "timestamp" timestamptz,
+    expert_type text,
+    rank real,
+    snippet text,
+    total_count bigint
+)
+language sql
+stable
+as $$
+    with query as (
+        select websearch_to_tsquery('english', p_query) as q
+    ),
+    matches as (
+        select c.id, c.description, c."timestamp", c.expert_type, c.messages,
+               ts_rank_cd(c.search_vector, query.q) as rank,
+               count(*) over () as total_count
+        from chats c, query
+        where c.user_id = p_user_id and c.search_vector @@ query.q
+        order by rank desc, c."timestamp" desc
+        limit p_limit offset p_offset
+    )
+    select m.id::bigint, m.description::text, m."timestamp"::timestamptz, m.expert_type::text, m.rank,
+           ts_headline(
+               'english',
+               coalesce(m.description, '') || ' — ' || coalesce(chat_message_text(m.messages::text), ''),
+               query.q,
+               'StartSel=**, StopSel=**, MaxWords=20, MinWords=6, MaxFragments=2, FragmentDelimiter=" … "'
+           ),
+           m.total_count
+    from matches m, query
+    order by m.rank desc, m."timestamp" desc
+$$;
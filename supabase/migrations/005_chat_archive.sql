@@ -0,0 +1,27 @@
+-- Compressed archive tier: chats not saved for a while keep their messages only as a compressed blob
+-- (see chat_archive.py), and messages is set to null. The search vector is kept, so archived chats stay searchable.
+alter table chats add column if not exists archived_messages text;
+alter table chats add column if not exists archived_at timestamptz;
+alter table chats alter column messages drop not null;
+
+-- Saving messages to an archived chat makes it live again
+create or replace function chats_unarchive_on_save()
+returns trigger
+language plpgsql
+as $$
+begin
+    if new.messages is not null then
+        new.archived_messages := null;
+        new.archived_at := null;
+    end if;
+    return new;
+end;
+$$;
+
+drop trigger if exists chats_unarchive_trigger on chats;
+create trigger chats_unarchive_trigger
+    before update of messages on chats
+    for each row execute function chats_unarchive_on_save();
+
+-- Live chats in ID order for the archiving job
+create index if not exists chats_live_idx on chats (id) where archived_at is null;
@@ -0,0 +1,32 @@
+-- Per-user spend quota: a token bucket in dollars that refills continuously up to its capacity.
+-- App processes keep a local copy (see quota.py) and push their spend here every few seconds.
+alter table users add column if not exists quota_level numeric(12, 6);
+alter table users add column if not exists quota_updated_at timestamptz;
+
+-- Refill the user's bucket up to now, take p_amount (negative gives spend back) and return the new level.
+-- The level may go below zero when several processes spend at once; the user then waits for the refill.
+create or replace function charge_quota(p_user_id uuid, p_amount numeric, p_capacity numeric, p_refill_per_second numeric)
+returns numeric
+language plpgsql
+as $$
+declare
+    level numeric;
+begin
+    select least(
+               p_capacity,
+               coalesce(u.quota_level, p_capacity)
+                   + coalesce(extract(epoch from now() - u.quota_updated_at), 0) * p_refill_per_second
+           ) - p_amount
+    into level
+    from users u
+    where u.id = p_user_id
+    for update;
+
+    if not found then
+        return null;
+    end if;
+
+    update users set quota_level = level, quota_updated_at = now() where id = p_user_id;
+    return level;
+end;
+$$;
@@ -0,0 +1,8 @@
+-- Compact profiles of job descriptions (role, seniority, domain, skills, stack), built once by a cheap model
+-- and sent with later prompts instead of the full text. Keyed by the hash of the normalized description.
+create table if not exists jd_profiles (
+    jd_hash text primary key,
+    profile jsonb not null,
+    model text not null,
+    created_at timestamptz not null default now()
+);
@@ -0,0 +1,25 @@
+-- When a chat's messages were last saved. chats.timestamp is the creation time, so the archiving job
+-- (see chat_archive.py) selects chats by this column instead, and only archives a chat whose value is
+-- still the one it read.
+alter table chats add column if not exists updated_at timestamptz;
+update chats set updated_at = timestamp where updated_at is null;
+alter table chats alter column updated_at set default now();
+alter table chats alter column updated_at set not null;
+
+-- Saving messages makes an archived chat live again and records the save time.
+-- Archiving itself sets messages to null and keeps updated_at.
+create or replace function chats_unarchive_on_save()
+returns trigger
+language plpgsql
+as $$
+begin
+    if new.messages is not null then
+        new.archived_messages := null;
+        new.archived_at := null;
+        new.updated_at := now();
+    end if;
+    return new;
+end;
+$$;
+
+create index if not exists chats_live_updated_idx on chats (updated_at) where archived_at is null;
@@ -0,0 +1,53 @@
+-- Spend pushes carry a request id (see quota.py). A push is resent with the same id when its response was lost,
+-- so charge_quota() applies each id once. Ids are kept for a day, far longer than any resend.
+create table if not exists quota_charges (
+    request_id uuid primary key,
+    user_id uuid not null,
+    created_at timestamptz not null default now()
+);
+
+create index if not exists quota_charges_user_created_idx on quota_charges (user_id, created_at);
+
+drop function if exists charge_quota(uuid, numeric, numeric, numeric);
+
+-- Refill the user's bucket up to now, take p_amount (negative gives spend back) and return the new level.
+-- A p_request_id that was already applied only refills and returns the level. Without an id the charge
+-- is applied unconditionally, e.g. to read the level with p_amount 0.
+-- The level may go below zero when several processes spend at once; the user then waits for the refill.
+create or replace function charge_quota(p_user_id uuid, p_amount numeric, p_capacity numeric,
+                                        p_refill_per_second numeric, p_request_id uuid default null)
+returns numeric
+language plpgsql
+as $$
+declare
+    level numeric;
+    amount numeric := p_amount;
+begin
+    select least(
+               p_capacity,
+               coalesce(u.quota_level, p_capacity)
+                   + coalesce(extract(epoch from now() - u.quota_updated_at), 0) * p_refill_per_second
+           )
+    into level
+    from users u
+    where u.id = p_user_id
+    for update;
+
+    if not found then
+        return null;
+    end if;
+
+    if p_request_id is not null then
+        insert into quota_charges (request_id, user_id) values (p_request_id, p_user_id)
+        on conflict (request_id) do nothing;
+        if not found then
+            amount := 0;
+        end if;
+        delete from quota_charges where user_id = p_user_id and created_at < now() - interval '1 day';
+    end if;
+
+    level := level - amount;
+    update users set quota_level = level, quota_updated_at = now() where id = p_user_id;
+    return level;
+end;
+$$;
@@ -0,0 +1,8 @@
+-- Session tokens (see session_tokens.py) that must no longer log anyone in: logged out, or already used to
+-- restore a session and replaced by a new one. Rows are only needed until the token would have expired anyway.
+create table if not exists revoked_sessions (
+    sid text primary key,
+    expires_at timestamptz not null
+);
+
+create index if not exists revoked_sessions_expires_idx on revoked_sessions (expires_at);
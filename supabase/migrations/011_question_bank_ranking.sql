@@ -0,0 +1,49 @@
+-- Ranked question bank search (see supabase_helpers.search_question_bank).
+-- A question is a hit only if it matches at least p_min_matches of the search terms. Hits are ordered by
+-- ts_rank against all terms, divided by a penalty that grows with times_served, so popular questions
+-- rotate out instead of being served for every job description that shares one common word.
+create or replace function search_question_bank(
+    p_terms text[],
+    p_style text default null,
+    p_difficulty text default null,
+    p_limit integer default 10,
+    p_min_matches integer default 1
+)
+returns table (
+    id bigint,
+    question_hash text,
+    text text,
+    style text,
+    difficulty text,
+    tags jsonb,
+    times_served integer,
+    rank real,
+    matched_terms integer
+)
+language sql
+stable
+as $$
+    with terms as (
+        select plainto_tsquery('english', term) as q
+        from unnest(p_terms) as term
+        where numnode(plainto_tsquery('english', term)) > 0
+    ),
+    query as (
+        select string_agg(q::text, ' | ')::tsquery as q from terms
+    ),
+    hits as (
+        select b.id, b.question_hash, b.text, b.style, b.difficulty, b.tags, b.times_served,
+               ts_rank(b.search_vector, query.q) as rank,
+               (select count(*) from terms where b.search_vector @@ terms.q)::integer as matched_terms
+        from question_bank b, query
+        where query.q is not null
+          and b.search_vector @@ query.q
+          and (p_style is null or b.style = p_style)
+          and (p_difficulty is null or b.difficulty = p_difficulty)
+    )
+    select h.id, h.question_hash, h.text, h.style, h.difficulty, h.tags, h.times_served, h.rank, h.matched_terms
+    from hits h
+    where h.matched_terms >= p_min_matches
+    order by h.rank / (1 + ln(1 + h.times_served)) desc, h.times_served, h.id
+    limit p_limit
+$$;
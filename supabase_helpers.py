@@ -1,22 +1,32 @@
 import json
 from dotenv import load_dotenv
 from supabase import create_client, Client
+from postgrest.types import ReturnMethod
 from datetime import datetime
 import re
 import streamlit as st
+from resilience import resilient
 # Load environment variables
 
 
 SUPABASE_URL = st.secrets["SUPABASE_URL"]
 SUPABASE_KEY = st.secrets["SUPABASE_KEY"]
 
+
+@st.cache_resource
+def get_supabase_client() -> Client:
+    """One Supabase client per server process, shared by every session"""
+    return create_client(SUPABASE_URL, SUPABASE_KEY)
+
+
 # Initialize Supabase client
-supabase: Client = create_client(SUPABASE_URL, SUPABASE_KEY)
+supabase: Client = get_supabase_client()
 
 ### -------------------------------------------
 ### ✅ USER FUNCTIONS
 ### -------------------------------------------
 
+@resilient("supabase")
 def get_user(username: str):
     """
     Retrieve a user record from Supabase by username.
@@ -31,6 +41,7 @@ def get_user(username: str):
     return None
 
 
+@resilient("supabase", retry=False)
 def save_user(username: str, password: str):
     """
     Insert a new user into the 'users' table.
@@ -47,6 +58,7 @@ def save_user(username: str, password: str):
     return response
 
 
+@resilient("supabase")
 def get_user_id(username: str):
     """
     Get the user ID based on the username.
@@ -61,6 +73,7 @@ def get_user_id(username: str):
     return None
 
 
+@resilient("supabase")
 def delete_user(username: str):
     """
     Delete a user from the 'users' table.
@@ -71,10 +84,40 @@ def delete_user(username: str):
     return response
 
 
+@resilient("supabase")
+def revoke_session(sid: str, expires_at: str):
+    """
+    Mark a session token as revoked, and drop revocations of tokens that have expired anyway.
+    Args:
+        sid (str): The token's session ID.
+        expires_at (str): ISO timestamp at which the token expires.
+    """
+    supabase.table("revoked_sessions").upsert(
+        {"sid": sid, "expires_at": expires_at}, on_conflict="sid", ignore_duplicates=True,
+        returning=ReturnMethod.minimal
+    ).execute()
+    supabase.table("revoked_sessions").delete(returning=ReturnMethod.minimal) \
+        .lt("expires_at", datetime.utcnow().isoformat()).execute()
+
+
+@resilient("supabase")
+def is_session_revoked(sid: str) -> bool:
+    """
+    Check whether a session token was revoked.
+    Args:
+        sid (str): The token's session ID.
+    Returns:
+        bool: True if the token must not log anyone in.
+    """
+    response = supabase.table("revoked_sessions").select("sid").eq("sid", sid).limit(1).execute()
+    return bool(response.data)
+
+
 ### -------------------------------------------
 ### ✅ CHAT FUNCTIONS
 ### -------------------------------------------
 
+@resilient("supabase", retry=False)
 def save_chat(user_id: str, expert_type: str, messages, description: str):
     """
     Save a new chat into the 'chats' table.
@@ -97,6 +140,7 @@ def save_chat(user_id: str, expert_type: str, messages, description: str):
     return response
 
 
+@resilient("supabase")
 def get_user_chats(user_id: str):
     """
     Retrieve all chats for a specific user.
@@ -109,6 +153,137 @@ def get_user_chats(user_id: str):
     return response.data
 
 
+@resilient("supabase")
+def get_user_chats_page(user_id: str, after_id: int = 0, limit: int = 100):
+    """
+    Retrieve one page of a user's chats with their messages, in ID order, for export.
+    Args:
+        user_id (str): The ID of the user.
+        after_id (int): Only chats with a larger ID; pass the last ID of the previous page.
+        limit (int): Page size.
+    Returns:
+        list: Chat records with id, expert_type, description, timestamp, messages and archived_messages.
+    """
+    response = supabase.table("chats").select("id, expert_type, description, timestamp, messages, archived_messages") \
+        .eq("user_id", user_id).gt("id", after_id).order("id").limit(limit).execute()
+    return response.data
+
+
+@resilient("supabase", retry=False)
+def save_chats(user_id: str, chats: list):
+    """
+    Insert several chats in one request.
+    Args:
+        user_id (str): The ID of the user.
+        chats (list): Chats with expert_type, messages (list), description and optional timestamp.
+    Returns:
+        int: Number of chats inserted.
+    """
+    if not chats:
+        return 0
+    rows = [
+        {
+            "user_id": user_id,
+            "expert_type": chat["expert_type"],
+            "messages": json.dumps(chat["messages"]),
+            "description": chat["description"],
+            "timestamp": chat.get("timestamp") or "now()"
+        }
+        for chat in chats
+    ]
+    supabase.table("chats").insert(rows, returning=ReturnMethod.minimal).execute()
+    return len(rows)
+
+
+@resilient("supabase")
+def get_user_chat_summaries(user_id: str):
+    """
+    Retrieve the non-empty chats of a user without their messages, for the history sidebar.
+    Args:
+        user_id (str): The ID of the user.
+    Returns:
+        list: Chat records with id, description, timestamp and expert_type.
+    """
+    response = supabase.table("chats").select("id, description, timestamp, expert_type") \
+        .eq("user_id", user_id).or_('messages.neq."[]",archived_at.not.is.null') \
+        .order("timestamp", desc=True).execute()
+    return response.data
+
+
+@resilient("supabase")
+def get_chat_record(chat_id: int):
+    """
+    Retrieve the stored messages of one chat, live or archived.
+    Args:
+        chat_id (int): The ID of the chat.
+    Returns:
+        dict: messages (JSON string, None once archived), archived_messages (compressed blob) and expert_type,
+              or None if the chat does not exist.
+    """
+    response = supabase.table("chats").select("messages, archived_messages, expert_type").eq("id", chat_id).execute()
+    if response.data:
+        return response.data[0]
+    return None
+
+
+@resilient("supabase")
+def get_chats_to_archive(before: str, after_id: int = 0, limit: int = 100):
+    """
+    Retrieve a batch of live, non-empty chats last saved before a cutoff, in ID order.
+    Args:
+        before (str): ISO timestamp cutoff, compared with updated_at.
+        after_id (int): Only chats with a larger ID, to page through the table.
+        limit (int): Batch size.
+    Returns:
+        list: Chat records with id, expert_type, messages and updated_at.
+    """
+    response = supabase.table("chats").select("id, expert_type, messages, updated_at") \
+        .is_("archived_at", "null").not_.is_("messages", "null").neq("messages", "[]") \
+        .lt("updated_at", before).gt("id", after_id).order("id").limit(limit).execute()
+    return response.data
+
+
+@resilient("supabase")
+def archive_chat(chat_id: int, archived_messages: str, updated_at: str):
+    """
+    Replace a chat's messages with their compressed blob. A chat saved again in the meantime is left alone.
+    Args:
+        chat_id (int): The ID of the chat.
+        archived_messages (str): The compressed messages.
+        updated_at (str): The chat's updated_at as read with the messages that were compressed.
+    Returns:
+        bool: True if the chat was archived.
+    """
+    response = supabase.table("chats").update({
+        "messages": None,
+        "archived_messages": archived_messages,
+        "archived_at": datetime.utcnow().isoformat()
+    }).eq("id", chat_id).is_("archived_at", "null").eq("updated_at", updated_at).execute()
+    return bool(response.data)
+
+
+@resilient("supabase")
+def search_chats(user_id: str, query: str, limit: int = 10, offset: int = 0):
+    """
+    Full-text search a user's chat descriptions and messages.
+    Args:
+        user_id (str): The ID of the user.
+        query (str): Web-style search query ("quoted phrases", or, -exclusions).
+        limit (int): Page size.
+        offset (int): Number of results to skip.
+    Returns:
+        list: Matching chats (id, description, timestamp, expert_type, rank, snippet, total_count), best match first.
+    """
+    response = supabase.rpc("search_chats", {
+        "p_user_id": user_id,
+        "p_query": query,
+        "p_limit": limit,
+        "p_offset": offset
+    }).execute()
+    return response.data
+
+
+@resilient("supabase")
 def update_chat(chat_id: int, updates: dict):
     """
     Update an existing chat in the 'chats' table.
@@ -120,6 +295,7 @@ def update_chat(chat_id: int, updates: dict):
     return response
 
 
+@resilient("supabase")
 def delete_chat(chat_id: int):
     """
     Delete a chat by ID.
@@ -130,46 +306,242 @@ def delete_chat(chat_id: int):
     return response
 
 
+@resilient("supabase")
+def delete_chats(user_id: str, chat_ids: list):
+    """
+    Delete several chats of a user in one request.
+    Args:
+        user_id (str): The ID of the user, so only their own chats are deleted.
+        chat_ids (list): The IDs of the chats to delete.
+    """
+    if not chat_ids:
+        return None
+    response = supabase.table("chats").delete().eq("user_id", user_id).in_("id", list(chat_ids)).execute()
+    return response
+
+
 ### -------------------------------------------
-### ✅ API USAGE FUNCTIONS (Optional)
+### ✅ QUESTION BANK FUNCTIONS
 ### -------------------------------------------
 
-def increment_api_calls(user_id: str, max_calls=10):
+@resilient("supabase")
+def save_questions(questions: list):
     """
-    Increment API call count for the user.
-    Resets count if it's a new day.
+    Store generated questions in the 'question_bank' table.
+    Questions already in the bank (same question_hash) are skipped.
     Args:
-        user_id (str): The ID of the user.
-        max_calls (int): Max allowed calls per day.
+        questions (list): Structured questions with text, style, difficulty, tags and question_hash.
+    Returns:
+        list: The newly inserted rows.
+    """
+    if not questions:
+        return []
+    rows = [
+        {
+            "question_hash": question["question_hash"],
+            "text": question["text"],
+            "style": question["style"],
+            "difficulty": question["difficulty"],
+            "tags": question.get("tags", []),
+            "search_text": f"{question['text']} {' '.join(question.get('tags', []))}"
+        }
+        for question in questions
+    ]
+    response = supabase.table("question_bank").upsert(
+        rows, on_conflict="question_hash", ignore_duplicates=True
+    ).execute()
+    return response.data
+
+
+@resilient("supabase")
+def search_question_bank(terms: list, style: str = None, difficulty: str = None, limit: int = 10, min_matches: int = 1):
+    """
+    Full-text search the question bank, ranked with ts_rank against all terms.
+    Args:
+        terms (list): Keywords.
+        style (str): Optional question style filter.
+        difficulty (str): Optional difficulty filter.
+        limit (int): Max number of questions to return.
+        min_matches (int): How many of the terms a question must contain to count as a hit.
+    Returns:
+        list: Matching question records, best match first. Often served questions rank lower, so they rotate.
+    """
+    if not terms:
+        return []
+    response = supabase.rpc("search_question_bank", {
+        "p_terms": terms,
+        "p_style": style,
+        "p_difficulty": difficulty,
+        "p_limit": limit,
+        "p_min_matches": min(min_matches, len(terms))
+    }).execute()
+    return response.data
+
+
+@resilient("supabase", retry=False)
+def mark_questions_served(question_ids: list):
+    """
+    Bump the served counter of questions handed out from the bank.
+    Args:
+        question_ids (list): IDs of the served questions.
+    """
+    if not question_ids:
+        return None
+    response = supabase.rpc("increment_questions_served", {"question_ids": question_ids}).execute()
+    return response
+
+
+### -------------------------------------------
+### ✅ CODING QUESTION POOL FUNCTIONS
+### -------------------------------------------
+
+@resilient("supabase")
+def count_pool_questions(bucket_key: str) -> int:
+    """
+    Count the ready (unclaimed) questions in a pool bucket.
+    Args:
+        bucket_key (str): The pool bucket, see question_pool.bucket_key().
+    Returns:
+        int: Number of unclaimed questions.
+    """
+    response = supabase.table("coding_question_pool").select("id", count="exact") \
+        .eq("bucket_key", bucket_key).is_("claimed_at", "null").execute()
+    return response.count or 0
+
+
+@resilient("supabase", retry=False)
+def save_pool_questions(rows: list):
+    """
+    Insert prefetched questions into the 'coding_question_pool' table.
+    Args:
+        rows (list): Pool rows with bucket_key, question, tests, model and token counts.
+    """
+    if not rows:
+        return None
+    response = supabase.table("coding_question_pool").insert(rows).execute()
+    return response
+
+
+@resilient("supabase", retry=False)
+def claim_pool_question(bucket_key: str):
+    """
+    Atomically claim one ready question from a pool bucket.
+    Args:
+        bucket_key (str): The pool bucket to claim from.
+    Returns:
+        dict: The claimed row plus the number of questions still "remaining", or None if the bucket is empty.
+    """
+    response = supabase.rpc("claim_pool_question", {"p_bucket_key": bucket_key}).execute()
+    if response.data:
+        return response.data[0]
+    return None
+
+
+### -------------------------------------------
+### ✅ JOB PROFILE FUNCTIONS
+### -------------------------------------------
+
+@resilient("supabase")
+def get_jd_profile(jd_hash: str):
+    """
+    Fetch the stored profile of a job description.
+    Args:
+        jd_hash (str): Hash of the normalized job description, see jd_profile.jd_key().
     Returns:
-        bool: True if call is allowed, False if limit exceeded.
+        dict: The profile, or None if the description has not been analyzed yet.
     """
-    today = datetime.utcnow().date()
+    response = supabase.table("jd_profiles").select("profile").eq("jd_hash", jd_hash).limit(1).execute()
+    if response.data:
+        return response.data[0]["profile"]
+    return None
 
-    # Get current call count and last call date from Supabase
-    user = supabase.table("users").select("call_count", "last_call_date").eq("id", user_id).execute()
-    if user.data:
-        current_count = user.data[0].get("call_count", 0)
-        last_call_date = user.data[0].get("last_call_date")
 
-        # Reset call count if it's a new day
-        if last_call_date != str(today):
-            current_count = 0
+@resilient("supabase")
+def save_jd_profile(jd_hash: str, profile: dict, model: str):
+    """
+    Store the profile of a job description; a profile already stored for the same hash is kept.
+    Args:
+        jd_hash (str): Hash of the normalized job description.
+        profile (dict): role, seniority, domain, skills and stack.
+        model (str): The model that built the profile.
+    """
+    supabase.table("jd_profiles").upsert(
+        {"jd_hash": jd_hash, "profile": profile, "model": model},
+        on_conflict="jd_hash", ignore_duplicates=True, returning=ReturnMethod.minimal
+    ).execute()
 
-        # Check if the limit is reached
-        if current_count >= max_calls:
-            return False
 
-        # Increment the call count and update last_call_date
-        new_count = current_count + 1
-        supabase.table("users").update({
-            "call_count": new_count,
-            "last_call_date": today.isoformat()
-        }).eq("id", user_id).execute()
+### -------------------------------------------
+### ✅ MOCK INTERVIEW FUNCTIONS
+### -------------------------------------------
 
-        return True
+@resilient("supabase")
+def save_mock_interview(user_id: str, session_id: str, settings: dict, results: dict, started_at: str, finished_at: str):
+    """
+    Save a finished mock interview run into the 'mock_interviews' table.
+    Args:
+        user_id (str): The ID of the user.
+        session_id (str): Unique ID of the run (saving twice updates the same row).
+        settings (dict): Interview settings of the run.
+        results (dict): Aggregated results, see mock_interview.aggregate_results().
+        started_at (str): ISO timestamp of the start.
+        finished_at (str): ISO timestamp of the end.
+    """
+    data = {
+        "id": session_id,
+        "user_id": user_id,
+        "settings": settings,
+        "overall_score": results["overall_score"],
+        "results": results,
+        "started_at": started_at,
+        "finished_at": finished_at
+    }
+    response = supabase.table("mock_interviews").upsert(data).execute()
+    return response
+
+
+@resilient("supabase")
+def get_user_mock_interviews(user_id: str, limit: int = 20):
+    """
+    Retrieve a user's past mock interview runs, newest first.
+    Args:
+        user_id (str): The ID of the user.
+        limit (int): Max number of runs to return.
+    Returns:
+        list: Mock interview records.
+    """
+    response = supabase.table("mock_interviews").select("*").eq("user_id", user_id) \
+        .order("started_at", desc=True).limit(limit).execute()
+    return response.data
+
+
+### -------------------------------------------
+### ✅ API USAGE FUNCTIONS (Optional)
+### -------------------------------------------
+
+@resilient("supabase")
+def charge_user_quota(user_id: str, amount: float, capacity: float, refill_per_second: float, request_id: str = None):
+    """
+    Refill a user's spend bucket, take `amount` dollars from it and return what is left.
+    Args:
+        user_id (str): The ID of the user.
+        amount (float): Dollars spent since the last charge; 0 just reads the level, negative gives spend back.
+        capacity (float): Bucket size in dollars.
+        refill_per_second (float): Dollars added back per second.
+        request_id (str): UUID of the charge; a charge with an ID already applied is not applied again,
+                          which makes retrying it safe.
+    Returns:
+        float: The bucket level after the charge, or None if the user does not exist.
+    """
+    response = supabase.rpc("charge_quota", {
+        "p_user_id": user_id,
+        "p_amount": amount,
+        "p_capacity": capacity,
+        "p_refill_per_second": refill_per_second,
+        "p_request_id": request_id
+    }).execute()
+    return None if response.data is None else float(response.data)
 
-    return False
 
 def validate_password(password: str) -> bool:
     """
@@ -0,0 +1,20 @@
+import os
+import sys
+import types
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+
+def _no_supabase(name):
+    def call(*args, **kwargs):
+        raise AssertionError(f"Unexpected Supabase call: {name}")
+    return call
+
+
+# Unit tests never reach Supabase (the real helpers read Streamlit secrets on import). Modules under test
+# import their helpers from this stand-in, and each test patches the ones it uses on the module under test.
+if "supabase_helpers" not in sys.modules:
+    _helpers = types.ModuleType("supabase_helpers")
+    _helpers.__getattr__ = _no_supabase
+    sys.modules["supabase_helpers"] = _helpers
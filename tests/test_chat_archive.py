@@ -0,0 +1,102 @@
+import base64
+import json
+
+import pytest
+
+import chat_archive
+from chat_archive import compress_messages, load_chat_messages, rehydrate_messages
+from prompts import build_expert_system_message
+
+EXPERT = "Software Engineer"
+
+
+def _chat(system_prompt=None):
+    return [
+        {"role": "system", "content": build_expert_system_message(EXPERT) if system_prompt is None else system_prompt},
+        {"role": "user", "content": "How do I avoid a race condition in Python? ```python\nlock = Lock()\n```"},
+        {"role": "assistant", "content": "Use a lock — for example `threading.Lock()`. ünïcödé stays intact."}
+    ]
+
+
+def test_round_trip_restores_the_messages():
+    messages = _chat()
+    blob = compress_messages(json.dumps(messages), EXPERT)
+
+    assert blob.startswith(f"{chat_archive.CURRENT_VERSION}:")
+    assert json.loads(rehydrate_messages(blob, EXPERT)) == messages
+
+
+def test_current_expert_prompt_is_stored_as_a_versioned_reference():
+    # Fails when prompts.build_expert_system_message() changes without a new frozen template version
+    blob = compress_messages(json.dumps(_chat()), EXPERT)
+    version, encoded = blob.split(":", 1)
+    stored = json.loads(chat_archive._decompress(base64.b64decode(encoded), version))
+
+    assert stored[0] == {"role": "system", "template": "expert", "version": "e1"}
+
+
+def test_unknown_system_prompt_is_kept_literally():
+    messages = _chat(system_prompt="You are a pirate. Answer in rhymes.")
+    blob = compress_messages(json.dumps(messages), EXPERT)
+    assert json.loads(rehydrate_messages(blob, EXPERT)) == messages
+
+
+def test_messages_encoded_twice_round_trip():
+    messages = _chat()
+    blob = compress_messages(json.dumps(json.dumps(messages)), EXPERT)
+    assert json.loads(rehydrate_messages(blob, EXPERT)) == messages
+
+
+def test_references_without_a_version_use_the_first_template():
+    data = json.dumps([{"role": "system", "template": "expert"}]).encode("utf-8")
+    blob = f"z1:{base64.b64encode(chat_archive._compress(data, 'z1')).decode('ascii')}"
+    assert json.loads(rehydrate_messages(blob, EXPERT))[0]["content"] == build_expert_system_message(EXPERT)
+
+
+def test_load_reads_whichever_tier_holds_the_chat(monkeypatch):
+    messages = _chat()
+    records = {
+        1: {"messages": json.dumps(messages), "archived_messages": None, "expert_type": EXPERT},
+        2: {"messages": None, "archived_messages": compress_messages(json.dumps(messages), EXPERT), "expert_type": EXPERT}
+    }
+    monkeypatch.setattr(chat_archive, "get_chat_record", records.get)
+
+    assert json.loads(load_chat_messages(1)) == messages
+    assert json.loads(load_chat_messages(2)) == messages
+    assert load_chat_messages(3) is None
+
+
+@pytest.fixture
+def live_chats(monkeypatch):
+    rows = [
+        {"id": 1, "messages": json.dumps(_chat()), "expert_type": EXPERT, "updated_at": "2026-01-01T00:00:00"},
+        {"id": 2, "messages": _chat(), "expert_type": EXPERT, "updated_at": "2026-01-02T00:00:00"},
+        {"id": 3, "messages": json.dumps(_chat()), "expert_type": EXPERT, "updated_at": "2026-01-03T00:00:00"}
+    ]
+    archived = {}
+
+    def get_chats_to_archive(before, after_id, limit):
+        return [row for row in rows if row["id"] > after_id][:limit]
+
+    def archive_chat(chat_id, blob, updated_at):
+        # Chat 3 was saved again after it was read, so the guarded update matches nothing
+        if chat_id == 3:
+            return False
+        archived[chat_id] = (blob, updated_at)
+        return True
+
+    monkeypatch.setattr(chat_archive, "get_chats_to_archive", get_chats_to_archive)
+    monkeypatch.setattr(chat_archive, "archive_chat", archive_chat)
+    return rows, archived
+
+
+def test_archive_run_pages_through_chats_and_guards_on_updated_at(live_chats):
+    rows, archived = live_chats
+
+    run = chat_archive.archive_old_chats(older_than_days=30, batch_size=2)
+
+    assert run["chats"] == 2
+    assert sorted(archived) == [1, 2]
+    assert archived[1][1] == rows[0]["updated_at"]
+    assert 0 < run["stored_bytes"] < run["raw_bytes"]
+    assert json.loads(rehydrate_messages(archived[2][0], EXPERT)) == rows[1]["messages"]
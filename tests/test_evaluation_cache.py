@@ -0,0 +1,69 @@
+import evaluation_cache
+from evaluation_cache import (
+    cache_evaluation, evaluation_key, get_cached_evaluation, normalize_code, small_edit_diff
+)
+
+SOLUTION = '''
+def solve(nums):
+    """Return the sum."""
+    total = 0
+    for n in nums:
+        total += n
+    return total
+'''
+
+
+def test_python_formatting_comments_and_docstrings_are_ignored():
+    reformatted = (
+        "def solve(nums):   # add them up\n"
+        "    total=0\n"
+        "    for n in nums: total += n\n"
+        "\n"
+        "    return total\n"
+    )
+    assert normalize_code(SOLUTION, "Python") == normalize_code(reformatted, "Python")
+
+
+def test_python_logic_changes_are_not_ignored():
+    changed = SOLUTION.replace("total += n", "total -= n")
+    assert normalize_code(SOLUTION, "Python") != normalize_code(changed, "Python")
+
+
+def test_python_with_syntax_errors_falls_back_to_text():
+    broken = "def solve(nums)  # missing colon\n    return   sum(nums)\n"
+    assert normalize_code(broken, "Python") == "def solve(nums) return sum(nums)"
+
+
+def test_other_languages_drop_comments_and_whitespace():
+    code = "int solve() {\n  /* block */\n  return 1; // line\n}\n"
+    assert normalize_code(code, "Java") == "int solve() { return 1; }"
+
+
+def test_evaluation_key_depends_on_code_and_settings_not_layout():
+    key = evaluation_key("Sum a list", SOLUTION, "Python", "Friendly", 2)
+    assert key == evaluation_key("  Sum a list\n", SOLUTION.replace("    ", "  "), "Python", "Friendly", 2)
+    assert key != evaluation_key("Sum a list", SOLUTION, "Python", "Challenging", 2)
+    assert key != evaluation_key("Sum a list", SOLUTION, "Python", "Friendly", 3)
+
+
+def test_cache_drops_least_recently_used(monkeypatch):
+    monkeypatch.setattr(evaluation_cache, "MAX_CACHED_EVALUATIONS", 2)
+    monkeypatch.setattr(evaluation_cache, "_cache", type(evaluation_cache._cache)())
+    cache_evaluation("a", {"feedback": "A"})
+    cache_evaluation("b", {"feedback": "B"})
+    get_cached_evaluation("a")
+    cache_evaluation("c", {"feedback": "C"})
+
+    assert get_cached_evaluation("b") is None
+    assert get_cached_evaluation("a") == {"feedback": "A"}
+    assert get_cached_evaluation("c") == {"feedback": "C"}
+
+
+def test_small_edit_gives_a_diff_and_a_rewrite_does_not():
+    edited = SOLUTION.replace("total = 0", "total = 0  # start")
+    diff = small_edit_diff(SOLUTION, edited)
+    assert diff is not None and "+    total = 0  # start" in diff
+
+    rewrite = "def solve(nums):\n    return sum(x for x in nums)\n"
+    assert small_edit_diff(SOLUTION, rewrite) is None
+    assert small_edit_diff(SOLUTION, SOLUTION) is None
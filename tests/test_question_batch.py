@@ -0,0 +1,104 @@
+import json
+
+import question_batch
+from question_batch import LocalBatch, build_jobs, ingest_results, run_batch, resume_batch, write_requests
+
+
+def _saved():
+    saved = []
+
+    def save(questions):
+        saved.extend(questions)
+        return questions
+
+    return saved, save
+
+
+def test_build_jobs_covers_every_combination():
+    jobs = build_jobs(["Backend engineer", "Data analyst"], ("Technical", "Behavioral"), ("Basic",), num_questions=3)
+    assert [job["custom_id"] for job in jobs] == ["q0", "q1", "q2", "q3"]
+    assert {(job["role"], job["style"]) for job in jobs} == {
+        ("Backend engineer", "Technical"), ("Backend engineer", "Behavioral"),
+        ("Data analyst", "Technical"), ("Data analyst", "Behavioral")
+    }
+    assert all(job["num_questions"] == 3 for job in jobs)
+
+
+def test_local_batch_answers_every_request_in_the_provider_format(tmp_path):
+    jobs = build_jobs(["Python backend developer"], ("Technical",), ("Basic", "Comprehensive"), num_questions=2)
+    requests_path = tmp_path / "requests.jsonl"
+    write_requests(str(requests_path), jobs)
+
+    backend = LocalBatch(str(tmp_path))
+    batch_id = backend.submit(str(requests_path))
+    assert backend.status(batch_id) == {"status": "completed", "completed": 2, "failed": 0, "total": 2}
+
+    lines = [json.loads(line) for line in backend.results(batch_id)]
+    assert [line["custom_id"] for line in lines] == ["q0", "q1"]
+    body = lines[0]["response"]["body"]
+    assert lines[0]["response"]["status_code"] == 200
+    assert len(json.loads(body["choices"][0]["message"]["content"])["questions"]) == 2
+    assert body["usage"]["prompt_tokens"] > 0
+
+
+def test_ingest_skips_failed_lines_and_duplicates():
+    jobs = {"q0": {"style": "Technical", "difficulty": "Basic"}}
+    answer = json.dumps({"questions": [{"text": "What is a race condition?", "tags": ["concurrency"]}] * 2})
+    lines = [
+        json.dumps({"custom_id": "q0", "error": None, "response": {"status_code": 200, "body": {
+            "choices": [{"message": {"content": answer}}], "usage": {"prompt_tokens": 10, "completion_tokens": 5}
+        }}}),
+        json.dumps({"custom_id": "q0", "error": {"message": "boom"}, "response": None}),
+        json.dumps({"custom_id": "unknown", "error": None, "response": {"status_code": 200, "body": {}}}),
+        ""
+    ]
+    saved, save = _saved()
+
+    summary = ingest_results(lines, jobs, save)
+
+    assert summary == {"answered": 1, "failed": 2, "parsed": 1, "saved": 1, "input_tokens": 10, "output_tokens": 5}
+    assert saved[0]["style"] == "Technical" and saved[0]["difficulty"] == "Basic"
+
+
+def test_ingest_saves_in_chunks():
+    jobs = {f"q{i}": {"style": "Technical", "difficulty": "Basic"} for i in range(3)}
+    lines = [
+        json.dumps({"custom_id": f"q{i}", "error": None, "response": {"status_code": 200, "body": {
+            "choices": [{"message": {"content": json.dumps({"questions": [{"text": f"Question {i}?"}]})}}]
+        }}})
+        for i in range(3)
+    ]
+    chunks = []
+
+    summary = ingest_results(lines, jobs, lambda questions: chunks.append(len(questions)) or questions, chunk_size=2)
+
+    assert chunks == [2, 1]
+    assert summary["saved"] == 3
+
+
+def test_run_and_resume_with_the_local_backend(tmp_path):
+    saved, save = _saved()
+    reports = []
+
+    summary = run_batch(["Site reliability engineer"], ("Technical",), ("Basic",), num_questions=3,
+                        backend=LocalBatch(str(tmp_path)), directory=str(tmp_path), save=save,
+                        report=reports.append)
+
+    assert summary["answered"] == 1 and summary["parsed"] == 3 and len(saved) == 3
+    job = json.loads((tmp_path / "job.json").read_text())
+    assert job["local"] is True
+
+    # A resumed local job finds its backend from job.json and ingests the same results again
+    saved_again, save_again = _saved()
+    assert resume_batch(str(tmp_path), save=save_again, report=reports.append)["parsed"] == 3
+    assert [question["question_hash"] for question in saved_again] == [question["question_hash"] for question in saved]
+
+
+def test_sample_completion_follows_the_request():
+    content = question_batch.sample_completion({"messages": [{"role": "user", "content": (
+        "Generate 4 concise technical questions (style: Technical, difficulty: Basic) based on the following "
+        "job description:\n\nKubernetes platform engineer"
+    )}]})
+    questions = json.loads(content)["questions"]
+    assert len(questions) == 4
+    assert questions[0]["style"] == "Technical" and questions[0]["difficulty"] == "Basic"
@@ -0,0 +1,97 @@
+import pytest
+
+import quota as quota_module
+from quota import SpendQuota
+
+
+class FakeQuotaTable:
+    """Shared bucket with the idempotency of the charge_quota RPC: a request id is applied once"""
+
+    def __init__(self, level: float):
+        self.level = level
+        self.applied = set()
+        self.calls = []
+        self.lose_responses = 0
+
+    def __call__(self, user_id, amount, capacity, rate, request_id=None):
+        self.calls.append((request_id, amount))
+        if request_id is None or request_id not in self.applied:
+            self.level -= amount
+            if request_id is not None:
+                self.applied.add(request_id)
+        if self.lose_responses:
+            self.lose_responses -= 1
+            raise ConnectionError("response lost")
+        return self.level
+
+
+@pytest.fixture
+def table(monkeypatch):
+    table = FakeQuotaTable(1.0)
+    monkeypatch.setattr(quota_module, "charge_user_quota", table)
+    return table
+
+
+def test_charges_are_local_until_reconciled(table):
+    spend = SpendQuota(capacity=1.0)
+    assert spend.allows("u1", 0.5)
+    spend.charge("u1", 0.25)
+
+    assert spend.remaining("u1") == pytest.approx(0.75, abs=1e-3)
+    assert table.level == 1.0
+    spend.reconcile("u1")
+    assert table.level == pytest.approx(0.75)
+    assert not spend.buckets["u1"].dirty
+
+
+def test_resent_charge_is_applied_once(table):
+    spend = SpendQuota(capacity=1.0)
+    spend.charge("u1", 0.25)
+    table.lose_responses = 1
+
+    spend.reconcile("u1")  # Reaches the table, but the response is lost
+    assert spend.buckets["u1"].dirty
+    spend.charge("u1", 0.1)
+    spend.reconcile("u1")  # Resends the same id and amount; the new spend waits for the next push
+
+    first, second = table.calls[1:]
+    assert first == second
+    assert table.level == pytest.approx(0.75)
+    assert spend.buckets["u1"].pending == pytest.approx(0.1)
+    assert spend.remaining("u1") == pytest.approx(0.65, abs=1e-3)
+
+    spend.reconcile("u1")
+    assert table.level == pytest.approx(0.65)
+    assert not spend.buckets["u1"].dirty
+
+
+def test_reconcile_skips_a_bucket_already_syncing(table):
+    spend = SpendQuota(capacity=1.0)
+    spend.charge("u1", 0.25)
+    spend.buckets["u1"].syncing = True
+
+    spend.reconcile("u1")
+
+    assert len(table.calls) == 1  # Only the initial read
+    assert spend.buckets["u1"].pending == pytest.approx(0.25)
+
+
+def test_flush_pushes_every_dirty_bucket(table):
+    spend = SpendQuota(capacity=1.0)
+    spend.charge("u1", 0.1)
+    spend.charge("u2", 0.2)
+    spend.remaining("u3")
+
+    spend.flush()
+
+    pushed = sorted(amount for request_id, amount in table.calls if request_id is not None)
+    assert pushed == pytest.approx([0.1, 0.2])
+    assert not any(bucket.dirty for bucket in spend.buckets.values())
+
+
+def test_unreadable_quota_starts_full(monkeypatch):
+    def failing(*args, **kwargs):
+        raise ConnectionError("down")
+
+    monkeypatch.setattr(quota_module, "charge_user_quota", failing)
+    assert SpendQuota(capacity=0.5).remaining("u1") == pytest.approx(0.5)
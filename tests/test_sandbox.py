@@ -0,0 +1,74 @@
+import pytest
+
+import sandbox
+from sandbox import describe_mismatch, run_test_cases, sandbox_available, split_question_and_tests, summarize_results
+
+SPEC = {"function_name": "solve", "test_cases": [{"input": [1, 2], "expected": 3}]}
+
+needs_sandbox = pytest.mark.skipif(not sandbox_available(), reason="this host has no unprivileged user namespaces")
+
+
+def test_split_question_and_tests():
+    content = 'Add two numbers.\n```json\n{"function_name": "solve", "test_cases": [' \
+              '{"input": [1, 2], "expected": 3}, {"input": "bad"}]}\n```'
+    question, spec = split_question_and_tests(content)
+    assert question == "Add two numbers."
+    assert spec["test_cases"] == [{"input": [1, 2], "expected": 3}]
+    assert split_question_and_tests("No tests here")[1] is None
+
+
+@pytest.mark.parametrize("output, expected, detail", [
+    ("3", 3, "return value: got string, expected number"),
+    ([1, 2], [1, 2, 3], "return value: got 2 items, expected 3"),
+    ([1, "x"], [1, 2], "return value[1]: got string, expected number"),
+    ({"a": 1}, {"b": 1}, "return value: keys differ from the expected ones"),
+    ({"a": [1, 5]}, {"a": [1, 2]}, "return value['a'][1]: differs from the expected value"),
+])
+def test_mismatch_describes_where_not_what(output, expected, detail):
+    assert describe_mismatch(output, expected) == detail
+
+
+def test_syntax_errors_are_reported_without_running():
+    results = run_test_cases("def solve(a, b) return a + b", SPEC)
+    assert results[0]["error"].startswith("SyntaxError on line 1")
+
+
+@needs_sandbox
+def test_correct_and_wrong_solutions():
+    assert run_test_cases("def solve(a, b):\n    print('noise')\n    return a + b", SPEC)[0]["passed"]
+    wrong = run_test_cases("def solve(a, b): return str(a + b)", SPEC)[0]
+    assert not wrong["passed"] and wrong["detail"] == "return value: got string, expected number"
+    assert summarize_results([wrong]).endswith("input=[1, 2]; return value: got string, expected number")
+
+
+@needs_sandbox
+def test_solutions_cannot_read_secrets_or_files(monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "sk-live-secret")
+    code = (
+        "import os\n"
+        "def solve(a, b):\n"
+        "    return os.environ.get('OPENAI_API_KEY', '') + open('/etc/hostname').read()\n"
+    )
+    result = run_test_cases(code, SPEC)[0]
+    assert not result["passed"]
+    assert "sk-live-secret" not in repr(result)
+    assert result["error"].startswith("FileNotFoundError")
+
+
+@needs_sandbox
+def test_solutions_have_no_network_and_cannot_leave_the_chroot():
+    network = run_test_cases("import socket\ndef solve(a, b): return socket.gethostname()", SPEC)[0]
+    assert network["error"] == "ModuleNotFoundError: No module named 'socket'"
+
+    escape = run_test_cases(
+        "import os\ndef solve(a, b):\n    os.mkdir('e'); os.chroot('e'); os.chdir('../..'); os.chroot('.')\n", SPEC
+    )[0]
+    assert escape["error"].startswith("PermissionError")
+
+
+@needs_sandbox
+def test_runaway_solutions_hit_the_limits():
+    timeout = run_test_cases("def solve(a, b):\n    while True: pass", SPEC, time_limit=0.5)[0]
+    assert timeout["error"] == "Time limit exceeded (0.5s)"
+    memory = run_test_cases("def solve(a, b): return len(bytearray(10 ** 9))", SPEC)[0]
+    assert memory["error"] == f"Memory limit exceeded ({sandbox.MEMORY_LIMIT_MB} MB)"
@@ -0,0 +1,82 @@
+import time
+
+import pytest
+
+import session_tokens
+from session_tokens import (
+    drop_snapshot, issue_token, load_snapshot, revoke_token, save_snapshot, verify_token
+)
+
+
+@pytest.fixture
+def revoked(monkeypatch):
+    """In-memory revoked_sessions table"""
+    revoked = {}
+    monkeypatch.setattr(session_tokens, "revoke_session", lambda sid, expires_at: revoked.__setitem__(sid, expires_at))
+    monkeypatch.setattr(session_tokens, "is_session_revoked", lambda sid: sid in revoked)
+    return revoked
+
+
+def test_issued_token_verifies(revoked):
+    claims = verify_token(issue_token(7, "ada"))
+    assert claims["uid"] == 7 and claims["usr"] == "ada"
+    assert claims["exp"] > time.time()
+
+
+def test_every_token_has_its_own_session_id(revoked):
+    assert verify_token(issue_token(7, "ada"))["sid"] != verify_token(issue_token(7, "ada"))["sid"]
+
+
+def test_tampered_or_malformed_tokens_are_rejected(revoked):
+    payload, signature = issue_token(7, "ada").split(".")
+    other_payload = issue_token(8, "eve").split(".")[0]
+    assert verify_token(f"{other_payload}.{signature}") is None
+    assert verify_token(f"{payload}.{signature[:-2]}xx") is None
+    assert verify_token("not-a-token") is None
+    assert verify_token("a.b.c") is None
+
+
+def test_expired_tokens_are_rejected(revoked, monkeypatch):
+    monkeypatch.setattr(session_tokens, "SESSION_TTL_SECONDS", -1)
+    assert verify_token(issue_token(7, "ada")) is None
+
+
+def test_tokens_from_another_secret_are_rejected(revoked, monkeypatch):
+    token = issue_token(7, "ada")
+    monkeypatch.setattr(session_tokens, "_secret", b"another server secret")
+    assert verify_token(token) is None
+
+
+def test_revoked_token_is_rejected_and_others_are_not(revoked):
+    token, other = issue_token(7, "ada"), issue_token(7, "ada")
+    revoke_token(token)
+
+    assert verify_token(token) is None
+    assert verify_token(other) is not None
+    assert len(revoked) == 1
+
+
+def test_revoking_an_invalid_token_does_nothing(revoked):
+    revoke_token("not-a-token")
+    assert revoked == {}
+
+
+def test_verification_fails_closed_when_revocation_cannot_be_checked(revoked, monkeypatch):
+    def unavailable(sid):
+        raise ConnectionError("down")
+
+    monkeypatch.setattr(session_tokens, "is_session_revoked", unavailable)
+    assert verify_token(issue_token(7, "ada")) is None
+
+
+def test_snapshots_are_copies():
+    state = {"current_user": "ada", "chat_history": {"1": "First chat"}, "messages": ["not restorable"]}
+    save_snapshot("u-snapshot", state)
+
+    restored = load_snapshot("u-snapshot")
+    assert restored == {"current_user": "ada", "chat_history": {"1": "First chat"}}
+    restored["chat_history"]["2"] = "Changed"
+    assert state["chat_history"] == {"1": "First chat"}
+
+    drop_snapshot("u-snapshot")
+    assert load_snapshot("u-snapshot") is None
@@ -0,0 +1,143 @@
+import hashlib
+import logging
+
+import streamlit as st
+
+from chat_archive import archive_async
+from session_store import chat_summaries
+from session_tokens import issue_token, verify_token, revoke_token, load_snapshot, save_snapshot, drop_snapshot
+from supabase_helpers import get_user, save_user, validate_password, get_user_chat_summaries
+
+logger = logging.getLogger(__name__)
+
+
+def hash_password(password):
+    """Hash password for secure storage"""
+    return hashlib.sha256(password.encode()).hexdigest()
+
+
+# Query parameter holding the signed session token, so a refresh or reconnect stays logged in.
+# The token in the URL is single-use: restoring a session replaces it, and logging out revokes it,
+# so a URL from the browser history, a shared link or a Referer header cannot log in later.
+SESSION_QUERY_PARAM = "session"
+
+
+def restore_session():
+    """
+    Log a refreshed or reconnected browser back in from its session token, without re-running the login.
+    The token is exchanged for a new one, and the old one revoked.
+    """
+    if st.session_state.logged_in:
+        return
+    token = st.query_params.get(SESSION_QUERY_PARAM)
+    if not token:
+        return
+    claims = verify_token(token)
+    if claims is None:
+        del st.query_params[SESSION_QUERY_PARAM]
+        return
+    try:
+        revoke_token(token)
+    except Exception as e:
+        # Without the revocation the old token would stay usable; make the user log in instead
+        logger.warning("Could not exchange session token: %s", e)
+        del st.query_params[SESSION_QUERY_PARAM]
+        return
+    st.query_params[SESSION_QUERY_PARAM] = issue_token(claims["uid"], claims["usr"])
+
+    snapshot = load_snapshot(claims["uid"])
+    if snapshot is None:
+        # No snapshot in this server process (e.g. after a restart): load what login would have
+        snapshot = {
+            "current_user": claims["usr"],
+            "current_user_id": claims["uid"],
+            "chat_history": chat_summaries(get_user_chat_summaries(claims["uid"]))
+        }
+    for key, value in snapshot.items():
+        st.session_state[key] = value
+    st.session_state.logged_in = True
+
+
+def remember_session():
+    """Snapshot the logged-in session on every run, so the next reconnect can restore it"""
+    if st.session_state.logged_in:
+        save_snapshot(st.session_state.current_user_id, st.session_state)
+
+
+def end_session():
+    """Revoke the session token and forget the snapshot on logout"""
+    drop_snapshot(st.session_state.get("current_user_id"))
+    token = st.query_params.get(SESSION_QUERY_PARAM)
+    if token:
+        try:
+            revoke_token(token)
+        except Exception as e:
+            logger.error("Could not revoke session token on logout: %s", e)
+        del st.query_params[SESSION_QUERY_PARAM]
+
+
+def login_page():
+    col1, col2, col3 = st.columns([1, 3, 1])
+    with col2:
+        st.markdown("<h2 style='text-align: center;'>Login</h2>", unsafe_allow_html=True)
+        with st.form("login_form"):
+            username = st.text_input("Username")
+            password = st.text_input("Password", type="password")
+            submit = st.form_submit_button("Login", use_container_width=True)
+
+            if submit:
+                if username and password:
+                    user = get_user(username)
+                    if user is None:
+                        st.error("Username not found!")
+                    else:
+                        if user["password"] == hash_password(password):
+                            st.session_state.logged_in = True
+                            st.session_state.current_user = username
+                            st.session_state.current_user_id = user["id"]
+
+                            # ✅ Load chat history from Supabase chats table
+                            st.session_state.chat_history = chat_summaries(get_user_chat_summaries(user["id"]))
+
+                            # Keep the user logged in across refreshes and reconnects
+                            st.query_params[SESSION_QUERY_PARAM] = issue_token(user["id"], username)
+
+                            # Move chats nobody has saved for a while to the compressed tier (throttled per process)
+                            archive_async()
+
+                            st.success("Login successful!")
+                            st.rerun()
+                        else:
+                            st.error("Incorrect password!")
+                else:
+                    st.error("Please fill in all fields!")
+
+
+def register_page():
+    col1, col2, col3 = st.columns([1, 3, 1])
+    with col2:
+        st.markdown("<h2 style='text-align: center;'>Register</h2>", unsafe_allow_html=True)
+        with st.form("register_form"):
+            username = st.text_input("Username")
+            password = st.text_input("Password", type="password")
+            confirm_password = st.text_input("Confirm Password", type="password")
+            submit = st.form_submit_button("Register", use_container_width=True)
+
+            if submit:
+                if username and password and confirm_password:
+                    if password != confirm_password:
+                        st.error("Passwords don't match!")
+                    elif not validate_password(password):
+                        st.error(
+                            "Password must be at least 8 characters, include at least one uppercase letter, "
+                            "one lowercase letter, one number, and one special character (@, #, $, %, &, *, !, etc.)."
+                        )
+                    elif get_user(username) is not None:
+                        st.error("Username already exists!")
+                    else:
+                        # ✅ Save the user after validation
+                        save_user(username, hash_password(password))
+                        st.success("Registration successful! Please login.")
+                        
+                else:
+                    st.error("Please fill in all fields!")
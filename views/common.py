@@ -0,0 +1,362 @@
+import functools
+import time
+
+import streamlit as st
+
+from chat_render import CHAT_WINDOW_TURNS, parse_message
+from jd_profile import get_job_profile
+from model_router import route_request, new_route_stats
+from providers import registry
+from question_bank import format_question
+from quota import quota
+from request_executor import execute_chat
+from session_store import ChatCache, new_function_usage
+
+# Run durations kept per region for the rerun timings panel
+MAX_RUN_TIMINGS = 20
+
+# Define prompting techniques
+PROMPT_TECHNIQUES = {
+    "Zero Shot": "Direct response without examples",
+    "Few Shot": "Using examples to guide the response",
+    "Chain of Thought": "Breaking down the reasoning process step by step",
+    "Self Consistency": "Generating multiple paths to verify the answer",
+    "Tree of Thoughts": "Exploring multiple reasoning branches systematically"
+}
+
+# Add this at the top with other constants
+EXPERT_TYPES = {
+    "Software Engineer": "Hi! I'm your Software Engineering expert. I can help you with software development, design architecture, and following best practices. What are you working on?",
+    "ML Engineer": "Hello! I'm your Machine Learning expert. I can support you in building ML models, working with AI, and analyzing data. How can I assist you today?",
+    "DevOps Engineer": "Hey there! I'm your DevOps expert. I can help you with deployment, automating infrastructure, and improving system reliability. What would you like to set up?",
+    "Security Engineer": "Hi! I'm your Security expert. I can assist you in writing secure code, preventing threats, and protecting your systems. What security challenge are you facing?",
+    "Frontend Engineer": "Hello! I'm your Frontend expert. I can help you create user interfaces, improve user experience, and work with web technologies. What’s your design goal?",
+    "Backend Engineer": "Hey! I'm your Backend expert. I can guide you in building server-side applications, managing databases, and creating APIs. What backend issue are you dealing with?",
+    "System Architect": "Hi! I'm your System Architecture expert. I can help you design scalable systems, define architecture, and plan enterprise solutions. What’s your big-picture goal?"
+}
+
+
+# Add this with other constants at the top
+IMAGE_STYLES = {
+    "Natural": "Photorealistic and natural looking",
+    "Artistic": "Artistic and stylized",
+    "Technical": "Technical diagrams and schematics",
+    "Minimal": "Clean and minimal design",
+    "Job related": "Professional imagery related to specific job roles",
+    "Realistic": "Highly detailed and lifelike representation"
+}
+
+# API cost per 1000 tokens of each chat model, from the provider registry (see providers.py)
+API_COSTS = registry.prices()
+
+# Models offered in the model pickers, after "Auto"
+CHAT_MODELS = registry.chat_models()
+
+# DALL-E 3 image generation costs
+IMAGE_COSTS = {
+    "dall-e-3": {
+        "standard_1024": 0.040,  # $0.040 per image at 1024x1024 standard quality
+        "hd_1024": 0.080,        # $0.080 per image at 1024x1024 HD quality
+        "standard_1792": 0.080,  # $0.080 per image at 1792x1792 standard quality
+        "hd_1792": 0.120         # $0.120 per image at 1792x1792 HD quality
+    }
+}
+
+# Size of a typical request, to check the spend quota before the actual cost is known
+TYPICAL_INPUT_TOKENS = 1000
+TYPICAL_OUTPUT_TOKENS = 500
+
+QUOTA_EXCEEDED_MESSAGE = "You have used up your API budget for now. It refills gradually over the day; please try again later."
+
+
+def new_model_costs():
+    """Zero cost for every configured model, kept per session"""
+    return dict.fromkeys(registry.models, 0.0)
+
+
+def init_session_state():
+    """Create the session state keys on a session's first run"""
+    if 'users' not in st.session_state:
+        st.session_state.users = {}
+    if 'logged_in' not in st.session_state:
+        st.session_state.logged_in = False
+    if 'current_user' not in st.session_state:
+        st.session_state.current_user = None
+    if 'messages' not in st.session_state:
+        st.session_state.messages = []
+    if 'generated_questions' not in st.session_state:
+        st.session_state.generated_questions = []
+    if 'current_question' not in st.session_state:
+        st.session_state.current_question = None
+    if 'custom_experts' not in st.session_state:
+        st.session_state.custom_experts = {}
+    if 'chat_history' not in st.session_state:
+        st.session_state.chat_history = {}
+    if 'chat_cache' not in st.session_state:
+        st.session_state.chat_cache = ChatCache()
+    if 'chat_window' not in st.session_state:
+        st.session_state.chat_window = 2 * CHAT_WINDOW_TURNS
+    if 'current_chat_id' not in st.session_state:
+        st.session_state.current_chat_id = None
+    if 'is_new_chat' not in st.session_state:
+        st.session_state.is_new_chat = True
+    if 'chat_counter' not in st.session_state:
+        st.session_state.chat_counter = 0
+    if 'chat_descriptions' not in st.session_state:
+        st.session_state.chat_descriptions = {}
+    if 'total_api_cost' not in st.session_state:
+        st.session_state.total_api_cost = 0.0
+    if 'total_input_tokens' not in st.session_state:
+        st.session_state.total_input_tokens = 0
+    if 'total_output_tokens' not in st.session_state:
+        st.session_state.total_output_tokens = 0
+    if 'model_costs' not in st.session_state:
+        st.session_state.model_costs = new_model_costs()
+    if 'function_usage' not in st.session_state:
+        st.session_state.function_usage = new_function_usage()
+    if 'route_stats' not in st.session_state:
+        st.session_state.route_stats = new_route_stats()
+
+
+def timed(region):
+    """
+    Record how long each run of a region takes ("app" for full reruns, fragment names for partial ones).
+    Apply below @st.fragment so every fragment rerun is measured.
+    """
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                timings = st.session_state.setdefault("run_timings", {}).setdefault(region, [])
+                timings.append(time.perf_counter() - started)
+                del timings[:-MAX_RUN_TIMINGS]
+        return wrapper
+    return decorator
+
+
+def get_sanitized_prompt(user_input, technique):
+    technique_prompts = {
+        "Zero Shot": f"""
+Question: {user_input}
+
+Response:""",
+        
+        "Few Shot": f"""
+Here are some examples to guide my response:
+
+Example 1: What is dependency injection?
+Response: Dependency injection is a design pattern where dependencies are passed into an object rather than created inside. This promotes loose coupling, improves testability, and enhances maintainability.
+
+Example 2: Explain SOLID principles
+Response: SOLID is an acronym for five design principles: 
+- Single Responsibility (a class should have one reason to change)
+- Open-Closed (open for extension, closed for modification)
+- Liskov Substitution (subtypes must be substitutable for base types)
+- Interface Segregation (specific interfaces are better than one general interface)
+- Dependency Inversion (depend on abstractions, not concretions)
+
+Question: {user_input}
+
+Response:""",
+        
+        "Chain of Thought": f"""
+I'll approach this question step by step:
+1. First, understand the core concept.
+2. Then, break down the components.
+3. Finally, explain with examples.
+
+Question: {user_input}
+
+Step-by-step solution:""",
+        
+        "Self Consistency": f"""
+I'll consider multiple approaches to ensure accuracy:
+
+Approach 1:
+Approach 2:
+Approach 3:
+
+Question: {user_input}
+
+Detailed analysis:""",
+        
+        "Tree of Thoughts": f"""
+I'll explore different branches of reasoning to provide a comprehensive answer:
+
+Branch 1 (Technical Perspective):
+Branch 2 (Practical Application):
+Branch 3 (Best Practices):
+
+Question: {user_input}
+
+Comprehensive analysis:"""
+    }
+    
+    return technique_prompts[technique]
+
+
+def create_chat_description(message):
+    """Create a concise 3-word description from a message using OpenAI"""
+    try:
+        result = execute_chat(
+            "chat_title",
+            "gpt-3.5-turbo",  # Using the more cost-effective model for this task
+            [
+                {"role": "system", "content": "Create a concise 3-word title for this chat topic. Make it descriptive and professional. Format: Word1 Word2 Word3"},
+                {"role": "user", "content": message}
+            ],
+            max_tokens=10,
+            temperature=0.3  # Lower temperature for more consistent titles
+        )
+        response = result["response"]
+        
+        # Calculate cost of this API call
+        cost_info = calculate_api_cost(response, result["model"])
+        record_extra_attempts(result)
+        
+        # Update total cost and tokens
+        st.session_state.total_api_cost += cost_info['total_cost']
+        st.session_state.total_input_tokens += cost_info['input_tokens']
+        st.session_state.total_output_tokens += cost_info['output_tokens']
+        
+        description = response.choices[0].message.content.strip()
+        # Ensure we only get 3 words max
+        words = description.split()[:3]
+        return ' '.join(words)
+    except Exception as e:
+        st.error(f"Error generating description: {str(e)}")
+        return "Untitled Chat Topic"
+
+def estimate_cost(model, input_tokens=TYPICAL_INPUT_TOKENS, output_tokens=TYPICAL_OUTPUT_TOKENS):
+    """Dollar cost of a chat request of this size; unknown models and "Auto" are priced at the cheapest model"""
+    prices = API_COSTS.get(model) or min(API_COSTS.values(), key=lambda price: price["input"] + price["output"])
+    return (input_tokens / 1000) * prices["input"] + (output_tokens / 1000) * prices["output"]
+
+def has_quota(model=None, cost=None):
+    """True if the user's spend quota covers a typical request on `model`, or a request of `cost` dollars"""
+    return quota.allows(st.session_state.current_user_id, estimate_cost(model) if cost is None else cost)
+
+def charge_quota(cost):
+    """Take the actual cost of a request from the user's spend quota"""
+    quota.charge(st.session_state.current_user_id, cost)
+
+def calculate_api_cost(response, model="gpt-4"):
+    """Calculate the cost of an API call based on token usage and model"""
+    usage = response.usage
+    input_tokens = usage.prompt_tokens
+    output_tokens = usage.completion_tokens
+    
+    # Calculate costs
+    input_cost = (input_tokens / 1000) * API_COSTS[model]["input"]
+    output_cost = (output_tokens / 1000) * API_COSTS[model]["output"]
+    total_cost = input_cost + output_cost
+    
+    # Update model-specific cost
+    st.session_state.model_costs[model] += total_cost
+    charge_quota(total_cost)
+    
+    return {
+        "input_tokens": input_tokens,
+        "output_tokens": output_tokens,
+        "input_cost": input_cost,
+        "output_cost": output_cost,
+        "total_cost": total_cost
+    }
+
+def record_usage(feature, model, input_tokens, output_tokens, count_call=True):
+    """
+    Add token usage and its cost to the session totals for a feature.
+    Pass count_call=False for a helper request (e.g. a job description analysis) made on behalf of a call.
+    """
+    input_cost = (input_tokens / 1000) * API_COSTS[model]["input"]
+    output_cost = (output_tokens / 1000) * API_COSTS[model]["output"]
+    total_cost = input_cost + output_cost
+
+    st.session_state.model_costs[model] += total_cost
+    charge_quota(total_cost)
+    st.session_state.total_api_cost += total_cost
+    st.session_state.total_input_tokens += input_tokens
+    st.session_state.total_output_tokens += output_tokens
+
+    if count_call:
+        st.session_state.function_usage[feature].calls += 1
+    st.session_state.function_usage[feature].tokens += input_tokens + output_tokens
+    st.session_state.function_usage[feature].cost += total_cost
+
+    return {
+        "input_tokens": input_tokens,
+        "output_tokens": output_tokens,
+        "input_cost": input_cost,
+        "output_cost": output_cost,
+        "total_cost": total_cost
+    }
+
+def record_extra_attempts(result, feature=None):
+    """
+    Charge the attempts that lost a hedged race (see request_executor) to the session totals.
+    Cancelled attempts are charged for their estimated prompt tokens and an answer as long as the winner's.
+    """
+    for attempt in result["extra_attempts"]:
+        model = attempt["model"]
+        cost = (attempt["input_tokens"] / 1000) * API_COSTS[model]["input"] \
+            + (attempt["output_tokens"] / 1000) * API_COSTS[model]["output"]
+        st.session_state.model_costs[model] += cost
+        charge_quota(cost)
+        st.session_state.total_api_cost += cost
+        st.session_state.total_input_tokens += attempt["input_tokens"]
+        st.session_state.total_output_tokens += attempt["output_tokens"]
+        if feature:
+            st.session_state.function_usage[feature].tokens += attempt["input_tokens"] + attempt["output_tokens"]
+            st.session_state.function_usage[feature].cost += cost
+
+def job_context(job_description, feature):
+    """
+    The job description as prompts should send it: its shared compact profile (see jd_profile.py).
+    An analysis call made for it adds its cost and tokens to the feature, without counting as one of its calls.
+    """
+    if not job_description.strip():
+        return job_description
+    job = get_job_profile(job_description)
+    if job["usage"]:
+        usage = job["usage"]
+        record_usage(feature, usage["model"], usage["input_tokens"], usage["output_tokens"], count_call=False)
+    return job["text"]
+
+def choose_model(model_choice, feature, text, **route_hints):
+    """
+    Resolve the model for a request. "Auto" asks the router; otherwise the user's pick is used.
+    Returns:
+        tuple: (model, routing decision or None)
+    """
+    if model_choice != "Auto":
+        return model_choice, None
+    route = route_request(
+        feature, text, strong_requests_left=st.session_state.get("strong_requests_left"), **route_hints
+    )
+    return route["model"], route
+
+
+def render_message(content):
+    """Render a chat message from its cached markdown and code segments"""
+    for kind, language, text in parse_message(content):
+        if kind == "code":
+            st.code(text, language=language)
+        else:
+            st.markdown(text)
+
+
+def display_questions(questions):
+    """Show structured questions as a numbered markdown list"""
+    st.markdown("\n".join(format_question(question, i) for i, question in enumerate(questions, start=1)))
+
+
+def reset_session_state(page=None):
+    if st.session_state.get("current_page") != page:
+        st.session_state.current_page = page
+        st.session_state.generated_question = None
+        st.session_state.generated_tests = None
+        st.session_state.generated_questions = []
+        st.session_state.generated_image = None
@@ -0,0 +1,379 @@
+import json
+import time
+
+import streamlit as st
+
+from chat_archive import load_chat_messages
+from chat_render import CHAT_WINDOW_TURNS, CHAT_WINDOW_STEP, visible_messages
+from chat_transfer import export_file, import_lines
+from model_router import record_outcome
+from prompt_filter import check_input
+from prompts import build_expert_system_message
+from request_executor import execute_chat
+from session_store import chat_summaries, intern_messages
+from supabase_helpers import update_chat, save_chat, delete_chats
+from supabase_helpers import get_user_chat_summaries, search_chats
+from views.common import (
+    CHAT_MODELS, EXPERT_TYPES, PROMPT_TECHNIQUES, QUOTA_EXCEEDED_MESSAGE, get_sanitized_prompt, create_chat_description,
+    calculate_api_cost, record_extra_attempts, choose_model, has_quota, render_message, timed
+)
+from views.profiler import profiled
+
+# Chats listed per page in the history panel and in search results
+HISTORY_PAGE_SIZE = 20
+SEARCH_PAGE_SIZE = 10
+
+
+@profiled("expert_chat")
+def expert_chat():
+    # Create main chat area and right sidebar layout
+    chat_col, history_col = st.columns([3, 1])
+    
+    with chat_col:
+        chat_container = st.container()
+        with chat_container:
+            st.title("Chat with Expert")
+            st.caption("Below select an expert and adjust chat settings.")
+
+            settings_col, new_chat_col = st.columns([3, 1])
+
+            with settings_col:
+                with st.expander("Chat Settings", expanded=False):
+                    expert_type = st.selectbox(
+                        "Select your expert:",
+                        list(EXPERT_TYPES.keys())
+                    )
+                    
+                    technique = st.selectbox(
+                        "Select prompting technique:",
+                        list(PROMPT_TECHNIQUES.keys())
+                    )
+                    
+                    model_choice = st.radio(
+                        "Select AI model:",
+                        ["Auto", *CHAT_MODELS],
+                        help="Auto sends easy questions to gpt-3.5-turbo and hard ones to gpt-4"
+                    )
+                    
+                    answer_length = st.radio(
+                        "Preferred answer length:",
+                        ["Concise", "Detailed"]
+                    )
+
+                    # Add temperature slider
+                    temperature = st.slider(
+                        "Select Temperature:",
+                        min_value=0.0,
+                        max_value=1.0,
+                        value=0.7,
+                        step=0.1
+                    )
+
+            with new_chat_col:
+                if st.button("+ New Chat"):
+                    st.session_state.messages = []
+                    st.session_state.chat_window = 2 * CHAT_WINDOW_TURNS
+                    st.session_state.is_new_chat = True
+                    st.session_state.current_chat_id = None
+                    st.rerun()
+
+            conversation(expert_type, technique, model_choice, answer_length, temperature)
+
+        # Step 13: Display Chat History
+        with history_col:
+            history_panel()
+
+
+@st.fragment
+@timed("chat")
+@profiled("chat")
+def conversation(expert_type, technique, model_choice, answer_length, temperature):
+    """Messages and chat input. Sending a message or loading earlier messages reruns only this region."""
+    message_area = st.container()
+    input_container = st.container()
+
+    # Step 1: Add a system message and assistant welcome message at the beginning of the session
+    if st.session_state.is_new_chat and not st.session_state.messages:
+        # System message defines the AI's identity and behavior
+        system_message = build_expert_system_message(expert_type)
+
+        # Store system message in session state
+        st.session_state.messages.append({
+            "role": "system",
+            "content": system_message
+        })
+
+        # Initial assistant message (welcome message)
+        initial_message = EXPERT_TYPES[expert_type]
+        st.session_state.messages.append({
+            "role": "assistant",
+            "content": initial_message
+        })
+
+        # Display welcome message to the user
+
+    # Step 2: Display the latest chat messages; earlier ones on request
+    with message_area:
+        hidden, visible = visible_messages(st.session_state.messages, st.session_state.chat_window)
+        if hidden and st.button("⬆️ Load earlier messages", key="load_earlier"):
+            st.session_state.chat_window += 2 * CHAT_WINDOW_STEP
+            st.rerun(scope="fragment")
+        for message in visible:
+            with st.chat_message(message["role"]):
+                render_message(message["content"])
+
+    # Step 3: Handle user input
+    with input_container:
+        if prompt := st.chat_input("What would you like to ask?", key="chat_input"):
+            # Reject off-topic, abusive or injection-style input locally, before spending quota
+            decision = check_input(prompt, "expert_chat", st.session_state.current_user_id)
+            if not decision["allowed"]:
+                st.warning(decision["message"])
+                return
+
+            if not has_quota(model_choice):
+                st.error(QUOTA_EXCEEDED_MESSAGE)
+                return
+
+            chat_id_before = st.session_state.current_chat_id
+
+            # Step 4: Add user message to session state
+            st.session_state.messages.append({"role": "user", "content": prompt})
+
+            with message_area.chat_message("user"):
+                render_message(prompt)
+
+            try:
+                with message_area.chat_message("assistant"):
+                    with st.spinner("Thinking..."):
+                        # Step 5: Build AI context (including system message)
+                        context_messages = st.session_state.messages.copy()
+
+                        # Step 6: Apply reasoning technique via get_sanitized_prompt()
+                        sanitized_prompt = get_sanitized_prompt(
+                            user_input=prompt,
+                            technique=technique
+                        )
+
+                        # Step 7: Add preferred answer length instruction
+                        length_instruction = "concise and direct" if answer_length == "Concise" else "detailed and comprehensive"
+                        context_messages.append({
+                            "role": "system",
+                            "content": f"Please provide {length_instruction} answers.\n{sanitized_prompt}"
+                        })
+
+                        # Step 8: Get AI response using OpenAI API
+                        model, route = choose_model(
+                            model_choice, "expert_chat", prompt,
+                            technique=technique, detailed=answer_length == "Detailed"
+                        )
+                        # Only Auto-routed chats may fall back to a cheaper model when the first one is slow
+                        result = execute_chat(
+                            "expert_chat",
+                            model,
+                            context_messages,
+                            hedge_policy="cheaper" if route else "same",
+                            temperature=temperature
+                        )
+                        response, model, latency = result["response"], result["model"], result["latency"]
+
+                        assistant_response = response.choices[0].message.content
+
+                        # Step 9: Save AI response to session state
+                        st.session_state.messages.append(
+                            {"role": "assistant", "content": assistant_response}
+                        )
+
+                        # Step 10: Update chat in Supabase if not yet created
+                        if not st.session_state.current_chat_id:
+                            description = create_chat_description(prompt)
+                            saved = save_chat(
+                                user_id=st.session_state.current_user_id,
+                                expert_type=expert_type,
+                                messages=[],
+                                description=description
+                            )
+                            new_chat_id = saved.data[0]['id'] if saved.data else None
+                            if new_chat_id:
+                                st.session_state.current_chat_id = new_chat_id
+
+                        messages_json = json.dumps(st.session_state.messages)
+                        update_chat(
+                            st.session_state.current_chat_id,
+                            {"messages": messages_json}
+                        )
+                        st.session_state.chat_cache.put(st.session_state.current_chat_id, messages_json)
+
+                        # Step 11: Refresh chat history when this message started a new chat
+                        if st.session_state.current_chat_id != chat_id_before:
+                            st.session_state.chat_history = chat_summaries(
+                                get_user_chat_summaries(st.session_state.current_user_id)
+                            )
+
+                        # Step 12: Update API cost and token usage
+                        cost_info = calculate_api_cost(response, model)
+                        st.session_state.total_api_cost += cost_info['total_cost']
+                        st.session_state.total_input_tokens += cost_info['input_tokens']
+                        st.session_state.total_output_tokens += cost_info['output_tokens']
+
+                        st.session_state.function_usage["expert_chat"].calls += 1
+                        st.session_state.function_usage["expert_chat"].tokens += (
+                            cost_info['input_tokens'] + cost_info['output_tokens']
+                        )
+                        st.session_state.function_usage["expert_chat"].cost += cost_info['total_cost']
+                        record_outcome(st.session_state.route_stats, "expert_chat", model, route, latency, cost_info['total_cost'])
+                        record_extra_attempts(result, "expert_chat")
+
+                        # Display AI response
+                        if result["switched"]:
+                            st.info(f"The chosen model was slow to answer, so this answer comes from {model}.")
+                        render_message(assistant_response)
+                        st.markdown(f"*Cost: ${cost_info['total_cost']:.5f} "
+                                    f"({cost_info['input_tokens']} input + {cost_info['output_tokens']} output tokens"
+                                    f"{', auto-routed to ' + model if route else ''}"
+                                    f"{', hedged' if result['hedged'] else ''})*")
+
+            except Exception as e:
+                st.error(f"Error: {str(e)}")
+
+                # Refresh history even after failure, in case the chat was already created
+                if st.session_state.current_chat_id != chat_id_before:
+                    st.session_state.chat_history = chat_summaries(
+                        get_user_chat_summaries(st.session_state.current_user_id)
+                    )
+
+            # Only a new chat changes the history panel; otherwise rerun just this region
+            if st.session_state.current_chat_id != chat_id_before:
+                st.rerun()
+            st.rerun(scope="fragment")
+
+
+def open_chat(chat_id):
+    """Make a chat the current conversation; messages are only held for recently opened chats"""
+    messages_json = st.session_state.chat_cache.get(chat_id)
+    if messages_json is None:
+        messages_json = load_chat_messages(chat_id) or "[]"
+        st.session_state.chat_cache.put(chat_id, messages_json)
+    st.session_state.messages = intern_messages(json.loads(messages_json))
+    st.session_state.chat_window = 2 * CHAT_WINDOW_TURNS
+    st.session_state.current_chat_id = chat_id
+    st.session_state.is_new_chat = False
+
+
+def search_results(query):
+    """Ranked, paginated full-text search results with highlighted snippets"""
+    page = st.session_state.get("chat_search_page", 0)
+    started = time.perf_counter()
+    try:
+        results = search_chats(st.session_state.current_user_id, query, SEARCH_PAGE_SIZE, page * SEARCH_PAGE_SIZE)
+    except Exception as e:
+        st.error(f"Error searching chats: {str(e)}")
+        return
+    elapsed_ms = (time.perf_counter() - started) * 1000
+
+    total = results[0]["total_count"] if results else 0
+    st.caption(f"{total} matching chat(s) in {elapsed_ms:.0f} ms")
+    for result in results:
+        if st.button(result["description"] or "Untitled Chat", key=f"search_{result['id']}", use_container_width=True):
+            open_chat(result["id"])
+            st.rerun()
+        if result["snippet"]:
+            st.caption(result["snippet"])
+
+    pages = max(1, -(-total // SEARCH_PAGE_SIZE))
+    if pages > 1:
+        previous_col, label_col, next_col = st.columns([1, 2, 1])
+        if previous_col.button("‹", key="search_previous", disabled=page == 0):
+            st.session_state.chat_search_page = page - 1
+            st.rerun(scope="fragment")
+        label_col.caption(f"Page {page + 1} of {pages}")
+        if next_col.button("›", key="search_next", disabled=page + 1 >= pages):
+            st.session_state.chat_search_page = page + 1
+            st.rerun(scope="fragment")
+
+
+@st.fragment
+@timed("history")
+@profiled("history")
+def history_panel():
+    """Chat history column. Searching or deleting a chat reruns only this panel; opening one reruns the page."""
+    st.subheader("Chat History")
+
+    query = st.text_input("Search chats", key="chat_search", placeholder="Search descriptions and messages",
+                          label_visibility="collapsed")
+    if query != st.session_state.get("chat_search_last"):
+        st.session_state.chat_search_last = query
+        st.session_state.chat_search_page = 0
+    if query.strip():
+        search_results(query.strip())
+        return
+
+    selecting = st.toggle("Select chats", key="history_select")
+    selected = []
+
+    # chat_history is already newest first, as loaded from Supabase
+    shown = 0
+    for chat_id, chat_data in st.session_state.chat_history.items():
+        if shown >= st.session_state.get("history_limit", HISTORY_PAGE_SIZE):
+            if st.button("Show more", key="history_more", use_container_width=True):
+                st.session_state.history_limit = st.session_state.get("history_limit", HISTORY_PAGE_SIZE) + HISTORY_PAGE_SIZE
+                st.rerun(scope="fragment")
+            break
+        shown += 1
+        if selecting:
+            if st.checkbox(chat_data.description, key=f"select_{chat_id}"):
+                selected.append(chat_id)
+            continue
+        col1, col2 = st.columns([6, 1])
+        with col1:
+            if st.button(f"{chat_data.description}", key=f"load_{chat_id}", use_container_width=True):
+                open_chat(chat_id)
+                st.rerun()
+        with col2:
+            if st.button("🗑️", key=f"delete_{chat_id}", help="Delete chat"):
+                forget_chats([chat_id])
+                st.rerun(scope="fragment")
+
+    if selecting and st.button(f"Delete {len(selected)} selected", key="delete_selected", disabled=not selected,
+                               type="primary", use_container_width=True):
+        forget_chats(selected)
+        st.rerun(scope="fragment")
+
+    transfer_panel()
+
+
+def forget_chats(chat_ids):
+    """Delete chats with one batched query and drop them from this session"""
+    delete_chats(st.session_state.current_user_id, chat_ids)
+    for chat_id in chat_ids:
+        st.session_state.chat_history.pop(chat_id, None)
+        st.session_state.chat_cache.discard(chat_id)
+        st.session_state.pop(f"select_{chat_id}", None)
+
+
+def transfer_panel():
+    """Export the whole history as JSONL, or import chats from an export"""
+    with st.expander("Export / import"):
+        user_id = st.session_state.current_user_id
+        st.download_button(
+            "Export all chats (JSONL)",
+            data=lambda: export_file(user_id),  # Built only when clicked
+            file_name="chats.jsonl",
+            mime="application/jsonl",
+            on_click="ignore",
+            use_container_width=True
+        )
+        upload = st.file_uploader("Import chats", type=["jsonl"], key="chat_import")
+        if upload is not None and st.button("Import", key="chat_import_run", use_container_width=True):
+            try:
+                result = import_lines(user_id, upload, expert_types=EXPERT_TYPES)
+            except Exception as e:
+                st.error(f"Error importing chats: {str(e)}")
+                return
+            st.session_state.chat_history = chat_summaries(get_user_chat_summaries(user_id))
+            st.session_state.chat_import_result = result
+            st.rerun()
+        result = st.session_state.pop("chat_import_result", None)
+        if result:
+            st.success(f"Imported {result['imported']} chat(s)"
+                       + (f", skipped {result['skipped']} invalid line(s)" if result["skipped"] else ""))
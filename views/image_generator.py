@@ -0,0 +1,163 @@
+import io
+
+import streamlit as st
+
+from providers import registry
+from resilience import retry_call
+from views.common import IMAGE_STYLES, IMAGE_COSTS, QUOTA_EXCEEDED_MESSAGE, has_quota, charge_quota
+from views.profiler import profiled
+
+
+# Image model alias; its provider comes from the registry
+IMAGE_MODEL = "dall-e-3"
+
+
+@profiled("generate_image")
+def generate_image():
+    st.title("Image Generator")
+    
+    mode = st.radio(
+        "Select Mode:",
+        ["Generate New Image", "Edit Existing Image"],
+        help="Choose to create a new image from scratch or edit an uploaded image."
+    )
+    
+    if mode == "Generate New Image":
+        style = st.selectbox(
+            "Select Image Style:",
+            list(IMAGE_STYLES.keys()),
+            help="Choose the style of the generated image"
+        )
+        
+        prompt = st.text_area(
+            "Describe the image you want to generate:",
+            height=100,
+            help="Be specific about what you want to see in the image"
+        )
+        
+        if st.button("Generate Image"):
+            if not prompt.strip():
+                st.warning("Please enter a description for the image.")
+                return
+            
+            if not has_quota(cost=IMAGE_COSTS["dall-e-3"]["standard_1024"]):
+                st.error(QUOTA_EXCEEDED_MESSAGE)
+                return
+            
+            try:
+                with st.spinner("Generating your image..."):
+                    # Format the prompt
+                    enhanced_prompt = f"Create a {style.lower()} image of: {prompt}"
+                    
+                    provider, image_model = registry.resolve(IMAGE_MODEL)
+                    response = retry_call(
+                        f"{provider.name}.images",
+                        provider.client().images.generate,
+                        model=image_model,
+                        prompt=enhanced_prompt,
+                        size="1024x1024",
+                        quality="standard",
+                        n=1,
+                        style="natural" if style == "Natural" else "vivid"
+                    )
+                    
+                    # ✅ Display the generated image
+                    image_url = response.data[0].url
+                    st.image(image_url, caption=f"Style: {style}", width=400)
+                    
+                    # ✅ Update cost and usage details
+                    image_cost = IMAGE_COSTS["dall-e-3"]["standard_1024"]
+                    st.session_state.total_api_cost += image_cost
+                    st.session_state.model_costs["dall-e-3"] += image_cost
+                    charge_quota(image_cost)
+                    st.session_state.function_usage["generate_image"].calls += 1
+                    st.session_state.function_usage["generate_image"].cost += image_cost
+                    
+                    st.info(f"Image Generation Cost: ${image_cost:.2f} (DALL‑E 3, 1024x1024, Standard Quality)")
+
+            except Exception as e:
+                st.error(f"Error generating image: {str(e)}")
+
+    else:  # Edit Existing Image mode
+        st.markdown("### Edit an Uploaded Image")
+        
+        uploaded_file = st.file_uploader(
+            "Upload an image to edit:",
+            type=["png", "jpg", "jpeg", "heic"],
+            help="Upload an image that you want to edit."
+        )
+        
+        background = st.selectbox(
+            "Select a Professional Background:",
+            ["Professional Office", "Modern Office", "Minimalist", "Classic", "Outdoor Business"],
+            help="Choose the new background style for your image."
+        )
+        
+        if st.button("Edit Image"):
+            if not uploaded_file:
+                st.warning("Please upload an image to edit.")
+                return
+            
+            if not has_quota(cost=IMAGE_COSTS["dall-e-3"]["standard_1024"]):
+                st.error(QUOTA_EXCEEDED_MESSAGE)
+                return
+            
+            try:
+                with st.spinner("Editing your image..."):
+                    # Pillow is only needed here, so it is imported on first use instead of at startup
+                    from PIL import Image
+
+                    # ✅ Step 1: Open the image
+                    try:
+                        image = Image.open(uploaded_file)
+                    except Exception as e:
+                        st.error(f"Error loading image: {str(e)}")
+                        return
+                    
+                    # ✅ Step 2: Convert to PNG (fix iPhone format issue)
+                    image = image.convert('RGBA')
+
+                    # ✅ Step 3: Save as binary (PNG)
+                    with io.BytesIO() as output:
+                        image.save(output, format="PNG")
+                        png_data = output.getvalue()
+                    image_file = io.BytesIO(png_data)
+                    
+                    # ✅ Step 4: Create a dummy mask (full white)
+                    mask = Image.new("L", image.size, 255)
+                    with io.BytesIO() as mask_output:
+                        mask.save(mask_output, format="PNG")
+                        mask_data = mask_output.getvalue()
+                    mask_file = io.BytesIO(mask_data)
+
+                    # ✅ Step 5: Build the prompt for editing
+                    edit_prompt = f"Replace the background with a {background.lower()} background while keeping the subject intact."
+                    
+                    provider, _ = registry.resolve(IMAGE_MODEL)
+                    response = retry_call(
+                        f"{provider.name}.images",
+                        provider.client().images.edit,
+                        image=image_file,
+                        mask=mask_file,
+                        prompt=edit_prompt,
+                        size="1024x1024",
+                        n=1
+                    )
+                    
+                    # ✅ Step 6: Display the edited image
+                    edited_image_url = response.data[0].url
+                    st.image(edited_image_url, caption=f"Edited with {background} background", width=400)
+                    
+                    # ✅ Step 7: Update usage stats
+                    image_cost = IMAGE_COSTS["dall-e-3"]["standard_1024"]
+                    st.session_state.total_api_cost += image_cost
+                    st.session_state.model_costs["dall-e-3"] += image_cost
+                    charge_quota(image_cost)
+                    st.session_state.function_usage["generate_image"].calls += 1
+                    st.session_state.function_usage["generate_image"].cost += image_cost
+                    
+                    st.info(f"Image Editing Cost: ${image_cost:.2f} (DALL‑E 3, 1024x1024, Standard Quality)")
+
+            except Exception as e:
+                st.error(f"Error editing image: {str(e)}")
+
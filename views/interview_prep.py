@@ -0,0 +1,465 @@
+import time
+
+import streamlit as st
+
+from complexity_profiler import profile_solution, summarize_profile
+from evaluation_cache import evaluation_key, question_key, get_cached_evaluation, cache_evaluation, small_edit_diff, build_diff_evaluation_prompt
+from mock_interview import MOCK_MODEL, new_session, needs_prefetch, prefetch_question, submit_answer, collect, seconds_left, finish_if_expired, wait_for_question, wait_for_evaluations, is_evaluating, aggregate_results, to_iso
+from model_router import record_outcome
+from prompt_filter import check_input
+from prompts import INTERVIEW_SYSTEM_MESSAGE, build_coding_question_prompt, build_evaluation_prompt
+from question_pool import serve_from_pool
+from request_executor import execute_chat
+from sandbox import RUNNABLE_LANGUAGES, split_question_and_tests, sandbox_available, run_test_cases, is_broken, summarize_results
+from supabase_helpers import save_mock_interview, get_user_mock_interviews
+from views.common import (
+    CHAT_MODELS, QUOTA_EXCEEDED_MESSAGE, calculate_api_cost, record_usage, record_extra_attempts, choose_model,
+    has_quota, job_context, reset_session_state
+)
+from views.profiler import profiled
+
+
+@profiled("interview_prep")
+def interview_prep():
+    reset_session_state("interview_prep")
+
+    st.title("Interview Prep")
+    st.markdown("Solve coding challenges tailored to your target job.")
+
+    system_message = INTERVIEW_SYSTEM_MESSAGE
+
+    # Initialize state for the generated question
+    if 'generated_question' not in st.session_state:
+        st.session_state.generated_question = None
+    if 'generated_tests' not in st.session_state:
+        st.session_state.generated_tests = None
+
+    # Interview settings in expander
+    with st.expander("Interview Settings", expanded=True):
+        interviewer_personality = st.selectbox(
+            "Select interviewer personality:",
+            ["Friendly", "Technical", "Challenging", "Supportive"],
+            help="Choose the type of interviewer you want to practice with"
+        )
+        
+        language = st.selectbox("Select Language:", ["Python", "JavaScript", "Java", "C++"])
+        
+        difficulty = st.slider("Difficulty Level:", 1, 5, 3)
+        
+        answer_length = st.radio(
+            "Question complexity:",
+            ["Basic", "Comprehensive"],
+            help="Choose the level of detail for the coding question"
+        )
+
+        model_choice = st.radio(
+            "AI model:",
+            ["Auto", *CHAT_MODELS],
+            key="interview_prep_model",
+            help="Auto picks the model per request from its difficulty and your remaining budget"
+        )
+
+        profile_complexity = st.checkbox(
+            "Measure time/space complexity (Python only)",
+            value=True,
+            help="Run your solution on growing inputs and infer its Big-O from the measurements"
+        )
+
+    job_description = st.text_area(
+        "Enter Job Description (for tailored interview prep):",
+        help="Provide a brief description of the job you are applying for, so questions can be tailored accordingly.",
+        height=100
+    )
+
+    mode = st.radio(
+        "Mode:",
+        ["Single Question", "Mock Interview"],
+        horizontal=True,
+        help="Practice one question at a time, or a timed session of several questions"
+    )
+    if mode == "Mock Interview":
+        mock_interview_session(
+            {
+                "language": language,
+                "difficulty": difficulty,
+                "personality": interviewer_personality,
+                "complexity": answer_length
+            },
+            job_description
+        )
+        return
+
+    #  Prevent empty input before generating question
+    if st.button("Generate Coding Question"):
+        if not job_description.strip():
+            st.warning("Please enter a job description before generating questions.")
+            return
+
+        decision = check_input(job_description, "interview_prep", st.session_state.current_user_id)
+        if not decision["allowed"]:
+            st.warning(decision["message"])
+            return
+        
+        #  Check the spend quota before serving or generating a question
+        if not has_quota(model_choice):
+            st.error(QUOTA_EXCEEDED_MESSAGE)
+            return
+
+        #  Serve a prefetched question when one is ready, so the common case is a single DB read
+        try:
+            pooled = serve_from_pool(language, difficulty, interviewer_personality, answer_length, job_description)
+        except Exception as e:
+            st.warning(f"Question pool unavailable, generating a new question: {str(e)}")
+            pooled = None
+
+        if pooled:
+            st.session_state.generated_question = pooled["question"]
+            st.session_state.generated_tests = pooled["tests"]
+
+            # The pool generated this question ahead of time; charge its usage to this user now
+            cost_info = record_usage("interview_prep", pooled["model"], pooled["input_tokens"], pooled["output_tokens"])
+
+            st.write("**Question:**")
+            st.write(st.session_state.generated_question)
+            st.info(f"API Cost: ${cost_info['total_cost']:.5f} ({cost_info['input_tokens']} input + {cost_info['output_tokens']} output tokens, prefetched)")
+        else:
+            try:
+                with st.spinner("Generating coding question..."):
+                    # Build user prompt with settings and the job's compact profile, shared with the Question Generator
+                    user_prompt = build_coding_question_prompt(
+                        language, difficulty, interviewer_personality, answer_length,
+                        job_context(job_description, "interview_prep")
+                    )
+
+                    #  API call to OpenAI
+                    model, route = choose_model(
+                        model_choice, "interview_prep", job_description,
+                        detailed=answer_length == "Comprehensive", level=difficulty
+                    )
+                    result = execute_chat(
+                        "interview_prep",
+                        model,
+                        [
+                            {"role": "system", "content": system_message},
+                            {"role": "user", "content": user_prompt}
+                        ]
+                    )
+                    response, model, latency = result["response"], result["model"], result["latency"]
+
+                    #  Save generated question and its test cases to session state
+                    question_text, test_spec = split_question_and_tests(response.choices[0].message.content)
+                    st.session_state.generated_question = question_text
+                    st.session_state.generated_tests = test_spec
+
+                    #  Update cost and tokens
+                    cost_info = calculate_api_cost(response, model)
+                    st.session_state.total_api_cost += cost_info['total_cost']
+                    st.session_state.total_input_tokens += cost_info['input_tokens']
+                    st.session_state.total_output_tokens += cost_info['output_tokens']
+
+                    st.session_state.function_usage["interview_prep"].calls += 1
+                    st.session_state.function_usage["interview_prep"].tokens += cost_info['input_tokens'] + cost_info['output_tokens']
+                    st.session_state.function_usage["interview_prep"].cost += cost_info['total_cost']
+                    record_outcome(st.session_state.route_stats, "interview_prep", model, route, latency, cost_info['total_cost'])
+                    record_extra_attempts(result, "interview_prep")
+
+                    #  Display generated question
+                    st.write("**Question:**")
+                    st.write(st.session_state.generated_question)
+
+                    st.info(f"API Cost: ${cost_info['total_cost']:.5f} ({cost_info['input_tokens']} input + {cost_info['output_tokens']} output tokens)")
+
+            except Exception as e:
+                st.error(f"Error generating question: {str(e)}")
+
+    #  Only show solution input if a valid question was generated
+    if st.session_state.get('generated_question'):
+        st.write("**Your Solution:**")
+        code = st.text_area("Write your code here:", height=300)
+
+        test_spec = st.session_state.get('generated_tests')
+        if test_spec:
+            with st.expander(f"Test cases ({len(test_spec['test_cases'])})", expanded=False):
+                st.caption(f"Implement `{test_spec['function_name']}`.")
+                st.json(test_spec['test_cases'])
+
+        # Prevent empty input for submission
+        if st.button("Submit Solution"):
+            if not code.strip():
+                st.warning("Please enter a solution before submitting.")
+                return
+
+            decision = check_input(code, "solution", st.session_state.current_user_id)
+            if not decision["allowed"]:
+                st.warning(decision["message"])
+                return
+
+            # Same question and (normalized) code as an earlier submission: reuse its evaluation
+            cache_key = evaluation_key(
+                st.session_state.generated_question, code, language, interviewer_personality, difficulty
+            )
+            cached = get_cached_evaluation(cache_key)
+            if cached:
+                st.write("**Feedback:**")
+                st.write(cached["feedback"])
+                st.info("Same solution as an earlier submission: showing the cached evaluation (no API cost).")
+                return
+
+            # Run the solution locally first so broken code never costs a GPT-4 call
+            test_summary = "Local test run: not available for this language."
+            if test_spec and language in RUNNABLE_LANGUAGES and sandbox_available():
+                with st.spinner("Running test cases..."):
+                    test_results = run_test_cases(code, test_spec)
+
+                st.write("**Test Results:**")
+                st.dataframe(
+                    [
+                        {
+                            "Test": i,
+                            "Result": "✅ Pass" if result["passed"] else "❌ Fail",
+                            "Runtime (ms)": round(result["runtime_ms"], 2),
+                            "Details": result["error"] or result["detail"]
+                        }
+                        for i, result in enumerate(test_results, start=1)
+                    ],
+                    use_container_width=True,
+                    hide_index=True
+                )
+
+                if is_broken(test_results):
+                    st.error("Your solution did not pass any test case. Fix it and submit again — no API call was made.")
+                    return
+                test_summary = summarize_results(test_results)
+
+            # Measure how the solution scales instead of letting the model guess from the code
+            profile = None
+            if profile_complexity and test_spec and language in RUNNABLE_LANGUAGES and sandbox_available():
+                with st.spinner("Profiling time and memory on growing inputs..."):
+                    profile = profile_solution(code, test_spec)
+                test_summary += "\n" + summarize_profile(profile)
+
+            with st.spinner("Evaluating your solution..."):
+                try:
+                    # Build evaluation prompt based on solution input
+                    # A small edit of the last evaluated solution only needs the diff and the previous feedback
+                    previous = st.session_state.get("last_evaluation")
+                    diff = None
+                    if previous and previous["question_key"] == question_key(st.session_state.generated_question):
+                        diff = small_edit_diff(previous["code"], code)
+
+                    if diff:
+                        evaluation_prompt = build_diff_evaluation_prompt(
+                            interviewer_personality, previous["feedback"], diff, language, test_summary
+                        )
+                    else:
+                        evaluation_prompt = build_evaluation_prompt(
+                            interviewer_personality, st.session_state.generated_question, code,
+                            language, difficulty, job_context(job_description, "interview_prep"), test_summary
+                        )
+
+                    #  API call to OpenAI for evaluation
+                    model, route = choose_model(
+                        model_choice, "interview_prep", code,
+                        detailed=answer_length == "Comprehensive", level=difficulty
+                    )
+                    result = execute_chat(
+                        "interview_prep",
+                        model,
+                        [
+                            {"role": "system", "content": system_message},
+                            {"role": "user", "content": evaluation_prompt}
+                        ]
+                    )
+                    response, model, latency = result["response"], result["model"], result["latency"]
+                    feedback = response.choices[0].message.content
+
+                    cache_evaluation(cache_key, {"feedback": feedback, "test_summary": test_summary})
+                    st.session_state.last_evaluation = {
+                        "question_key": question_key(st.session_state.generated_question),
+                        "code": code,
+                        "feedback": feedback
+                    }
+
+                    #  Update cost and tokens
+                    cost_info = calculate_api_cost(response, model)
+                    st.session_state.total_api_cost += cost_info['total_cost']
+                    st.session_state.total_input_tokens += cost_info['input_tokens']
+                    st.session_state.total_output_tokens += cost_info['output_tokens']
+
+                    st.session_state.function_usage["interview_prep"].calls += 1
+                    st.session_state.function_usage["interview_prep"].tokens += cost_info['input_tokens'] + cost_info['output_tokens']
+                    st.session_state.function_usage["interview_prep"].cost += cost_info['total_cost']
+                    record_outcome(st.session_state.route_stats, "interview_prep", model, route, latency, cost_info['total_cost'])
+                    record_extra_attempts(result, "interview_prep")
+
+                    #  Display feedback, with the measured complexity next to it
+                    feedback_col, profile_col = st.columns([2, 1]) if profile and profile["points"] else (st.container(), None)
+                    with feedback_col:
+                        st.write("**Feedback:**")
+                        st.write(feedback)
+
+                    if profile_col is not None:
+                        with profile_col:
+                            st.write("**Measured Complexity:**")
+                            st.metric("Time", profile["time_complexity"] or "n/a")
+                            st.metric("Extra memory", profile["space_complexity"] or "n/a")
+                            chart_data = {
+                                "Input size": [point["size"] for point in profile["points"]],
+                                "Time (ms)": [point["time_ms"] for point in profile["points"]],
+                                "Peak memory (KB)": [point["peak_kb"] for point in profile["points"]]
+                            }
+                            st.line_chart(chart_data, x="Input size", y="Time (ms)")
+                            st.line_chart(chart_data, x="Input size", y="Peak memory (KB)")
+                            if profile["error"]:
+                                st.caption(profile["error"])
+
+                    if diff:
+                        st.caption("Small edit of your previous solution: only the changes were re-evaluated.")
+                    st.info(f"API Cost: ${cost_info['total_cost']:.5f} ({cost_info['input_tokens']} input + {cost_info['output_tokens']} output tokens)")
+
+                except Exception as e:
+                    st.error(f"Error evaluating solution: {str(e)}")
+
+
+def schedule_mock_question(session, index):
+    """Start generating a mock interview question in the background if the spend quota allows it"""
+    if not needs_prefetch(session, index):
+        return
+    if not has_quota(MOCK_MODEL):
+        session["questions"][index]["error"] = QUOTA_EXCEEDED_MESSAGE
+        return
+    prefetch_question(session, index)
+
+
+def mock_interview_session(settings, job_description):
+    """Timed multi-question mock interview. The next question and earlier evaluations run in the background."""
+    session = st.session_state.get("mock_interview")
+
+    # Step 1: Set up a new session
+    if session is None:
+        count_col, duration_col = st.columns(2)
+        with count_col:
+            num_questions = st.slider("Number of questions:", 2, 5, 3)
+        with duration_col:
+            duration_minutes = st.slider("Session length (minutes):", 10, 90, 45, step=5)
+
+        if st.button("Start Mock Interview"):
+            if not job_description.strip():
+                st.warning("Please enter a job description before starting the mock interview.")
+                return
+            decision = check_input(job_description, "interview_prep", st.session_state.current_user_id)
+            if not decision["allowed"]:
+                st.warning(decision["message"])
+                return
+            with st.spinner("Reading the job description..."):
+                job_profile = job_context(job_description, "interview_prep")
+            session = new_session(settings, job_description, num_questions, duration_minutes, job_profile)
+            st.session_state.mock_interview = session
+            # The first question, and the second one in the background while the first is answered
+            schedule_mock_question(session, 0)
+            schedule_mock_question(session, 1)
+            st.rerun()
+
+        with st.expander("Past Mock Interviews", expanded=False):
+            try:
+                past_runs = get_user_mock_interviews(st.session_state.current_user_id)
+            except Exception as e:
+                st.error(f"Error loading past mock interviews: {str(e)}")
+                past_runs = []
+            if not past_runs:
+                st.caption("No mock interviews yet.")
+            for run in past_runs:
+                st.markdown(
+                    f"**{run['started_at'][:16].replace('T', ' ')}** · {run['settings']['language']} · "
+                    f"difficulty {run['settings']['difficulty']}/5 · score **{run['overall_score']}/10**"
+                )
+        return
+
+    # Step 2: Pick up finished background work and charge its usage to this user
+    for usage in collect(session):
+        record_usage("interview_prep", usage["model"], usage["input_tokens"], usage["output_tokens"])
+    finish_if_expired(session)
+
+    # Step 3: Show the current question while the next one is prefetched
+    if session["finished_at"] is None:
+        index = session["current_index"]
+        slot = session["questions"][index]
+        remaining = seconds_left(session)
+        st.progress(index / session["num_questions"])
+        st.caption(
+            f"Question {index + 1} of {session['num_questions']} · ⏱️ {remaining // 60}:{remaining % 60:02d} left"
+        )
+
+        if slot["error"]:
+            st.error(slot["error"])
+        elif slot["question"] is None:
+            with st.spinner("Preparing your question..."):
+                wait_for_question(session, index)
+            st.rerun()
+        else:
+            st.write("**Question:**")
+            st.write(slot["question"])
+            if slot["tests"]:
+                with st.expander(f"Test cases ({len(slot['tests']['test_cases'])})", expanded=False):
+                    st.caption(f"Implement `{slot['tests']['function_name']}`.")
+                    st.json(slot["tests"]["test_cases"])
+
+            code = st.text_area("Write your code here:", height=300, key=f"mock_code_{session['id']}_{index}")
+            if st.button("Submit and Next Question" if index + 1 < session["num_questions"] else "Submit and Finish"):
+                if not code.strip():
+                    st.warning("Please enter a solution before submitting.")
+                    return
+                decision = check_input(code, "solution", st.session_state.current_user_id)
+                if not decision["allowed"]:
+                    st.warning(decision["message"])
+                    return
+                if not has_quota(MOCK_MODEL):
+                    st.error(QUOTA_EXCEEDED_MESSAGE)
+                    return
+                submit_answer(session, code)
+                schedule_mock_question(session, session["current_index"] + 1)
+                st.rerun()
+
+        pending = sum(1 for slot in session["questions"] if slot["evaluation_future"] is not None)
+        if pending:
+            st.caption(f"Evaluating {pending} earlier answer(s) in the background...")
+        if st.button("End Session"):
+            session["finished_at"] = time.time()
+            st.rerun()
+        return
+
+    # Step 4: Aggregate the cached per-question feedback once every evaluation is done
+    if is_evaluating(session):
+        with st.spinner("Waiting for the remaining evaluations..."):
+            wait_for_evaluations(session)
+        st.rerun()
+
+    results = aggregate_results(session)
+    if not session.get("saved"):
+        try:
+            save_mock_interview(
+                st.session_state.current_user_id, session["id"], session["settings"], results,
+                to_iso(session["started_at"]), to_iso(session["finished_at"])
+            )
+            session["saved"] = True
+        except Exception as e:
+            st.warning(f"Could not save this mock interview: {str(e)}")
+
+    st.subheader("Mock Interview Results")
+    score_col, answered_col = st.columns(2)
+    score_col.metric("Overall score", f"{results['overall_score']}/10")
+    answered_col.metric("Questions answered", f"{results['answered']}/{session['num_questions']}")
+    for question in results["questions"]:
+        score = f"{question['score']}/10" if question["score"] is not None else "not scored"
+        with st.expander(f"Question {question['number']} · {score}", expanded=False):
+            st.write(question["question"] or "_Not reached_")
+            if question["solution"]:
+                st.code(question["solution"], language=session["settings"]["language"].lower())
+                st.write("**Feedback:**")
+                st.write(question["feedback"])
+            else:
+                st.caption("No solution submitted.")
+
+    if st.button("Start New Session"):
+        del st.session_state.mock_interview
+        st.rerun()
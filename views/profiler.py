@@ -0,0 +1,76 @@
+import functools
+import os
+
+import streamlit as st
+
+from profiling import PROFILE_DIR, RegionProfile
+
+# Profiles of the latest runs kept per session for the overlay
+MAX_PROFILES = 10
+
+# Comma-separated user IDs that may turn profiling on for their own session with ?profile=1
+PROFILE_ADMINS = {user_id.strip() for user_id in os.environ.get("APP_PROFILE_ADMINS", "").split(",") if user_id.strip()}
+
+
+def profiling_enabled() -> bool:
+    """
+    Opt-in developer mode: APP_PROFILE=1 in the environment profiles every session. Otherwise ?profile=1
+    in the URL only works for the users in APP_PROFILE_ADMINS, so visitors can't slow the server or fill
+    PROFILE_DIR with dumps.
+    """
+    if os.environ.get("APP_PROFILE") == "1":
+        return True
+    return st.query_params.get("profile") == "1" and str(st.session_state.get("current_user_id")) in PROFILE_ADMINS
+
+
+def profiled(region):
+    """Profile each run of a region (main, a page or a fragment) when profiling is enabled"""
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not profiling_enabled():
+                return fn(*args, **kwargs)
+            dump = os.environ.get("APP_PROFILE_DUMP") == "1" or st.session_state.get("profile_dump", False)
+            profile = RegionProfile(region, fn, dump=dump)
+            try:
+                with profile:
+                    return fn(*args, **kwargs)
+            finally:
+                if profile.summary is not None:
+                    profiles = st.session_state.setdefault("profiles", [])
+                    profiles.append(profile.summary)
+                    del profiles[:-MAX_PROFILES]
+        return wrapper
+    return decorator
+
+
+def render_profiler_overlay():
+    """Collapsible developer overlay with the latest run profiles"""
+    if not profiling_enabled():
+        return
+    with st.expander("🔬 Profiler", expanded=False):
+        st.checkbox(f"Save profiles to {PROFILE_DIR}/", key="profile_dump")
+        profiles = st.session_state.get("profiles", [])
+        if not profiles:
+            st.caption("No profiled runs yet.")
+            return
+
+        choice = st.selectbox(
+            "Run:",
+            range(len(profiles) - 1, -1, -1),
+            format_func=lambda i: f"{profiles[i]['at']} · {profiles[i]['region']} · {profiles[i]['total_ms']:.0f} ms"
+        )
+        profile = profiles[choice]
+        if profile["regions"]:
+            st.markdown("**Regions:** " + ", ".join(f"{name} {ms:.0f} ms" for name, ms in profile["regions"]))
+        if profile["path"]:
+            st.caption(f"Saved to {profile['path']}")
+
+        st.markdown("**Call tree** (share of the run)")
+        st.code("\n".join(
+            f"{'█' * max(1, round(share * 30)):<30} {ms:8.1f} ms  {'  ' * depth}{label}"
+            for depth, label, ms, share in profile["flame"]
+        ) or "(empty)", language=None)
+
+        st.markdown("**Hot functions** (own time)")
+        st.dataframe(profile["hot"], use_container_width=True, hide_index=True)
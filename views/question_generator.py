@@ -0,0 +1,188 @@
+import streamlit as st
+
+from model_router import record_outcome
+from prompt_filter import check_input
+from prompts import QUESTION_GENERATOR_SYSTEM_MESSAGE, build_question_request
+from question_bank import MIN_JD_TERM_MATCHES, parse_generated_questions, dedupe_questions, jd_search_terms
+from request_executor import execute_chat
+from session_store import cap_generated_questions
+from supabase_helpers import save_questions, search_question_bank, mark_questions_served
+from views.common import (
+    CHAT_MODELS, QUOTA_EXCEEDED_MESSAGE, get_sanitized_prompt, calculate_api_cost, record_extra_attempts, choose_model,
+    has_quota, job_context, display_questions
+)
+from views.profiler import profiled
+
+
+@profiled("question_generator")
+def question_generator():
+    st.title("Question Generator")
+    st.markdown("Generate interview questions based on job descriptions")
+
+    # Question settings in expander
+    with st.expander("Question Settings", expanded=False):
+        question_style = st.selectbox(
+            "Select question style:",
+            ["Technical", "Behavioral", "System Design", "Problem Solving"],
+            help="Choose the type of questions you want to generate"
+        )
+
+        num_questions = st.slider(
+            "Number of questions:",
+            min_value=1,
+            max_value=10,
+            value=5,
+            help="How many questions would you like to generate?"
+        )
+
+        answer_length = st.radio(
+            "Difficulty level:",
+            ["Basic", "Comprehensive"],
+            help="Choose how difficult you want the generated questions to be"
+        )
+
+        model_choice = st.radio(
+            "AI model:",
+            ["Auto", *CHAT_MODELS],
+            key="question_generator_model",
+            help="Auto picks gpt-3.5-turbo for simple requests and gpt-4 for demanding ones"
+        )
+
+        use_bank = st.checkbox(
+            "Serve from question bank first",
+            value=True,
+            help="Reuse matching questions from the shared question bank and only call GPT-4 for the rest"
+        )
+
+    # Job description input
+    jd_text = st.text_area("Paste the job description:", height=200)
+
+    if st.button("Generate Questions"):
+        if not jd_text.strip():  # Prevent empty job description
+            st.warning("Please enter a job description before generating questions.")
+            return
+
+        decision = check_input(jd_text, "question_generator", st.session_state.current_user_id)
+        if not decision["allowed"]:
+            st.warning(decision["message"])
+            return
+
+        # Step 1: Try to serve matching questions from the bank
+        bank_questions = []
+        if use_bank:
+            try:
+                bank_questions = search_question_bank(
+                    jd_search_terms(jd_text), question_style, answer_length, limit=num_questions,
+                    min_matches=MIN_JD_TERM_MATCHES
+                )
+            except Exception as e:
+                st.warning(f"Question bank unavailable, generating fresh questions: {str(e)}")
+
+        if len(bank_questions) >= num_questions:
+            mark_questions_served([question["id"] for question in bank_questions])
+            st.session_state.generated_questions.append(bank_questions)
+            cap_generated_questions(st.session_state.generated_questions)
+            st.success(f"Served {len(bank_questions)} questions from the question bank (no API cost).")
+            display_questions(bank_questions)
+            return
+
+        try:
+            with st.spinner("Generating questions..."):
+                # Step 2: Only generate the questions the bank could not provide
+                num_to_generate = num_questions - len(bank_questions)
+
+                # Check API limit before making request
+                if not has_quota(model_choice):
+                    st.error(QUOTA_EXCEEDED_MESSAGE)
+                    return
+
+                # The job's compact profile, shared with Interview Prep, stands in for the full description
+                user_prompt = get_sanitized_prompt(
+                    build_question_request(
+                        num_to_generate, question_style, answer_length, job_context(jd_text, "question_generator")
+                    ),
+                    "Zero Shot"
+                )
+
+                # API call to OpenAI
+                model, route = choose_model(
+                    model_choice, "question_generator", jd_text,
+                    detailed=answer_length == "Comprehensive"
+                )
+                result = execute_chat(
+                    "question_generator",
+                    model,
+                    [
+                        {"role": "system", "content": QUESTION_GENERATOR_SYSTEM_MESSAGE},
+                        {"role": "user", "content": user_prompt}
+                    ]
+                )
+                response, model, latency = result["response"], result["model"], result["latency"]
+
+                # Step 3: Parse structured questions and dedupe against the bank
+                bank_hashes = {question["question_hash"] for question in bank_questions}
+                new_questions = [
+                    question for question in dedupe_questions(parse_generated_questions(
+                        response.choices[0].message.content, question_style, answer_length
+                    ))
+                    if question["question_hash"] not in bank_hashes
+                ]
+
+                try:
+                    save_questions(new_questions)
+                    if bank_questions:
+                        mark_questions_served([question["id"] for question in bank_questions])
+                except Exception as e:
+                    st.warning(f"Could not save questions to the bank: {str(e)}")
+
+                questions = bank_questions + new_questions
+
+                # Calculate cost of this API call
+                cost_info = calculate_api_cost(response, model)
+                record_outcome(st.session_state.route_stats, "question_generator", model, route, latency, cost_info['total_cost'])
+                record_extra_attempts(result, "question_generator")
+
+                # Update session state with token usage and cost
+                st.session_state.total_api_cost += cost_info['total_cost']
+                st.session_state.total_input_tokens += cost_info['input_tokens']
+                st.session_state.total_output_tokens += cost_info['output_tokens']
+
+                st.session_state.function_usage["question_generator"].calls += 1
+                st.session_state.function_usage["question_generator"].tokens += (
+                    cost_info['input_tokens'] + cost_info['output_tokens']
+                )
+                st.session_state.function_usage["question_generator"].cost += cost_info['total_cost']
+
+                # Store generated questions in session state
+                st.session_state.generated_questions.append(questions)
+                cap_generated_questions(st.session_state.generated_questions)
+
+                # Display generated questions
+                st.success("Questions generated!")
+                if bank_questions:
+                    st.caption(f"{len(bank_questions)} served from the question bank, {len(new_questions)} newly generated.")
+                display_questions(questions)
+
+                # Display cost information
+                st.info(
+                    f"API Cost: ${cost_info['total_cost']:.5f} "
+                    f"({cost_info['input_tokens']} input + {cost_info['output_tokens']} output tokens"
+                    f"{', shared with an identical request in progress' if result['shared'] else ''})"
+                )
+
+        except Exception as e:
+            st.error(f"Error generating questions: {str(e)}")
+
+    # Browse the shared question bank
+    with st.expander("Search Question Bank", expanded=False):
+        bank_query = st.text_input("Search questions by keyword:", key="bank_query")
+        if bank_query.strip():
+            try:
+                results = search_question_bank(bank_query.split(), limit=20)
+            except Exception as e:
+                st.error(f"Error searching question bank: {str(e)}")
+                results = []
+            if results:
+                display_questions(results)
+            else:
+                st.caption("No matching questions in the bank yet.")
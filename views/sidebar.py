@@ -0,0 +1,151 @@
+import statistics
+
+import streamlit as st
+
+from chat_archive import archive_report
+from model_router import STRONG_MODEL, new_route_stats
+from quota import quota
+from session_store import MAX_CHAT_CACHE_BYTES, ChatCache, new_function_usage, memory_report
+from views.auth import end_session
+from views.common import CHAT_MODELS, estimate_cost, new_model_costs
+
+
+def render_sidebar():
+    """Quota, logout and usage statistics of the logged-in user"""
+    remaining_budget = max(0.0, quota.remaining(st.session_state.current_user_id))
+
+    # The router saves the strong model when only a few typical requests on it are still affordable
+    st.session_state.strong_requests_left = int(remaining_budget / estimate_cost(STRONG_MODEL))
+
+    # ✅ Display Remaining Budget Only
+    st.sidebar.markdown(
+        f"<div style='color:#ff4b4b; font-size:18px; font-weight:bold;'>🔥 Budget Left: ${remaining_budget:.2f}</div>",
+        unsafe_allow_html=True,
+        help=f"Free plan includes ${quota.capacity:.2f} of API usage per day, refilled gradually. "
+             f"Each request uses its actual cost. Upgrade for more."
+    )
+
+
+    st.sidebar.markdown("<div style='margin-top:20px;'></div>", unsafe_allow_html=True)
+    # Add logout button
+    if st.sidebar.button("Logout"):
+        end_session()
+        st.session_state.logged_in = False
+        st.session_state.current_user = None
+        st.session_state.current_user_id = None
+        st.session_state.chat_history = {}
+        st.session_state.chat_cache = ChatCache()
+        st.session_state.messages = []
+        st.session_state.is_new_chat = True
+        st.session_state.current_chat_id = None
+
+        # Reset API usage counters
+        st.session_state.total_api_cost = 0.0
+        st.session_state.total_input_tokens = 0
+        st.session_state.total_output_tokens = 0
+        st.session_state.model_costs = new_model_costs()
+        st.session_state.function_usage = new_function_usage()
+        st.session_state.route_stats = new_route_stats()
+        st.rerun()
+
+    # Show current user
+    st.sidebar.markdown(
+        f"Logged in as: <span style='font-weight:bold;'>{st.session_state.current_user}</span>",
+        unsafe_allow_html=True
+    )
+
+
+    # Show API cost information
+    st.sidebar.markdown("---")
+    st.sidebar.subheader("Current session API Usage")
+    st.sidebar.markdown(f"**Total Cost:** ${st.session_state.total_api_cost:.6f}")
+
+    # Add expandable cost breakdown by model
+    with st.sidebar.expander("💰 Cost Breakdown by Model"):
+        for model, cost in st.session_state.model_costs.items():
+            if cost > 0:
+                if model == "dall-e-3":
+                    st.markdown(f"**DALL-E Image Generation:** ${cost:.6f}")
+                else:
+                    st.markdown(f"**{model}:** ${cost:.6f}")
+
+    # Add expandable function usage statistics
+    with st.sidebar.expander("📊 Function Usage Statistics"):
+        # Expert Chat
+        if st.session_state.function_usage["expert_chat"].calls > 0:
+            st.markdown("**Expert Chat:**")
+            st.markdown(f"- Calls: {st.session_state.function_usage['expert_chat'].calls}")
+            st.markdown(f"- Tokens: {st.session_state.function_usage['expert_chat'].tokens}")
+            st.markdown(f"- Cost: ${st.session_state.function_usage['expert_chat'].cost:.6f}")
+            st.markdown("---")
+
+        # Question Generator
+        if st.session_state.function_usage["question_generator"].calls > 0:
+            st.markdown("**Question Generator:**")
+            st.markdown(f"- Calls: {st.session_state.function_usage['question_generator'].calls}")
+            st.markdown(f"- Tokens: {st.session_state.function_usage['question_generator'].tokens}")
+            st.markdown(f"- Cost: ${st.session_state.function_usage['question_generator'].cost:.6f}")
+            st.markdown("---")
+
+        # Interview Prep
+        if st.session_state.function_usage["interview_prep"].calls > 0:
+            st.markdown("**Interview Prep:**")
+            st.markdown(f"- Calls: {st.session_state.function_usage['interview_prep'].calls}")
+            st.markdown(f"- Tokens: {st.session_state.function_usage['interview_prep'].tokens}")
+            st.markdown(f"- Cost: ${st.session_state.function_usage['interview_prep'].cost:.6f}")
+            st.markdown("---")
+
+        # Image Generator
+        if st.session_state.function_usage["generate_image"].calls > 0:
+            st.markdown("**Image Generator:**")
+            st.markdown(f"- Images: {st.session_state.function_usage['generate_image'].calls}")
+            st.markdown(f"- Cost: ${st.session_state.function_usage['generate_image'].cost:.6f}")
+
+    # Add expandable model routing statistics
+    with st.sidebar.expander("🧭 Model Routing"):
+        route_models = st.session_state.route_stats["models"]
+        if not route_models:
+            st.caption("No model calls yet.")
+        for model, stats in route_models.items():
+            st.markdown(f"**{model}:**")
+            st.markdown(f"- Calls: {stats['calls']} ({stats['auto_calls']} auto-routed)")
+            st.markdown(f"- Avg latency: {stats['latency'] / stats['calls']:.2f}s")
+            st.markdown(f"- Cost: ${stats['cost']:.6f}")
+        recent = st.session_state.route_stats["recent"]
+        if recent:
+            last = recent[-1]
+            st.caption(f"Last: {last['feature']} → {last['model']} ({last['reason']}, {last['latency']:.2f}s)")
+
+    # Approximate memory this session holds on the server
+    with st.sidebar.expander("🧠 Session Memory"):
+        report = memory_report(st.session_state)
+        st.markdown(f"**Total:** {sum(size for _, size in report) / 1024:.1f} KB")
+        for key, size in report[:8]:
+            st.markdown(f"- {key}: {size / 1024:.1f} KB")
+        st.caption(f"{len(st.session_state.chat_cache)} chat(s) cached, "
+                   f"{st.session_state.chat_cache.nbytes / 1024:.1f} KB of {MAX_CHAT_CACHE_BYTES // 1024} KB")
+        archive = archive_report()
+        if archive["ratio"]:
+            st.caption(f"Archive: {archive['chats']} chat(s) compressed {archive['ratio']:.1f}x")
+        if archive["rehydrations"]:
+            st.caption(f"Archived chats opened: {archive['rehydrations']}, "
+                       f"median {archive['rehydrate_ms_median']:.1f} ms to rehydrate")
+
+    # Time of full reruns ("app") and of partial reruns of each fragment
+    with st.sidebar.expander("⏱️ Rerun Timings"):
+        run_timings = st.session_state.get("run_timings", {})
+        if not run_timings:
+            st.caption("No runs measured yet.")
+        for region, timings in run_timings.items():
+            st.markdown(f"**{region}:** last {timings[-1] * 1000:.0f} ms, "
+                        f"median {statistics.median(timings) * 1000:.0f} ms ({len(timings)} runs)")
+        st.caption("Partial reruns update this panel on the next full rerun.")
+
+    st.sidebar.markdown(f"**Input Tokens:** {st.session_state.total_input_tokens}", 
+                      help="Input tokens are the words/characters sent to the API (your prompts and context). These are cheaper than output tokens.")
+    st.sidebar.markdown(f"**Output Tokens:** {st.session_state.total_output_tokens}", 
+                      help="Output tokens are the words/characters generated by the AI model (the responses). These are typically more expensive than input tokens.")
+
+    # Show models being used
+    st.sidebar.markdown(f"**Available Models:** {', '.join(CHAT_MODELS)}")
+